@@ -0,0 +1,95 @@
+import json
+import os
+from html import escape
+from typing import List, Dict, Any, Tuple
+
+# Resolved from the repo root, so the corpus loads from any working directory
+SAVED_DEALS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output", "kroger_full.json")
+
+# (modal html, displayed name, expected parse output or None)
+Fixture = Tuple[str, str, Any]
+
+
+# ================= SAVED DEALS =================
+def load_deal_groups(path: str = SAVED_DEALS) -> List[Tuple[Dict, List[Dict]]]:
+    """Split a saved parse output back into (main deal, qualifying products) groups"""
+    with open(path, "r", encoding="utf-8") as f:
+        deals = json.load(f)
+
+    groups = []
+    for deal in deals:
+        if not deal["Qualifying Products"]:
+            groups.append((deal, []))
+        elif groups:
+            groups[-1][1].append(deal)
+    return groups
+
+
+# ================= MODAL RENDERING =================
+def render_card(product: Dict, list_style: bool) -> str:
+    css = "flex flex-col border-solid" if list_style else "MiniProductCard-card-container flex flex-col border-solid"
+    parts = [
+        f'<div class="{css}">',
+        f'<span data-testid="cart-page-item-description" class="kds-Text--m">{escape(product["competitor_product"])}</span>',
+        f'<mark class="kds-Price-promotional">{escape(product["competitor_price"])}</mark>',
+    ]
+    if product["original_price"]:
+        parts.append(f'<s class="kds-Price-original">{escape(product["original_price"])}</s>')
+    if product["competitor_product_size"] != "N/A":
+        parts.append(f'<span data-testid="product-item-sizing">{escape(product["competitor_product_size"])}</span>')
+    parts.append("</div>")
+    return "".join(parts)
+
+
+def render_regular_modal(main: Dict, products: List[Dict]) -> str:
+    """Deal modal with a price tag and a grid of qualifying products"""
+    original = f'<del>{escape(main["original_price"])}</del>' if main["original_price"] != "N/A" else ""
+    cards = "\n".join(render_card(product, list_style=False) for product in products)
+    return f"""<div role="dialog" class="ReactModal__Content">
+<h2 class="kds-Heading">{escape(main["competitor_product"])}</h2>
+<span class="SWA-ModalPriceText">{escape(main["competitor_price"])}</span>{original}
+<h2>Qualifying Products</h2>
+<div class="ProductGridContainer AutoGrid">
+{cards}
+</div>
+</div>"""
+
+
+def render_coupon_modal(main: Dict, products: List[Dict]) -> str:
+    """Coupon modal ("Sign In To Clip") with a list of qualifying products"""
+    items = "\n".join(f"<li>{render_card(product, list_style=True)}</li>" for product in products)
+    return f"""<div role="dialog" class="CouponModal-contentWrapper">
+<h2 data-testid="CouponDetails-shortDescription">{escape(main["competitor_price"])}</h2>
+<button type="button">Sign In To Clip</button>
+<h2>Qualifying Products</h2>
+<ul class="ProductListView">
+{items}
+</ul>
+</div>"""
+
+
+# ================= CORPUS =================
+def build_corpus(scale: int = 1, path: str = SAVED_DEALS) -> List[Fixture]:
+    """Regular and coupon modals for every saved deal, repeated `scale` times
+
+    Regular modals render the saved values exactly, so their expected output is
+    the saved deal group itself. Coupon modals go through different price rules
+    and are only compared between parser backends.
+    """
+    base = []
+    for main, products in load_deal_groups(path):
+        name = main["competitor_product"]
+        base.append((render_regular_modal(main, products), name, [main] + products))
+        base.append((render_coupon_modal(main, products), name, None))
+    return base * scale
+
+
+def load_corpus_dir(directory: str) -> List[Fixture]:
+    """Stored modal HTML files; the file name (minus .html) is the displayed name"""
+    corpus = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".html"):
+            continue
+        with open(os.path.join(directory, filename), "r", encoding="utf-8") as f:
+            corpus.append((f.read(), filename[:-len(".html")].replace("_", " "), None))
+    return corpus
@@ -0,0 +1,29 @@
+"""Check that the lxml parser backend matches bs4 output on the fixture corpus
+
+    python -m benchmarks.parity
+"""
+import sys
+
+from benchmarks.fixtures import build_corpus
+from scraper.bs4_parser import parse_kroger_modal
+
+
+def check_parity() -> int:
+    failures = 0
+    corpus = build_corpus()
+    for html, name, expected in corpus:
+        bs4_result = parse_kroger_modal(html, name, backend="bs4")
+        lxml_result = parse_kroger_modal(html, name, backend="lxml")
+        if lxml_result != bs4_result:
+            failures += 1
+            print(f"MISMATCH bs4/lxml: {name}")
+        if expected is not None and bs4_result != expected:
+            failures += 1
+            print(f"MISMATCH saved output: {name}")
+
+    print(f"{len(corpus)} modals checked, {failures} mismatches")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if check_parity() else 0)
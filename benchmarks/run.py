@@ -0,0 +1,160 @@
+"""Offline parser throughput benchmarks
+
+    python -m benchmarks.run                      # 1x, 10x and 100x synthesized corpus
+    python -m benchmarks.run --scale 10 --target bs4_parser.lxml
+    python -m benchmarks.run --corpus-dir captured_modals/
+    python -m benchmarks.run --compare benchmarks/results/<earlier>.json
+
+Each run is written to benchmarks/results/ as JSON, named after the current
+commit, so numbers can be compared across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Any
+
+from benchmarks.fixtures import Fixture, build_corpus, load_corpus_dir
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+# ================= TARGETS =================
+def _bs4_parser(backend: str) -> Callable[[str, str], List[Dict]]:
+    from scraper.bs4_parser import parse_kroger_modal
+    return lambda html, name: parse_kroger_modal(html, name, backend=backend)
+
+def _ttt_parser() -> Callable[[str, str], List[Dict]]:
+    from ttt import parse_kroger_modal
+    return parse_kroger_modal
+
+def _parse_deal_details() -> Callable[[str, str], List[Dict]]:
+    from scraper.kroger_scrapper import parse_deal_details
+    return parse_deal_details
+
+TARGETS = {
+    "bs4_parser": lambda: _bs4_parser("bs4"),
+    "bs4_parser.lxml": lambda: _bs4_parser("lxml"),
+    "ttt": _ttt_parser,
+    "parse_deal_details": _parse_deal_details,
+}
+
+
+# ================= MEASUREMENT =================
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def bench(parse: Callable[[str, str], List[Dict]], corpus: List[Fixture]) -> Dict[str, Any]:
+    """Time every modal, then measure peak memory in a separate traced pass"""
+    latencies = []
+    deals = 0
+    start = time.perf_counter()
+    for html, name, _ in corpus:
+        t0 = time.perf_counter()
+        deals += len(parse(html, name))
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    # tracemalloc slows parsing down, so it gets its own pass
+    tracemalloc.start()
+    for html, name, _ in corpus:
+        parse(html, name)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "modals": len(corpus),
+        "deals": deals,
+        "seconds": round(elapsed, 4),
+        "modals_per_sec": round(len(corpus) / elapsed, 1) if elapsed else 0.0,
+        "deals_per_sec": round(deals / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+# ================= REPORTS =================
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_report(report: Dict[str, Any]) -> str:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(RESULTS_DIR, f"{stamp}-{report['commit']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def compare(report: Dict[str, Any], baseline_path: str) -> None:
+    """Print deals/sec and p99 changes against an earlier report"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline['commit']} ({os.path.basename(baseline_path)})")
+    for key, result in report["results"].items():
+        old = baseline["results"].get(key)
+        if not old:
+            continue
+        speed = (result["deals_per_sec"] / old["deals_per_sec"] - 1) * 100 if old["deals_per_sec"] else 0.0
+        p99 = (result["p99_ms"] / old["p99_ms"] - 1) * 100 if old["p99_ms"] else 0.0
+        print(f"  {key:32} deals/sec {speed:+6.1f}%   p99 {p99:+6.1f}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", choices=sorted(TARGETS), help="default: all targets")
+    parser.add_argument("--scale", action="append", type=int, help="corpus multiplier (default: 1, 10, 100)")
+    parser.add_argument("--corpus-dir", help="benchmark stored modal HTML files instead of the synthesized corpus")
+    parser.add_argument("--compare", help="earlier report to compare against")
+    args = parser.parse_args()
+
+    targets = args.target or list(TARGETS)
+    scales = args.scale or [1, 10, 100]
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {},
+    }
+
+    for target in targets:
+        try:
+            parse = TARGETS[target]()
+        except ImportError as e:
+            print(f"skipping {target}: {e}")
+            continue
+
+        corpora = [("dir", load_corpus_dir(args.corpus_dir))] if args.corpus_dir else \
+                  [(f"{scale}x", build_corpus(scale)) for scale in scales]
+        for label, corpus in corpora:
+            result = bench(parse, corpus)
+            report["results"][f"{target}@{label}"] = result
+            print(f"{target:20} {label:>5}  {result['deals_per_sec']:>10.1f} deals/s  "
+                  f"p50 {result['p50_ms']:.3f}ms  p99 {result['p99_ms']:.3f}ms  "
+                  f"peak {result['peak_memory_kb']:.0f}KB")
+
+    print(f"\nSaved {save_report(report)}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,146 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-import threading
+import json
+import os
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
-from scraper.kroger_scraper import KrogerScraper
-from database.models import Database, JobManager, DealManager
+from typing import Optional
+from scraper.kroger_scrapper import PARSERS, KrogerScraper, build_driver
+from scraper.driver import DriverPool
+from scraper.http_engine import HttpKrogerScraper
+from scraper.scheduler import JobScheduler
+from scraper.metrics import METRICS
+from scraper.stores import parse_store_ids
+from output.models import Database, JobManager, DealManager
+from output.cache import CachedResponse, ResponseCache, etag_matches
+from output.artifacts import ARTIFACTS_DIR, artifact_path, find_ndjson_artifact
+from output.html_cache import ModalCache
+from output.diff import DiffManager
 
 # Initialize router and database
 router = APIRouter()
 db = Database()
 job_manager = JobManager(db)
 deal_manager = DealManager(db)
+diff_manager = DiffManager(db)
+
+# Browsers are heavy: how many jobs run at once is capped, the rest wait in line
+MAX_CONCURRENT_JOBS = int(os.environ.get("KROGER_MAX_CONCURRENT_JOBS", "2"))
+
+def record_job_state(job_id: str, state: str) -> None:
+    """Jobs cancelled before they started never reach the scraper, so record it here"""
+    if state == "cancelled":
+        job_manager.update_job_status(job_id, state)
+
+scheduler: Optional[JobScheduler] = None
+
+# Warm browsers shared by every job, so a job's first page load doesn't wait on Chrome starting
+driver_pool = DriverPool(
+    build_driver,
+    size=int(os.environ.get("KROGER_WARM_DRIVERS", str(MAX_CONCURRENT_JOBS))),
+    max_uses=int(os.environ.get("KROGER_DRIVER_MAX_USES", "20")),
+    max_memory_mb=float(os.environ.get("KROGER_DRIVER_MAX_MEMORY_MB", "1500"))
+)
+
+# Completed jobs never change, so their responses are serialized once and kept here
+response_cache = ResponseCache()
+
+def serialize(content) -> bytes:
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def cached_response(request: Request, entry: CachedResponse) -> Response:
+    """Serve a cached body, or 304 if the client already has this ETag"""
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type=entry.media_type, headers=headers)
 
 @router.get("/scrape-kroger-deals")
-def start_scrape(limit: int = 1000):
-    """Start a new scraping job"""
-    # Check if there's already a job running
-    current_job = job_manager.get_current_job()
-    if current_job:
-        return JSONResponse(content={
+def start_scrape(limit: int = 1000, workers: int = 1, capture_mode: str = "modal", engine: str = "browser",
+                 priority: int = 0, stores: str = "", incremental: bool = True, replay_job: str = "",
+                 parser: str = "deal_details"):
+    """Queue a new scraping job; lower `priority` values start first
+
+    `stores` is a comma separated list of store IDs, sharded across the
+    workers; `limit` applies per store. With `incremental`, browser jobs copy
+    cards unchanged since an earlier job forward instead of reopening them.
+    capture_mode=replay re-parses the modals cached by `replay_job` with
+    `parser`, without a browser.
+    """
+    if engine not in ("browser", "http"):
+        raise HTTPException(status_code=400, detail={
             "success": False,
-            "job_id": current_job["job_id"],
-            "status": "running",
-            "message": "A scraping job is already in progress.",
-            "check_status_url": f"http://127.0.0.1:8080/status/{current_job['job_id']}"
-        }, status_code=409)
+            "message": "engine must be 'browser' or 'http'."
+        })
+    # "fixture" stays internal (KrogerScraper(..., fixture_path=...)): taking a server path
+    # from a query parameter would let any client make the API read arbitrary files
+    if capture_mode not in ("modal", "network", "replay"):
+        raise HTTPException(status_code=400, detail={
+            "success": False,
+            "message": "capture_mode must be 'modal', 'network' or 'replay'."
+        })
+    if parser not in PARSERS:
+        raise HTTPException(status_code=400, detail={
+            "success": False,
+            "message": f"parser must be one of: {', '.join(PARSERS)}."
+        })
+    if capture_mode == "replay" and not ModalCache(db).count(replay_job):
+        raise HTTPException(status_code=404, detail={
+            "success": False,
+            "job_id": replay_job,
+            "message": "No cached modal pages for replay_job."
+        })
 
     # Create new job
     job_id = str(uuid.uuid4())
-    scraper = KrogerScraper(job_id, limit)
-    threading.Thread(target=scraper.scrape, args=(), daemon=True).start()
+    store_ids = parse_store_ids(stores)
+    # Replay never touches the site, so it needs no engine of its own
+    if engine == "http" and capture_mode != "replay":
+        scraper = HttpKrogerScraper(job_id, limit, concurrency=workers, store_ids=store_ids, driver_pool=driver_pool)
+    else:
+        scraper = KrogerScraper(job_id, limit, workers, capture_mode, store_ids=store_ids, driver_pool=driver_pool,
+                                incremental=incremental, replay_job_id=replay_job or None, parser=parser)
+    # A replay takes the stores of the job it replays
+    job_manager.create_job(job_id, status="queued", stores=scraper.store_ids)
+    position = scheduler.submit(job_id, scraper.scrape, priority, cancel=scraper.cancel)
 
     return JSONResponse(content={
         "success": True,
         "job_id": job_id,
-        "status": "started",
-        "message": "Scraping job started successfully in background!",
-        "started_at": datetime.now().isoformat(),
+        "status": "queued",
+        "queue_position": position,
+        "message": "Scraping job queued; it starts as soon as a slot is free.",
+        "queued_at": datetime.now().isoformat(),
         "check_status_url": f"http://127.0.0.1:8080/status/{job_id}"
     }, status_code=202)
 
+@router.post("/cancel/{job_id}")
+def cancel_job(job_id: str):
+    """Cancel a queued or running job; deals scraped before the cancel are kept"""
+    previous = scheduler.cancel(job_id)
+    if previous is None:
+        raise HTTPException(status_code=404, detail={
+            "success": False,
+            "job_id": job_id,
+            "message": "Job is not queued or running."
+        })
+    return {
+        "success": True,
+        "job_id": job_id,
+        # Running jobs stop at their next card and then report "cancelled"
+        "status": "cancelled" if previous == "queued" else "cancelling"
+    }
+
 @router.get("/status/{job_id}")
-def get_status(job_id: str):
+def get_status(job_id: str, request: Request):
     """Get the status of a scraping job"""
+    cache_key = f"status:{job_id}"
+    cached = response_cache.get(cache_key)
+    if cached:
+        return cached_response(request, cached)
+
     job_info = job_manager.get_job_status(job_id)
     
     if not job_info:
@@ -61,11 +158,20 @@ def get_status(job_id: str):
         "started_at": job_info["started_at"],
         "total_cards": job_info["total_cards"],
         "successful_scrapes": job_info["successful_scrapes"],
-        "failed_scrapes": job_info["failed_scrapes"]
+        "failed_scrapes": job_info["failed_scrapes"],
+        "wait_stats": job_info["wait_stats"],
+        "timings": job_info["timings"],
+        "stores": job_info["stores"]
     }
 
-    if job_info["status"] == "completed":
+    if job_info["status"] == "queued":
+        response["queue_position"] = scheduler.position(job_id)
+    elif job_info["status"] in ("completed", "partial"):
         response["completed_at"] = job_info["completed_at"]
+        if job_info["status"] == "partial":
+            # Finished, but some stores' weekly ads could not be loaded
+            response["error"] = job_info["error"]
+        return cached_response(request, response_cache.put(cache_key, serialize(response)))
     elif job_info["status"] == "failed":
         response["error"] = job_info["error"]
         response["success"] = False
@@ -74,8 +180,20 @@ def get_status(job_id: str):
     return response
 
 @router.get("/get-data/{job_id}")
-def get_data(job_id: str):
-    """Get the scraped deals for a job"""
+def get_data(job_id: str, request: Request, limit: Optional[int] = None, after_id: int = 0, format: str = "json"):
+    """Get the scraped deals for a job
+
+    `limit`/`after_id` page through the deals by id; `format=ndjson` streams
+    every deal after `after_id` as one JSON object per line. For completed
+    jobs, ndjson is served from the precompressed artifact when the client
+    accepts its encoding, and `format=parquet` downloads the columnar export.
+    """
+    cache_key = f"data:{job_id}:{limit}:{after_id}"
+    if format == "json":
+        cached = response_cache.get(cache_key)
+        if cached:
+            return cached_response(request, cached)
+
     job_info = job_manager.get_job_status(job_id)
     
     if not job_info:
@@ -85,7 +203,7 @@ def get_data(job_id: str):
             "message": "Job ID not found."
         })
 
-    if job_info["status"] != "completed":
+    if job_info["status"] not in ("completed", "partial", "running", "cancelled"):
         return JSONResponse(content={
             "success": False,
             "job_id": job_id,
@@ -93,15 +211,115 @@ def get_data(job_id: str):
             "message": "Job is not completed yet."
         }, status_code=400)
 
-    deals = deal_manager.get_deals(job_id)
-    return {
+    if job_info["status"] == "completed" and format == "parquet":
+        path = artifact_path(job_id, ".parquet", ARTIFACTS_DIR)
+        if not os.path.exists(path):
+            raise HTTPException(status_code=404, detail={
+                "success": False,
+                "job_id": job_id,
+                "message": "No parquet export for this job."
+            })
+        return FileResponse(path, media_type="application/vnd.apache.parquet", filename=f"{job_id}.parquet")
+
+    if job_info["status"] == "completed" and format == "ndjson" and not after_id:
+        artifact = find_ndjson_artifact(job_id, request.headers.get("accept-encoding"))
+        if artifact:
+            path, encoding = artifact
+            # Already compressed on disk: sent as-is, no re-encoding
+            return FileResponse(path, media_type="application/x-ndjson",
+                                headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+
+    if format == "ndjson":
+        return StreamingResponse(
+            deal_manager.stream_deals_ndjson(job_id, after_id),
+            media_type="application/x-ndjson",
+            headers={"X-Job-Status": job_info["status"]}
+        )
+
+    if limit is not None and limit <= 0:
+        raise HTTPException(status_code=400, detail={
+            "success": False,
+            "message": "limit must be a positive integer."
+        })
+
+    # Running jobs flush deals in batches, so they can be read before they finish;
+    # cancelled jobs keep what was flushed before the cancel
+    paged = limit is not None or bool(after_id)
+    if paged:
+        deals, next_after_id = deal_manager.get_deals_page(job_id, limit, after_id)
+        total_deals = deal_manager.count_deals(job_id)
+    else:
+        deals = deal_manager.get_deals(job_id)
+        total_deals = len(deals)
+    response = {
         "success": True,
         "job_id": job_id,
-        "status": "completed",
+        "status": job_info["status"],
+        "partial": job_info["status"] != "completed",
         "completed_at": job_info["completed_at"],
-        "total_deals": len(deals),
+        # Every deal of the job; a page's own count is in page_deals
+        "total_deals": total_deals,
         "deals": deals
     }
+    if paged:
+        response["page_deals"] = len(deals)
+        response["next_after_id"] = next_after_id
+    if job_info["status"] == "completed":
+        return cached_response(request, response_cache.put(cache_key, serialize(response)))
+    return response
+
+@router.get("/diff")
+def get_diff(request: Request, to_job: str = Query(..., alias="to"), from_job: Optional[str] = Query(None, alias="from")):
+    """Deals added, removed and changed in price between two completed jobs
+
+    `from` defaults to the previous completed job for the same stores. Diffs
+    between consecutive jobs are computed as each job completes; others are
+    computed on first request and stored.
+    """
+    cache_key = f"diff:{from_job}:{to_job}"
+    cached = response_cache.get(cache_key)
+    if cached:
+        return cached_response(request, cached)
+
+    if from_job is None:
+        from_job = diff_manager.previous_job(to_job)
+        if from_job is None:
+            raise HTTPException(status_code=404, detail={
+                "success": False,
+                "job_id": to_job,
+                "message": "No earlier completed job to diff against."
+            })
+
+    for job_id in (from_job, to_job):
+        job_info = job_manager.get_job_status(job_id)
+        if not job_info:
+            raise HTTPException(status_code=404, detail={
+                "success": False,
+                "job_id": job_id,
+                "message": "Job ID not found."
+            })
+        if job_info["status"] != "completed":
+            raise HTTPException(status_code=400, detail={
+                "success": False,
+                "job_id": job_id,
+                "status": job_info["status"],
+                "message": "Only completed jobs can be diffed."
+            })
+
+    # Both jobs are final, so neither the stored diff nor this response ever changes
+    body = diff_manager.get_or_compute(from_job, to_job)
+    return cached_response(request, response_cache.put(cache_key, body))
+
+@router.get("/metrics")
+def metrics():
+    """Prometheus metrics: per-phase latency histograms and job counts, plus queue and browser pool gauges"""
+    pool_stats = driver_pool.stats()
+    # Browsers created and recycled only ever grow; idle and warming go up and down
+    counters = {f"driver_pool_{key}": pool_stats.pop(key) for key in ("created", "recycled")}
+    gauges = {f"driver_pool_{key}": value for key, value in pool_stats.items()}
+    if scheduler is not None:
+        gauges.update({f"scheduler_{key}": value for key, value in scheduler.stats().items()})
+    return Response(content=METRICS.render(gauges, counters), media_type="text/plain; version=0.0.4")
 
 @router.get("/")
 def root():
@@ -111,18 +329,35 @@ def root():
         "message": "Kroger Weekly Deals Async Scraper API",
         "version": "3.0",
         "endpoints": {
-            "start_scraping": "GET /scrape-kroger-deals?limit=500",
+            "start_scraping": "GET /scrape-kroger-deals?limit=500&workers=4&capture_mode=network&priority=0&stores=01400943,01400376",
+            "cancel_job": "POST /cancel/{job_id}",
             "check_status": "GET /status/{job_id}",
-            "get_data": "GET /get-data/{job_id}"
+            "get_data": "GET /get-data/{job_id}?limit=500&after_id=0",
+            "stream_data": "GET /get-data/{job_id}?format=ndjson",
+            "download_parquet": "GET /get-data/{job_id}?format=parquet",
+            "diff_jobs": "GET /diff?from={job_id}&to={job_id}",
+            "metrics": "GET /metrics"
         },
         "status": "running"
     }
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the job scheduler and warm the browsers; on shutdown cancel what is left and let running jobs save"""
+    global scheduler
+    job_manager.fail_interrupted()
+    scheduler = JobScheduler(MAX_CONCURRENT_JOBS, on_state=record_job_state)
+    driver_pool.warm()
+    yield
+    scheduler.shutdown(timeout=60)
+    driver_pool.close()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Kroger Scraper API",
     description="API for scraping Kroger weekly deals",
-    version="3.0.0"
+    version="3.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -0,0 +1,90 @@
+import gzip
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional: gzip artifacts are always written
+    zstandard = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional: parquet export is skipped without it
+    pyarrow = None
+
+ARTIFACTS_DIR = "artifacts"
+
+# Content-Encoding -> file suffix, in order of preference when the client accepts several
+ENCODINGS = [("zstd", ".ndjson.zst"), ("gzip", ".ndjson.gz")]
+
+
+def artifact_path(job_id: str, suffix: str, directory: str = ARTIFACTS_DIR) -> str:
+    return os.path.join(directory, f"{job_id}{suffix}")
+
+
+def write_atomic(path: str, chunks: Iterable[bytes], compressor: Optional[str] = None,
+                 tmp_path: Optional[str] = None) -> None:
+    """Stream chunks into `path` through an optional compressor, renaming into place at the end"""
+    tmp_path = tmp_path or path + ".tmp"
+    with open(tmp_path, "wb") as raw:
+        if compressor == "gzip":
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        elif compressor == "zstd":
+            with zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=False) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        else:
+            for chunk in chunks:
+                raw.write(chunk)
+    os.replace(tmp_path, path)
+
+
+def write_ndjson_artifacts(job_id: str, chunks: List[bytes], directory: str = ARTIFACTS_DIR) -> Dict[str, str]:
+    """Compressed NDJSON copies of a finished job, keyed by Content-Encoding"""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for encoding, suffix in ENCODINGS:
+        if encoding == "zstd" and zstandard is None:
+            continue
+        path = artifact_path(job_id, suffix, directory)
+        write_atomic(path, chunks, encoding)
+        paths[encoding] = path
+    return paths
+
+
+def write_parquet(job_id: str, deals: List[Dict], directory: str = ARTIFACTS_DIR) -> Optional[str]:
+    """Columnar export of a finished job; nested details are kept as JSON text"""
+    if pyarrow is None:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    rows = [{**deal, "details": json.dumps(deal.get("details", {}))} for deal in deals]
+    path = artifact_path(job_id, ".parquet", directory)
+    pyarrow.parquet.write_table(pyarrow.Table.from_pylist(rows), path + ".tmp", compression="zstd")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def export_job(deal_manager, job_id: str, directory: str = ARTIFACTS_DIR, parquet: bool = True) -> Dict[str, str]:
+    """Write every artifact for a finished job straight from the deals table"""
+    chunks = list(deal_manager.stream_deals_ndjson(job_id))
+    paths = write_ndjson_artifacts(job_id, chunks, directory)
+    if parquet:
+        parquet_path = write_parquet(job_id, deal_manager.get_deals(job_id), directory)
+        if parquet_path:
+            paths["parquet"] = parquet_path
+    return paths
+
+
+def find_ndjson_artifact(job_id: str, accept_encoding: Optional[str],
+                         directory: str = ARTIFACTS_DIR) -> Optional[Tuple[str, str]]:
+    """(path, Content-Encoding) of the best artifact the client can decode, if one exists"""
+    accepted = {part.split(";")[0].strip() for part in (accept_encoding or "").split(",")}
+    for encoding, suffix in ENCODINGS:
+        path = artifact_path(job_id, suffix, directory)
+        if encoding in accepted and os.path.exists(path):
+            return path, encoding
+    return None
@@ -0,0 +1,129 @@
+import json
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+# A deal is the same product in the same store: (store_id or '', product_id)
+DealKey = Tuple[str, int]
+
+SELECT_DIFF_ROWS_SQL = """SELECT store_id, product_id, product_name, price, price_value, promo_type
+                          FROM deals WHERE job_id = ? ORDER BY id"""
+UPSERT_DIFF_SQL = """INSERT INTO job_diffs (from_job, to_job, summary, body, created_at)
+                     VALUES (?, ?, ?, ?, ?)
+                     ON CONFLICT (from_job, to_job)
+                     DO UPDATE SET summary = excluded.summary, body = excluded.body,
+                                   created_at = excluded.created_at"""
+
+# Price values closer than this count as unchanged (float noise from the normalizer)
+PRICE_EPSILON = 0.005
+
+
+def _deal(row: tuple) -> Dict:
+    store_id, product_id, name, price, price_value, promo_type = row
+    return {
+        "store_id": store_id,
+        "product_id": product_id,
+        "name": name,
+        "price": price,
+        "price_value": price_value,
+        "promo_type": promo_type,
+    }
+
+
+def _price_changed(old: Dict, new: Dict) -> bool:
+    if old["price_value"] is not None and new["price_value"] is not None:
+        return abs(old["price_value"] - new["price_value"]) > PRICE_EPSILON
+    return (old["price"] or "") != (new["price"] or "")
+
+
+def diff_deals(old: Dict[DealKey, Dict], new: Dict[DealKey, Dict]) -> Dict:
+    """Hash join of two jobs' deals by product key: one pass over each side"""
+    added, changed = [], []
+    for key, deal in new.items():
+        before = old.get(key)
+        if before is None:
+            added.append(deal)
+        elif _price_changed(before, deal):
+            change = None
+            if before["price_value"] and deal["price_value"] is not None:
+                change = round((deal["price_value"] - before["price_value"]) / before["price_value"] * 100, 1)
+            changed.append({
+                **deal,
+                "old_price": before["price"],
+                "old_price_value": before["price_value"],
+                "old_promo_type": before["promo_type"],
+                "change_pct": change,
+            })
+    removed = [deal for key, deal in old.items() if key not in new]
+    return {
+        "summary": {
+            "added": len(added),
+            "removed": len(removed),
+            "price_changed": len(changed),
+            "unchanged": len(new) - len(added) - len(changed),
+        },
+        "added": added,
+        "removed": removed,
+        "price_changed": changed,
+    }
+
+
+class DiffManager:
+    """Deal diffs between jobs, stored in job_diffs once computed
+
+    Every completed job is diffed against the previous completed job for the
+    same stores before it is marked completed, so week-over-week reads are a single lookup.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def job_deals(self, job_id: str) -> Dict[DealKey, Dict]:
+        """A job's deals by product key; the first deal wins when a product repeats"""
+        deals: Dict[DealKey, Dict] = {}
+        with self.db.get_connection() as conn:
+            for row in conn.execute(SELECT_DIFF_ROWS_SQL, (job_id,)):
+                deals.setdefault((row[0] or "", row[1]), _deal(row))
+        return deals
+
+    def previous_job(self, job_id: str) -> Optional[str]:
+        """Latest job completed before `job_id` started that scraped the same stores
+
+        Anchored on the start time so the pair is the same while the job is still
+        running (when it is precomputed) and after it completes (when it is read).
+        """
+        with self.db.get_connection() as conn:
+            row = conn.execute("""
+                SELECT prev.job_id FROM jobs AS job
+                JOIN jobs AS prev
+                  ON prev.status = 'completed' AND prev.job_id != job.job_id
+                 AND prev.completed_at < job.started_at
+                 AND COALESCE(prev.stores, '[]') = COALESCE(job.stores, '[]')
+                WHERE job.job_id = ?
+                ORDER BY prev.completed_at DESC LIMIT 1
+            """, (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def get(self, from_job: str, to_job: str) -> Optional[bytes]:
+        """Stored diff body as JSON, None if it was never computed"""
+        with self.db.get_connection() as conn:
+            row = conn.execute("SELECT body FROM job_diffs WHERE from_job = ? AND to_job = ?",
+                               (from_job, to_job)).fetchone()
+        return row[0].encode("utf-8") if row else None
+
+    def compute(self, from_job: str, to_job: str) -> bytes:
+        """Diff two jobs, store the result and return it as JSON"""
+        diff = diff_deals(self.job_deals(from_job), self.job_deals(to_job))
+        body = json.dumps({"from": from_job, "to": to_job, **diff}, ensure_ascii=False, separators=(",", ":"))
+        with self.db.get_connection() as conn:
+            conn.execute(UPSERT_DIFF_SQL, (from_job, to_job, json.dumps(diff["summary"]), body, datetime.now()))
+        return body.encode("utf-8")
+
+    def get_or_compute(self, from_job: str, to_job: str) -> bytes:
+        return self.get(from_job, to_job) or self.compute(from_job, to_job)
+
+    def precompute(self, job_id: str) -> Optional[Dict]:
+        """Diff a just-completed job against its predecessor; returns the summary"""
+        previous = self.previous_job(job_id)
+        if previous is None:
+            return None
+        return json.loads(self.compute(previous, job_id))["summary"]
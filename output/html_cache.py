@@ -0,0 +1,107 @@
+import gzip
+import hashlib
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from output.artifacts import write_atomic
+
+HTML_CACHE_DIR = os.environ.get("KROGER_HTML_CACHE_DIR", "html_cache")
+
+UPSERT_PAGE_SQL = """INSERT INTO modal_pages
+                     (job_id, store_key, card_idx, name, fingerprint, digest, created_at)
+                     VALUES (?, ?, ?, ?, ?, ?, ?)
+                     ON CONFLICT (job_id, store_key, card_idx)
+                     DO UPDATE SET name = excluded.name, fingerprint = excluded.fingerprint,
+                                   digest = excluded.digest, created_at = excluded.created_at"""
+# Unchanged cards point at the page their source job captured, under the new job's card index
+COPY_PAGE_SQL = """INSERT OR REPLACE INTO modal_pages
+                   (job_id, store_key, card_idx, name, fingerprint, digest, created_at)
+                   SELECT ?, store_key, ?, name, fingerprint, digest, ?
+                   FROM modal_pages
+                   WHERE job_id = ? AND store_key = ? AND fingerprint = ?
+                   LIMIT 1"""
+COPY_JOB_SQL = """INSERT OR REPLACE INTO modal_pages
+                  (job_id, store_key, card_idx, name, fingerprint, digest, created_at)
+                  SELECT ?, store_key, card_idx, name, fingerprint, digest, ?
+                  FROM modal_pages WHERE job_id = ?"""
+
+
+def read_page(path: str) -> str:
+    """HTML of one cached page; module-level so parse workers can call it"""
+    with gzip.open(path, "rb") as f:
+        return f.read().decode("utf-8")
+
+
+class ModalCache:
+    """Content-addressed store of raw modal HTML, indexed by job and card
+
+    Pages live on disk gzipped under the sha256 of their HTML, so a modal
+    that did not change between jobs is stored once. The modal_pages table
+    maps (job, store, card index) to a page, which is what replay reads.
+    """
+
+    def __init__(self, db, directory: str = HTML_CACHE_DIR):
+        self.db = db
+        self.directory = directory
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], f"{digest}.html.gz")
+
+    def store(self, html: str) -> str:
+        """Write a page unless it is already cached, return its digest"""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Workers may cache the same page at once: each writes its own temp file
+            write_atomic(path, [data], "gzip", tmp_path=f"{path}.{os.getpid()}.{threading.get_ident()}.tmp")
+        return digest
+
+    def put(self, job_id: str, store_id: Optional[str], card_idx: int, name: str, html: str,
+            fingerprint: Optional[str] = None) -> str:
+        """Cache the modal opened for one card of a job"""
+        digest = self.store(html)
+        with self.db.get_connection() as conn:
+            conn.execute(UPSERT_PAGE_SQL, (job_id, store_id or "", card_idx, name, fingerprint,
+                                           digest, datetime.now()))
+        return digest
+
+    def copy_forward(self, job_id: str, store_id: Optional[str], cards: List[Tuple[int, str, str]]) -> None:
+        """Index the pages of cards copied forward, given as (card index, fingerprint, source job)"""
+        created_at = datetime.now()
+        with self.db.get_connection() as conn:
+            conn.executemany(COPY_PAGE_SQL, [
+                (job_id, card_idx, created_at, source_job, store_id or "", fingerprint)
+                for card_idx, fingerprint, source_job in cards
+            ])
+
+    def copy_job(self, source_job_id: str, job_id: str) -> None:
+        """Index every page of `source_job_id` under `job_id` too"""
+        with self.db.get_connection() as conn:
+            conn.execute(COPY_JOB_SQL, (job_id, datetime.now(), source_job_id))
+
+    def pages(self, job_id: str) -> List[Dict]:
+        """Cached pages of a job in card order, with the file path of each"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT store_key, card_idx, name, fingerprint, digest
+                FROM modal_pages WHERE job_id = ?
+                ORDER BY store_key, card_idx
+            """, (job_id,))
+            return [{
+                "store_id": store_key or None,
+                "card_idx": card_idx,
+                "name": name,
+                "fingerprint": fingerprint,
+                "path": self.path(digest),
+            } for store_key, card_idx, name, fingerprint, digest in cursor.fetchall()]
+
+    def count(self, job_id: str) -> int:
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM modal_pages WHERE job_id = ?", (job_id,))
+            return cursor.fetchone()[0]
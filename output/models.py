@@ -1,15 +1,87 @@
+from contextlib import nullcontext
 from datetime import datetime
+import re
 import sqlite3
-from typing import Optional, List, Dict
+import threading
+from typing import Callable, Iterator, Optional, List, Dict, Tuple
 import json
+from output.normalize import NORMALIZED_COLUMNS, normalize_deals
+
+# Rows per executemany() call when saving deals
+SAVE_CHUNK_SIZE = 500
+
+# Kept as module constants so sqlite3's per-connection statement cache reuses them
+INSERT_DEAL_SQL = """INSERT INTO deals 
+                     (job_id, product_name, price, original_price, 
+                      discount, description, details, created_at,
+                      product_id, store_id, fingerprint,
+                      price_value, original_price_value, per_unit_price, per_unit, discount_pct, promo_type)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+INSERT_PRODUCT_SQL = """INSERT OR IGNORE INTO products (normalized_name, display_name, first_seen)
+                        VALUES (?, ?, ?)"""
+SELECT_DEALS_SQL = """SELECT id, product_name, price, original_price, 
+                             discount, description, details, store_id,
+                             price_value, original_price_value, per_unit_price, per_unit, discount_pct, promo_type
+                      FROM deals 
+                      WHERE job_id = ? AND id > ?
+                      ORDER BY id"""
+# Copies one card's deals in one store from an earlier job into a new one
+COPY_FORWARD_SQL = """INSERT INTO deals
+                      (job_id, product_name, price, original_price,
+                       discount, description, details, created_at,
+                       product_id, store_id, fingerprint,
+                       price_value, original_price_value, per_unit_price, per_unit, discount_pct, promo_type)
+                      SELECT ?, product_name, price, original_price,
+                             discount, description, details, ?,
+                             product_id, store_id, fingerprint,
+                             price_value, original_price_value, per_unit_price, per_unit, discount_pct, promo_type
+                      FROM deals
+                      WHERE job_id = ? AND fingerprint = ? AND COALESCE(store_id, '') = ?
+                        AND job_id IN (SELECT job_id FROM jobs WHERE status = 'completed')
+                      ORDER BY id"""
+UPSERT_FINGERPRINT_SQL = """INSERT INTO card_fingerprints (store_key, fingerprint, job_id, updated_at)
+                            VALUES (?, ?, ?, ?)
+                            ON CONFLICT (store_key, fingerprint)
+                            DO UPDATE SET job_id = excluded.job_id, updated_at = excluded.updated_at"""
+
+# Rows fetched per round trip when streaming a job's deals
+STREAM_FETCH_SIZE = 500
+
+def normalize_product_name(name: str) -> str:
+    """Key of the products table: lowercase words, trademark signs and punctuation dropped"""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", (name or "").lower()).split())
+
+def is_parsed_deal(record: Dict) -> bool:
+    """Whether a saved deal came from a real parse: it has both a name and a price"""
+    return bool((record.get("name") or "").strip()) and (record.get("price") or "").strip() not in ("", "N/A")
 
 class Database:
     def __init__(self, db_path: str = "kroger_scraper.db"):
         self.db_path = db_path
+        self._local = threading.local()
         self.init_db()
 
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        """Persistent connection for the calling thread, opened in WAL mode on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, cached_statements=256)
+            # WAL lets status polls read while a scrape is writing
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def connect(self):
+        """Dedicated connection that may be handed between threads (e.g. a streaming response)"""
+        return sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+
+    def close(self) -> None:
+        """Close the calling thread's connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
 
     def init_db(self):
         """Initialize database tables"""
@@ -48,17 +120,161 @@ class Database:
             
             conn.commit()
 
+        self.migrate()
+
+    def migrate(self) -> None:
+        """Bring the schema up to date, one numbered migration at a time
+
+        The applied version is kept in PRAGMA user_version, so each migration
+        runs exactly once per database file.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                migration(self, cursor)
+                cursor.execute(f"PRAGMA user_version = {number}")
+                conn.commit()
+
+    def ensure_column(self, cursor, table: str, column: str, definition: str) -> None:
+        """Add a column to a table created by an older version of the schema"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+# ================= MIGRATIONS =================
+def _add_wait_stats(db: Database, cursor) -> None:
+    db.ensure_column(cursor, "jobs", "wait_stats", "JSON")
+
+def _add_lookup_indexes(db: Database, cursor) -> None:
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_deals_job_id ON deals (job_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_started ON jobs (status, started_at)")
+
+def _add_products_and_price_values(db: Database, cursor) -> None:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS products (
+            product_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            normalized_name TEXT NOT NULL UNIQUE,
+            display_name TEXT NOT NULL,
+            first_seen TIMESTAMP NOT NULL
+        )
+    """)
+    db.ensure_column(cursor, "deals", "product_id", "INTEGER REFERENCES products (product_id)")
+    db.ensure_column(cursor, "deals", "price_value", "REAL")
+    db.ensure_column(cursor, "deals", "original_price_value", "REAL")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_deals_product_id ON deals (product_id)")
+
+    # Backfill deals saved before this migration
+    rows = cursor.execute("SELECT id, product_name, created_at FROM deals").fetchall()
+    cursor.executemany(INSERT_PRODUCT_SQL, [
+        (normalize_product_name(name), name, created_at) for _, name, created_at in rows
+    ])
+    product_ids = dict(cursor.execute("SELECT normalized_name, product_id FROM products").fetchall())
+    # The price values themselves are backfilled by _add_normalized_prices
+    cursor.executemany(
+        "UPDATE deals SET product_id = ? WHERE id = ?",
+        [(product_ids[normalize_product_name(name)], deal_id) for deal_id, name, _ in rows]
+    )
+
+def _add_store_ids(db: Database, cursor) -> None:
+    # NULL store_id: the session's default store (every deal saved before this migration)
+    db.ensure_column(cursor, "deals", "store_id", "TEXT")
+    db.ensure_column(cursor, "jobs", "stores", "JSON")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_deals_job_store ON deals (job_id, store_id)")
+
+def _add_card_fingerprints(db: Database, cursor) -> None:
+    # Latest job holding the deals of each listing card, per store ('' = default store)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS card_fingerprints (
+            store_key TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            job_id TEXT NOT NULL,
+            updated_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (store_key, fingerprint)
+        )
+    """)
+    db.ensure_column(cursor, "deals", "fingerprint", "TEXT")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_deals_job_fingerprint ON deals (job_id, fingerprint)")
+
+def _add_modal_pages(db: Database, cursor) -> None:
+    # Index of the raw modal HTML kept in the on-disk cache (see output/html_cache.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS modal_pages (
+            job_id TEXT NOT NULL,
+            store_key TEXT NOT NULL,
+            card_idx INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            fingerprint TEXT,
+            digest TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (job_id, store_key, card_idx)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_modal_pages_fingerprint ON modal_pages (job_id, fingerprint)")
+
+def _add_normalized_prices(db: Database, cursor) -> None:
+    # Numeric price columns computed by output/normalize.py (price_value and
+    # original_price_value already exist and are recomputed by the backfill)
+    for column, sql_type in zip(NORMALIZED_COLUMNS, ("REAL", "REAL", "REAL", "TEXT", "REAL", "TEXT")):
+        db.ensure_column(cursor, "deals", column, sql_type)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_deals_job_promo ON deals (job_id, promo_type)")
+
+    # Backfill deals saved before this migration, one batch at a time
+    rows = cursor.execute("SELECT id, product_name, price, original_price, details FROM deals").fetchall()
+    for start in range(0, len(rows), SAVE_CHUNK_SIZE):
+        chunk = rows[start:start + SAVE_CHUNK_SIZE]
+        records = [{"name": name, "price": price, "original_price": original_price,
+                    "details": json.loads(details or "{}")}
+                   for _, name, price, original_price, details in chunk]
+        cursor.executemany(
+            f"UPDATE deals SET {', '.join(c + ' = ?' for c in NORMALIZED_COLUMNS)} WHERE id = ?",
+            [normalized + (deal_id,) for (deal_id, *_), normalized in zip(chunk, normalize_deals(records))]
+        )
+
+def _add_job_diffs(db: Database, cursor) -> None:
+    # Deal diffs between two jobs (see output/diff.py); body is the full JSON response
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_diffs (
+            from_job TEXT NOT NULL,
+            to_job TEXT NOT NULL,
+            summary JSON NOT NULL,
+            body TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (from_job, to_job)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_completed ON jobs (status, completed_at)")
+
+def _add_job_timings(db: Database, cursor) -> None:
+    # Per-phase span histograms of the job (see scraper/metrics.py)
+    db.ensure_column(cursor, "jobs", "timings", "JSON")
+
+# Append only: position N is schema version N + 1
+MIGRATIONS = [
+    _add_wait_stats,
+    _add_lookup_indexes,
+    _add_products_and_price_values,
+    _add_store_ids,
+    _add_card_fingerprints,
+    _add_modal_pages,
+    _add_normalized_prices,
+    _add_job_diffs,
+    _add_job_timings,
+]
+
 class JobManager:
     def __init__(self, db: Database):
         self.db = db
 
-    def create_job(self, job_id: str) -> None:
-        """Create a new job record"""
+    def create_job(self, job_id: str, status: str = "running", stores: Optional[List[str]] = None) -> None:
+        """Create a new job record, or start one the scheduler queued earlier"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "INSERT INTO jobs (job_id, status, started_at) VALUES (?, ?, ?)",
-                (job_id, "running", datetime.now())
+                """INSERT INTO jobs (job_id, status, started_at, stores) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (job_id) DO UPDATE SET status = excluded.status, started_at = excluded.started_at,
+                                                      stores = COALESCE(excluded.stores, stores)""",
+                (job_id, status, datetime.now(), json.dumps(stores) if stores is not None else None)
             )
             conn.commit()
 
@@ -66,7 +282,7 @@ class JobManager:
         """Update job status and completion time"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            if status == "completed" or status == "failed":
+            if status in ("completed", "partial", "failed", "cancelled"):
                 cursor.execute(
                     "UPDATE jobs SET status = ?, completed_at = ?, error = ? WHERE job_id = ?",
                     (status, datetime.now(), error, job_id)
@@ -78,7 +294,8 @@ class JobManager:
                 )
             conn.commit()
 
-    def update_job_stats(self, job_id: str, total_cards: int, successful: int, failed: int) -> None:
+    def update_job_stats(self, job_id: str, total_cards: int, successful: int, failed: int,
+                         wait_stats: Optional[Dict] = None, timings: Optional[Dict] = None) -> None:
         """Update job scraping statistics"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
@@ -86,9 +303,13 @@ class JobManager:
                 """UPDATE jobs 
                    SET total_cards = ?, 
                        successful_scrapes = ?, 
-                       failed_scrapes = ? 
+                       failed_scrapes = ?,
+                       wait_stats = COALESCE(?, wait_stats),
+                       timings = COALESCE(?, timings)
                    WHERE job_id = ?""",
-                (total_cards, successful, failed, job_id)
+                (total_cards, successful, failed,
+                 json.dumps(wait_stats) if wait_stats is not None else None,
+                 json.dumps(timings) if timings is not None else None, job_id)
             )
             conn.commit()
 
@@ -98,7 +319,8 @@ class JobManager:
             cursor = conn.cursor()
             cursor.execute(
                 """SELECT job_id, status, started_at, completed_at, 
-                          total_cards, successful_scrapes, failed_scrapes, error 
+                          total_cards, successful_scrapes, failed_scrapes, error,
+                          wait_stats, stores, timings
                    FROM jobs WHERE job_id = ?""",
                 (job_id,)
             )
@@ -114,9 +336,22 @@ class JobManager:
                 "total_cards": row[4],
                 "successful_scrapes": row[5],
                 "failed_scrapes": row[6],
-                "error": row[7]
+                "error": row[7],
+                "wait_stats": json.loads(row[8]) if row[8] else {},
+                "stores": json.loads(row[9]) if row[9] else [],
+                "timings": json.loads(row[10]) if row[10] else {}
             }
 
+    def fail_interrupted(self) -> None:
+        """Jobs left queued or running by a previous process will never finish; run once at startup"""
+        with self.db.get_connection() as conn:
+            conn.execute(
+                """UPDATE jobs SET status = 'failed', completed_at = ?, error = 'Interrupted by restart'
+                   WHERE status IN ('queued', 'running')""",
+                (datetime.now(),)
+            )
+            conn.commit()
+
     def get_current_job(self) -> Optional[Dict]:
         """Get currently running job if any"""
         with self.db.get_connection() as conn:
@@ -136,52 +371,230 @@ class JobManager:
                 "started_at": row[1]
             }
 
+# Keys of the parse_kroger_modal schema that map onto deals table columns
+MODAL_SCHEMA_COLUMNS = {
+    "competitor_product": "name",
+    "competitor_price": "price",
+    "original_price": "original_price",
+    "offer_description": "description",
+}
+
+# Added by the scraper rather than the parser: own columns in either schema, never details
+DEAL_TAGS = ("store_id", "fingerprint")
+
 class DealManager:
     def __init__(self, db: Database):
         self.db = db
 
+    def to_record(self, deal: Dict) -> Dict:
+        """Accept deals in either the parse_deal_details or the parse_kroger_modal schema"""
+        if "competitor_product" not in deal:
+            return deal
+        record = {column: deal.get(key, "") for key, column in MODAL_SCHEMA_COLUMNS.items()}
+        record["discount"] = ""
+        record.update({tag: deal.get(tag) for tag in DEAL_TAGS})
+        record["details"] = {key: value for key, value in deal.items()
+                             if key not in MODAL_SCHEMA_COLUMNS and key not in DEAL_TAGS}
+        return record
+
+    def to_row(self, job_id: str, deal: Dict, created_at: datetime, product_ids: Dict[str, int],
+               normalized: tuple) -> tuple:
+        return (
+            job_id,
+            deal.get("name", ""),
+            deal.get("price", ""),
+            deal.get("original_price", ""),
+            deal.get("discount", ""),
+            deal.get("description", ""),
+            json.dumps(deal.get("details", {})),
+            created_at,
+            product_ids[normalize_product_name(deal.get("name", ""))],
+            deal.get("store_id"),
+            deal.get("fingerprint"),
+            *normalized
+        )
+
+    def product_ids(self, cursor, records: List[Dict], created_at: datetime) -> Dict[str, int]:
+        """Upsert the batch's products and return their ids by normalized name"""
+        names = {}
+        for record in records:
+            names.setdefault(normalize_product_name(record.get("name", "")), record.get("name", ""))
+        cursor.executemany(INSERT_PRODUCT_SQL, [(key, name, created_at) for key, name in names.items()])
+
+        ids = {}
+        keys = list(names)
+        for start in range(0, len(keys), SAVE_CHUNK_SIZE):
+            chunk = keys[start:start + SAVE_CHUNK_SIZE]
+            cursor.execute(
+                f"SELECT normalized_name, product_id FROM products WHERE normalized_name IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            ids.update(cursor.fetchall())
+        return ids
+
     def save_deals(self, job_id: str, deals: List[Dict]) -> None:
-        """Save multiple deals for a job"""
+        """Save multiple deals for a job in one transaction, chunked executemany inserts"""
+        created_at = datetime.now()
+        records = [self.to_record(deal) for deal in deals]
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            product_ids = self.product_ids(cursor, records, created_at)
+            for start in range(0, len(records), SAVE_CHUNK_SIZE):
+                chunk = records[start:start + SAVE_CHUNK_SIZE]
+                # Price strings are parsed column-wise for the whole chunk at once
+                cursor.executemany(
+                    INSERT_DEAL_SQL,
+                    [self.to_row(job_id, record, created_at, product_ids, normalized)
+                     for record, normalized in zip(chunk, normalize_deals(chunk))]
+                )
+            # Only cards whose modal parsed into a priced product: an empty or timed-out
+            # modal still yields a placeholder deal, which must not be copied forward
+            fingerprints = {(record.get("store_id") or "", record["fingerprint"])
+                            for record in records if record.get("fingerprint") and is_parsed_deal(record)}
+            cursor.executemany(UPSERT_FINGERPRINT_SQL, [
+                (store_key, fingerprint, job_id, created_at) for store_key, fingerprint in fingerprints
+            ])
+            conn.commit()
+
+    def known_fingerprints(self, store_id: Optional[str], fingerprints: List[str]) -> Dict[str, str]:
+        """fingerprint -> completed job holding its deals, for the cards already scraped in this store"""
+        known = {}
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            for deal in deals:
+            for start in range(0, len(fingerprints), SAVE_CHUNK_SIZE):
+                chunk = fingerprints[start:start + SAVE_CHUNK_SIZE]
                 cursor.execute(
-                    """INSERT INTO deals 
-                       (job_id, product_name, price, original_price, 
-                        discount, description, details, created_at)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (
-                        job_id,
-                        deal.get("name", ""),
-                        deal.get("price", ""),
-                        deal.get("original_price", ""),
-                        deal.get("discount", ""),
-                        deal.get("description", ""),
-                        json.dumps(deal.get("details", {})),
-                        datetime.now()
-                    )
+                    f"""SELECT card_fingerprints.fingerprint, card_fingerprints.job_id
+                        FROM card_fingerprints JOIN jobs ON jobs.job_id = card_fingerprints.job_id
+                        WHERE jobs.status = 'completed' AND card_fingerprints.store_key = ?
+                          AND card_fingerprints.fingerprint IN ({','.join('?' * len(chunk))})
+                          AND EXISTS (SELECT 1 FROM deals
+                                      WHERE deals.job_id = card_fingerprints.job_id
+                                        AND deals.fingerprint = card_fingerprints.fingerprint
+                                        AND COALESCE(deals.store_id, '') = card_fingerprints.store_key)""",
+                    [store_id or ""] + chunk
                 )
+                known.update(cursor.fetchall())
+        return known
+
+    def copy_forward(self, job_id: str, store_id: Optional[str], sources: Dict[str, str]) -> List[str]:
+        """Copy the deals of unchanged cards (fingerprint -> source job) into `job_id`
+
+        Only completed source jobs are copied from. Returns the fingerprints that had
+        deals to copy; the others must be scraped again.
+        """
+        created_at = datetime.now()
+        copied = []
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            for fingerprint, source_job in sources.items():
+                cursor.execute(COPY_FORWARD_SQL, (job_id, created_at, source_job, fingerprint, store_id or ""))
+                if cursor.rowcount > 0:
+                    copied.append(fingerprint)
+            # The new job is now where the next run copies these cards from
+            cursor.executemany(UPSERT_FINGERPRINT_SQL, [
+                (store_id or "", fingerprint, job_id, created_at) for fingerprint in copied
+            ])
             conn.commit()
+        return copied
 
     def get_deals(self, job_id: str) -> List[Dict]:
         """Get all deals for a job"""
+        deals, _ = self.get_deals_page(job_id)
+        for deal in deals:
+            del deal["id"]
+        return deals
+
+    def count_deals(self, job_id: str) -> int:
+        with self.db.get_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM deals WHERE job_id = ?", (job_id,)).fetchone()[0]
+
+    def get_deals_page(self, job_id: str, limit: Optional[int] = None, after_id: int = 0) -> Tuple[List[Dict], Optional[int]]:
+        """Deals with id > after_id, plus the cursor for the next page (None on the last page)"""
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                """SELECT product_name, price, original_price, 
-                          discount, description, details
-                   FROM deals 
-                   WHERE job_id = ?""",
-                (job_id,)
-            )
+            sql = SELECT_DEALS_SQL + (" LIMIT ?" if limit else "")
+            params = (job_id, after_id, limit) if limit else (job_id, after_id)
             deals = []
-            for row in cursor.fetchall():
+            for row in cursor.execute(sql, params).fetchall():
                 deals.append({
-                    "name": row[0],
-                    "price": row[1],
-                    "original_price": row[2],
-                    "discount": row[3],
-                    "description": row[4],
-                    "details": json.loads(row[5])
+                    "id": row[0],
+                    "name": row[1],
+                    "price": row[2],
+                    "original_price": row[3],
+                    "discount": row[4],
+                    "description": row[5],
+                    "details": json.loads(row[6]),
+                    "store_id": row[7],
+                    **dict(zip(NORMALIZED_COLUMNS, row[8:]))
                 })
-            return deals
+            next_after_id = deals[-1]["id"] if limit and len(deals) == limit else None
+            return deals, next_after_id
+
+    def stream_deals_ndjson(self, job_id: str, after_id: int = 0) -> Iterator[bytes]:
+        """One NDJSON line per deal, straight from the cursor
+
+        The details column already holds JSON, so it is spliced in as-is rather
+        than decoded and re-encoded. Uses its own connection because a streaming
+        response may resume the generator on a different thread.
+        """
+        conn = self.db.connect()
+        try:
+            cursor = conn.execute(SELECT_DEALS_SQL, (job_id, after_id))
+            while True:
+                rows = cursor.fetchmany(STREAM_FETCH_SIZE)
+                if not rows:
+                    break
+                yield "".join(
+                    '{"id":%d,"name":%s,"price":%s,"original_price":%s,"discount":%s,"description":%s,"details":%s,"store_id":%s,'
+                    '"price_value":%s,"original_price_value":%s,"per_unit_price":%s,"per_unit":%s,"discount_pct":%s,"promo_type":%s}\n' % (
+                        row[0], json.dumps(row[1]), json.dumps(row[2]), json.dumps(row[3]),
+                        json.dumps(row[4]), json.dumps(row[5]), row[6] or "{}", json.dumps(row[7]),
+                        *(json.dumps(value) for value in row[8:])
+                    )
+                    for row in rows
+                ).encode("utf-8")
+        finally:
+            conn.close()
+
+class DealWriter:
+    """Buffers a job's deals and flushes them to the deals table in small batches
+
+    `on_flush` runs after every flush so job stats track what is already stored,
+    and /get-data can serve partial results while the job is still running.
+    With `timings` (a scraper.metrics.JobTimings) each save is a "db_write" span.
+    """
+    def __init__(self, deal_manager: DealManager, job_id: str, batch_size: int = 50,
+                 on_flush: Optional[Callable[[int], None]] = None, timings=None):
+        self.deal_manager = deal_manager
+        self.job_id = job_id
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self.timings = timings
+        self.saved = 0
+        self._buffer: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, deals: List[Dict]) -> None:
+        with self._lock:
+            self._buffer.extend(deals)
+            if len(self._buffer) < self.batch_size:
+                return
+            self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Flush the last partial batch once the job adds no more deals"""
+        self.flush()
+
+    def _flush_locked(self) -> None:
+        batch, self._buffer = self._buffer, []
+        if batch:
+            with self.timings.span("db_write") if self.timings else nullcontext():
+                self.deal_manager.save_deals(self.job_id, batch)
+            self.saved += len(batch)
+        if self.on_flush:
+            self.on_flush(self.saved)
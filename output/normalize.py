@@ -0,0 +1,146 @@
+"""Columnar price and size normalization for batches of scraped deals
+
+Price strings ("$1.49/LB", "2 for $5", "Buy 2 Get 2 FREE", "Save $1") and
+sizes ("16 oz", "1.5 L") are parsed once per batch with precompiled patterns
+and pandas string/NumPy operations, so every saved deal carries numeric
+columns instead of text that analytics would have to re-parse. This is the
+only place price text is turned into numbers.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy
+    import pandas
+except ImportError:  # optional: the normalized columns stay NULL without it
+    numpy = pandas = None
+
+# Columns produced per deal, in the order normalize_deals() returns them. price_value
+# is what one item costs once the promotion is applied; original_price_value is the
+# amount in the original (struck-through) price text.
+NORMALIZED_COLUMNS = ("price_value", "original_price_value", "per_unit_price", "per_unit",
+                      "discount_pct", "promo_type")
+
+PRICE_VALUE = re.compile(r"\$\s*(\d+(?:,\d{3})*(?:\.\d+)?)")
+BARE_NUMBER = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*$")
+CENTS = re.compile(r"(\d+)\s*¢")
+# "2 for $5" or "2/$5", but not a "$2/$3" pair of amounts
+MULTI_BUY = re.compile(r"(?<![$\d.])(\d+)\s*(?:for|/)\s*\$\s*(\d+(?:\.\d+)?)", re.I)
+# "Save $1.00": an amount off the original price, not a price
+SAVE = re.compile(r"\bsave\s*\$\s*(\d+(?:\.\d+)?)", re.I)
+BUY_GET = re.compile(r"buy\s*(\d+)\s*,?\s*get\s*(\d+)\s*(free|(\d+)\s*%\s*off)", re.I)
+PERCENT_OFF = re.compile(r"(\d+(?:\.\d+)?)\s*%\s*off", re.I)
+PRICED_PER = re.compile(r"(?:/|\bper\s+)\s*(lb|oz|ea|each)\b", re.I)
+SIZE = re.compile(r"(\d+(?:\.\d+)?)\s*(fl\.?\s*oz|oz|lbs?|kg|g|ml|l|gal|ct|count|pk|pack|each|ea)\b", re.I)
+
+# Size unit -> (factor to the base unit, base unit)
+UNIT_BASES: Dict[str, Tuple[float, str]] = {
+    "oz": (1.0, "oz"),
+    "lb": (1.0, "lb"),
+    "lbs": (1.0, "lb"),
+    "g": (1 / 28.3495, "oz"),
+    "kg": (2.20462, "lb"),
+    "fl oz": (1.0, "fl oz"),
+    "ml": (1 / 29.5735, "fl oz"),
+    "l": (33.814, "fl oz"),
+    "gal": (128.0, "fl oz"),
+    "ct": (1.0, "ct"),
+    "count": (1.0, "ct"),
+    "pk": (1.0, "ct"),
+    "pack": (1.0, "ct"),
+    "each": (1.0, "ct"),
+    "ea": (1.0, "ct"),
+}
+
+
+def _amount(text: "pandas.Series") -> "pandas.Series":
+    """First dollar amount of every string ("$1.49/LB" -> 1.49), else a bare number or
+    cents; NaN for "Buy 2 Get 2 FREE" and the like"""
+    dollars = pandas.to_numeric(text.str.extract(PRICE_VALUE)[0].str.replace(",", "", regex=False), errors="coerce")
+    bare = pandas.to_numeric(text.str.extract(BARE_NUMBER)[0], errors="coerce")
+    cents = pandas.to_numeric(text.str.extract(CENTS)[0], errors="coerce") / 100
+    return dollars.fillna(bare).fillna(cents)
+
+
+def _unit_key(unit: "pandas.Series") -> "pandas.Series":
+    return unit.str.lower().str.replace(r"fl\.?\s*oz", "fl oz", regex=True)
+
+
+def normalize_frame(frame: "pandas.DataFrame") -> "pandas.DataFrame":
+    """Add NORMALIZED_COLUMNS to a frame with price, original_price, name and size text columns"""
+    price = frame["price"].fillna("").astype(str)
+    original = _amount(frame["original_price"].fillna("").astype(str))
+    listed = _amount(price)
+
+    multi = price.str.extract(MULTI_BUY)
+    multi_qty = pandas.to_numeric(multi[0], errors="coerce")
+    multi_total = pandas.to_numeric(multi[1], errors="coerce")
+
+    buy_get = price.str.extract(BUY_GET)
+    buy_qty = pandas.to_numeric(buy_get[0], errors="coerce")
+    get_qty = pandas.to_numeric(buy_get[1], errors="coerce")
+    # Share of the get items still paid for: 0 when free, 0.5 for "50% off"
+    get_paid = 1 - pandas.to_numeric(buy_get[3], errors="coerce").fillna(100) / 100
+    buy_get_base = original.fillna(listed)
+
+    percent_off = pandas.to_numeric(price.str.extract(PERCENT_OFF)[0], errors="coerce")
+    saved = pandas.to_numeric(price.str.extract(SAVE)[0], errors="coerce")
+    is_multi = multi_qty.gt(0)
+    is_bogo = buy_qty.gt(0) & ~is_multi
+    is_percent = percent_off.notna() & ~is_multi & ~is_bogo
+    is_save = saved.notna() & ~is_multi & ~is_bogo & ~is_percent
+
+    price_value = pandas.Series(numpy.select(
+        [is_multi, is_bogo, is_percent, is_save],
+        [multi_total / multi_qty,
+         buy_get_base * (buy_qty + get_qty * get_paid) / (buy_qty + get_qty),
+         original * (1 - percent_off / 100),
+         original - saved],
+        default=listed,
+    ), index=frame.index)
+
+    # Per-unit price: straight from "/lb" style prices, otherwise unit price over the pack size
+    priced_per = _unit_key(price.str.extract(PRICED_PER)[0]).replace({"ea": "ct", "each": "ct"})
+    size_text = frame["size"].fillna("").astype(str).where(lambda s: s.str.contains(r"\d", regex=True),
+                                                           frame["name"].fillna("").astype(str))
+    size = size_text.str.extract(SIZE)
+    size_key = _unit_key(size[1])
+    factor = size_key.map({unit: base[0] for unit, base in UNIT_BASES.items()})
+    size_base = size_key.map({unit: base[1] for unit, base in UNIT_BASES.items()})
+    size_amount = pandas.to_numeric(size[0], errors="coerce") * factor
+    size_amount = size_amount.where(size_amount.gt(0))
+
+    frame = frame.copy()
+    frame["price_value"] = price_value.round(4)
+    frame["original_price_value"] = original
+    frame["per_unit_price"] = price_value.where(priced_per.notna(), price_value / size_amount).round(4)
+    frame["per_unit"] = priced_per.fillna(size_base).where(frame["per_unit_price"].notna())
+    discount = (original - price_value) / original * 100
+    frame["discount_pct"] = percent_off.where(is_percent, discount.where(original.gt(0) & discount.gt(0))).round(1)
+    frame["promo_type"] = pandas.Series(numpy.select(
+        [is_bogo, is_multi, is_percent, frame["discount_pct"].gt(0)],
+        ["bogo", "multi_buy", "percent_off", "sale"],
+        default=None,
+    ), index=frame.index)
+    return frame
+
+
+def _size_of(record: Dict) -> str:
+    details = record.get("details")
+    size = details.get("competitor_product_size", "") if isinstance(details, dict) else ""
+    return "" if size in (None, "N/A") else str(size)
+
+
+def normalize_deals(records: List[Dict]) -> List[Tuple[Optional[float], Optional[float], Optional[float],
+                                                      Optional[str], Optional[float], Optional[str]]]:
+    """NORMALIZED_COLUMNS for each deal record, in order; all None without pandas"""
+    if pandas is None or not records:
+        return [(None,) * len(NORMALIZED_COLUMNS) for _ in records]
+    frame = normalize_frame(pandas.DataFrame({
+        "name": [record.get("name", "") for record in records],
+        "price": [record.get("price", "") for record in records],
+        "original_price": [record.get("original_price", "") for record in records],
+        "size": [_size_of(record) for record in records],
+    }))
+    columns = frame[list(NORMALIZED_COLUMNS)].astype(object)
+    return list(columns.where(columns.notna(), None).itertuples(index=False, name=None))
@@ -0,0 +1,97 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+
+class JobRegistry:
+    """Per-job status records in a small SQLite file
+
+    Each job is one row keyed by job_id, so a status poll is a primary-key
+    lookup no matter how many jobs have run, and every update is a single
+    atomic UPDATE instead of rewriting a shared JSON file. WAL mode lets any
+    number of pollers read while the scraper threads write.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self.get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_registry (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    record JSON NOT NULL,
+                    updated_at TIMESTAMP NOT NULL
+                )
+            """)
+
+    def get_connection(self):
+        """Persistent connection for the calling thread, opened in WAL mode on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, job_id: str, status: str = "queued", **fields) -> None:
+        """Register a new job"""
+        record = {"status": status, "queued_at": datetime.now().isoformat(), **fields}
+        with self.get_connection() as conn:
+            conn.execute(
+                "INSERT INTO job_registry (job_id, status, record, updated_at) VALUES (?, ?, ?, ?)",
+                (job_id, status, json.dumps(record), datetime.now())
+            )
+
+    def update(self, job_id: str, **fields) -> None:
+        """Merge `fields` into the job's record; a `status` field also moves the job's state"""
+        with self.get_connection() as conn:
+            conn.execute(
+                """UPDATE job_registry
+                   SET status = COALESCE(?, status),
+                       record = json_patch(record, ?),
+                       updated_at = ?
+                   WHERE job_id = ?""",
+                (fields.get("status"), json.dumps(fields), datetime.now(), job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        row = self.get_connection().execute(
+            "SELECT record FROM job_registry WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def fail_interrupted(self) -> None:
+        """Jobs still queued or running belong to a process that is gone; run once at startup"""
+        with self.get_connection() as conn:
+            conn.execute(
+                """UPDATE job_registry
+                   SET status = 'failed',
+                       record = json_patch(record, '{"status": "failed", "error": "Interrupted by restart"}'),
+                       updated_at = ?
+                   WHERE status IN ('queued', 'running')""",
+                (datetime.now(),)
+            )
+
+    def import_status_file(self, status_file: str) -> None:
+        """One-time import of the jobs kept in a legacy status.json"""
+        if not os.path.exists(status_file) or os.path.getsize(status_file) == 0:
+            return
+        with open(status_file, "r", encoding="utf-8") as f:
+            jobs = json.load(f).get("jobs", {})
+        rows = []
+        for job_id, job in jobs.items():
+            if job.get("status") in ("queued", "running"):
+                # Whatever wrote status.json is not running anymore
+                job = {**job, "status": "failed", "error": "Interrupted by restart"}
+            rows.append((job_id, job.get("status", "failed"), json.dumps(job), datetime.now()))
+        with self.get_connection() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO job_registry (job_id, status, record, updated_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        os.replace(status_file, status_file + ".imported")
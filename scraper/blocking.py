@@ -0,0 +1,152 @@
+"""Request blocking for the scraper's browsers
+
+    python -m scraper.blocking                       # weekly ad, default profile
+    python -m scraper.blocking https://www.kroger.com --block-types image,font
+
+The command loads the page once without and once with the blocking profile
+and reports the requests and bytes saved.
+"""
+import argparse
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+# Chrome content setting prefs, for types whose URLs carry no telling extension
+# (Kroger's product images are served without one)
+CONTENT_SETTING_PREFS = {
+    "image": "profile.managed_default_content_settings.images",
+}
+
+# setBlockedURLs matches URL patterns only, so resource types map to extensions
+RESOURCE_TYPE_PATTERNS = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"],
+    "font": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*.ogg*"],
+}
+
+# Analytics, ads and session replay: nothing on the weekly ad depends on them
+DEFAULT_DENY_DOMAINS = [
+    "doubleclick.net", "googlesyndication.com", "google-analytics.com", "googletagmanager.com",
+    "facebook.net", "facebook.com", "bing.com", "pinterest.com", "tiktok.com", "snapchat.com",
+    "hotjar.com", "quantummetric.com", "demdex.net", "omtrdc.net", "adobedtm.com",
+    "criteo.com", "criteo.net", "adsrvr.org", "branch.io", "newrelic.com", "nr-data.net",
+]
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+class BlockingProfile:
+    """Which requests the browser should never make
+
+    `block_types` are resource types ("image", "font", "media"); `deny_domains`
+    are blocked along with their subdomains. `allow_domains` exempt domains
+    from the domain deny list. DevTools URL blocking has no allow rules, so
+    they cannot exempt a domain from resource type blocking.
+    """
+
+    def __init__(self, block_types: Iterable[str] = ("image", "font", "media"),
+                 deny_domains: Iterable[str] = DEFAULT_DENY_DOMAINS,
+                 allow_domains: Iterable[str] = (), extra_patterns: Iterable[str] = ()):
+        self.block_types = [t for t in block_types if t in RESOURCE_TYPE_PATTERNS]
+        self.allow_domains = list(allow_domains)
+        self.deny_domains = [d for d in deny_domains if not any(d == a or d.endswith("." + a) for a in self.allow_domains)]
+        self.extra_patterns = list(extra_patterns)
+
+    @classmethod
+    def from_env(cls) -> Optional["BlockingProfile"]:
+        """Profile from KROGER_BLOCK_* variables; None when KROGER_BLOCKING=off"""
+        if os.environ.get("KROGER_BLOCKING", "on").lower() in ("0", "off", "false", "no"):
+            return None
+        return cls(
+            block_types=_split(os.environ.get("KROGER_BLOCK_TYPES", "image,font,media")),
+            deny_domains=DEFAULT_DENY_DOMAINS + _split(os.environ.get("KROGER_BLOCK_DOMAINS")),
+            allow_domains=_split(os.environ.get("KROGER_ALLOW_DOMAINS")),
+            extra_patterns=_split(os.environ.get("KROGER_BLOCK_PATTERNS")),
+        )
+
+    def url_patterns(self) -> List[str]:
+        patterns = [pattern for block_type in self.block_types for pattern in RESOURCE_TYPE_PATTERNS[block_type]]
+        for domain in self.deny_domains:
+            patterns += [f"*://{domain}/*", f"*://*.{domain}/*"]
+        return patterns + self.extra_patterns
+
+    def apply_options(self, options) -> None:
+        """Launch-time part: content settings for types URL patterns can't catch"""
+        prefs = {CONTENT_SETTING_PREFS[t]: 2 for t in self.block_types if t in CONTENT_SETTING_PREFS}
+        if prefs:
+            options.add_experimental_option("prefs", prefs)
+
+    def apply(self, driver) -> None:
+        """Session part: block URL patterns through DevTools (kept for the driver's lifetime)"""
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.url_patterns()})
+
+
+# ================= MEASUREMENT =================
+def traffic_from_entries(entries: Iterable[Dict]) -> Dict[str, int]:
+    """Requests made, requests blocked and bytes received, from performance log entries"""
+    requests = blocked = received = 0
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            requests += 1
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked += 1
+        elif method == "Network.loadingFinished":
+            received += int(params.get("encodedDataLength", 0))
+    return {"requests": requests, "blocked": blocked, "bytes": received}
+
+
+def traffic_from_performance_log(driver) -> Dict[str, int]:
+    """Traffic since the driver's performance log was last read (reading drains it)"""
+    return traffic_from_entries(driver.get_log("performance"))
+
+
+def measure(url: str, profile: Optional[BlockingProfile]) -> Dict[str, int]:
+    """Load `url` in a fresh browser with or without `profile` and count its traffic"""
+    from scraper.kroger_scrapper import build_driver
+    from scraper.waits import PageWaiter, WaitStats, AdaptiveDelay
+
+    driver = build_driver(blocking=profile)
+    try:
+        driver.get(url)
+        PageWaiter(driver, WaitStats(), AdaptiveDelay()).document_ready(timeout=30, baseline=3.0)
+        return traffic_from_performance_log(driver)
+    finally:
+        driver.quit()
+
+
+def main() -> None:
+    from scraper.stores import WEEKLY_AD_URL
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("url", nargs="?", default=WEEKLY_AD_URL)
+    parser.add_argument("--block-types", help="comma separated, default: image,font,media")
+    parser.add_argument("--allow-domains", help="comma separated domains exempt from the deny list")
+    args = parser.parse_args()
+
+    profile = BlockingProfile(
+        block_types=_split(args.block_types) if args.block_types else ("image", "font", "media"),
+        allow_domains=_split(args.allow_domains),
+    )
+    before = measure(args.url, None)
+    after = measure(args.url, profile)
+    report = {
+        "url": args.url,
+        "unblocked": before,
+        "blocked": after,
+        "requests_saved": before["requests"] - after["requests"] + after["blocked"],
+        "bytes_saved": before["bytes"] - after["bytes"],
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,21 @@
 from bs4 import BeautifulSoup
+import os
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+# "bs4" (html.parser) or "lxml" (single-pass, see scraper/lxml_parser.py)
+PARSER_BACKENDS = ("bs4", "lxml")
+DEFAULT_BACKEND = os.environ.get("KROGER_PARSER_BACKEND", "bs4")
 
 # ================= UNIVERSAL PARSING (Both Modal Types) =================
-def parse_kroger_modal(html: str, displayed_name: str) -> List[Dict[str, Any]]:
+def parse_kroger_modal(html: str, displayed_name: str, backend: Optional[str] = None) -> List[Dict[str, Any]]:
+    backend = backend or DEFAULT_BACKEND
+    if backend == "lxml":
+        from scraper.lxml_parser import parse_kroger_modal_lxml
+        return parse_kroger_modal_lxml(html, displayed_name)
+    if backend != "bs4":
+        raise ValueError(f"Unknown parser backend: {backend}")
+
     soup = BeautifulSoup(html, "html.parser")
     results = []
 
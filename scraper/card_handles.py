@@ -0,0 +1,89 @@
+import hashlib
+from typing import List, Optional, Tuple
+
+CARD_SELECTOR = "div.kds-Card.SWA-Omni"
+INDEX_ATTRIBUTE = "data-scrape-idx"
+
+# Numbers every card once and keeps them in window.__scrapeCards
+SNAPSHOT_JS = """
+const [selector, attribute] = arguments;
+const cards = Array.from(document.querySelectorAll(selector));
+cards.forEach((card, idx) => card.setAttribute(attribute, idx));
+window.__scrapeCards = cards;
+return cards.length;
+"""
+
+# Card `idx` from the snapshot, scrolled into view, with its displayed name. A card
+# the page re-rendered is found again by its attribute, or by re-numbering the
+# cards if the new node lost it.
+OPEN_CARD_JS = """
+const [idx, selector, attribute] = arguments;
+const renumber = () => {
+    const cards = Array.from(document.querySelectorAll(selector));
+    cards.forEach((card, i) => card.setAttribute(attribute, i));
+    window.__scrapeCards = cards;
+};
+let card = window.__scrapeCards && window.__scrapeCards[idx];
+if (!card || !card.isConnected) {
+    card = document.querySelector(`${selector}[${attribute}="${idx}"]`);
+    if (!card) {
+        renumber();
+        card = window.__scrapeCards[idx];
+    } else {
+        window.__scrapeCards[idx] = card;
+    }
+}
+if (!card) return null;
+card.scrollIntoView({block: 'center'});
+const img = card.querySelector('img');
+const name = ((img && img.alt) || card.innerText.split('\\n')[0] || '').trim();
+return [card, name];
+"""
+
+# What the listing shows of each snapshot card: [name, image src, price text]
+LISTING_JS = """
+return (window.__scrapeCards || []).map(card => {
+    const img = card.querySelector('img');
+    const price = card.querySelector('.kds-Price');
+    return [
+        ((img && img.alt) || card.innerText.split('\\n')[0] || '').trim(),
+        (img && img.getAttribute('src')) || '',
+        ((price && price.innerText) || card.innerText || '').replace(/\\s+/g, ' ').trim(),
+    ];
+});
+"""
+
+
+def card_fingerprint(name: str, image_src: str, price_text: str) -> str:
+    """Stable hash of a card as seen on the listing; changes whenever its deal does"""
+    return hashlib.sha1("\x1f".join((name, image_src, price_text)).encode("utf-8")).hexdigest()
+
+
+class CardHandles:
+    """O(1) access to the weekly ad's cards by index
+
+    The card list is read once by snapshot(); every later lookup is a single
+    script call that indexes the stored array instead of re-querying the
+    whole list, so the cost per card stays flat however long the ad is.
+    """
+
+    def __init__(self, driver, selector: str = CARD_SELECTOR):
+        self.driver = driver
+        self.selector = selector
+
+    def snapshot(self) -> int:
+        """Number the cards currently on the page and return how many there are"""
+        return self.driver.execute_script(SNAPSHOT_JS, self.selector, INDEX_ATTRIBUTE)
+
+    def open(self, idx: int) -> Optional[Tuple[object, str]]:
+        """(card element, displayed name) with the card scrolled into view, or None if it is gone
+
+        Also the recovery path: call it again after a StaleElementReferenceException
+        and the script resolves the card's current node.
+        """
+        found = self.driver.execute_script(OPEN_CARD_JS, idx, self.selector, INDEX_ATTRIBUTE)
+        return (found[0], found[1]) if found else None
+
+    def fingerprints(self) -> List[str]:
+        """Fingerprint of every snapshot card, in index order, read in a single script call"""
+        return [card_fingerprint(*listing) for listing in self.driver.execute_script(LISTING_JS)]
@@ -1,12 +1,36 @@
+import os
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 from fake_useragent import UserAgent
+from scraper.blocking import BlockingProfile
+
+try:
+    import psutil
+except ImportError:  # optional: without it drivers are only recycled by use count
+    psutil = None
 
 
 # ================= SELENIUM SETUP =================
-def init_driver():
+@lru_cache(maxsize=None)
+def chromedriver_path() -> str:
+    """Resolved once per process; CHROMEDRIVER_PATH skips the download check entirely"""
+    return os.environ.get("CHROMEDRIVER_PATH") or ChromeDriverManager().install()
+
+@lru_cache(maxsize=None)
+def user_agents() -> UserAgent:
+    """Loading the user agent data is the slow part; picking one from it is not"""
+    return UserAgent(browsers=['chrome'])
+
+# Images, fonts, media and trackers are never needed to read the deals (KROGER_BLOCKING=off to load everything)
+DEFAULT_BLOCKING = BlockingProfile.from_env()
+
+def init_driver(blocking: Optional[BlockingProfile] = DEFAULT_BLOCKING):
     opts = Options()
     # opts.add_argument("--headless=new")  # Uncomment for production
     opts.add_argument("--no-sandbox")
@@ -16,11 +40,12 @@ def init_driver():
     opts.add_experimental_option("useAutomationExtension", False)
     opts.add_argument("--window-size=1920,1080")
 
-    ua = UserAgent(browsers=['chrome'])
-    opts.add_argument(f"--user-agent={ua.random}")
+    opts.add_argument(f"--user-agent={user_agents().random}")
+    if blocking:
+        blocking.apply_options(opts)
 
     driver = webdriver.Chrome(
-        service=ChromeService(ChromeDriverManager().install()),
+        service=ChromeService(chromedriver_path()),
         options=opts
     )
     driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
@@ -29,4 +54,149 @@ def init_driver():
             window.chrome = { runtime: {}, loadTimes: () => {}, csi: () => {} };
         """
     })
-    return driver
\ No newline at end of file
+    if blocking:
+        blocking.apply(driver)
+    return driver
+
+
+# ================= DRIVER POOL =================
+def is_healthy(driver) -> bool:
+    """The browser still answers scripts"""
+    try:
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+def browser_memory_mb(driver) -> Optional[float]:
+    """Resident memory of chromedriver and every browser process under it, None without psutil"""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+        return sum(process.memory_info().rss for process in processes) / (1024 * 1024)
+    except Exception:
+        return None
+
+def reset_session(driver) -> None:
+    """Drop what the previous job left behind: extra tabs, cookies, the page itself"""
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    driver.delete_all_cookies()
+    driver.get("about:blank")
+
+
+class DriverPool:
+    """Long-lived pre-warmed browser sessions that jobs borrow and give back
+
+    `size` sessions are kept warm. Borrowing past that starts a fresh browser
+    rather than waiting, so a job never blocks on the pool. A session is
+    retired after `max_uses` borrows, when its browser grows past
+    `max_memory_mb`, or when it stops answering, and a replacement is warmed
+    in the background.
+    """
+
+    def __init__(self, factory: Callable = init_driver, size: int = 2, max_uses: int = 20,
+                 max_memory_mb: float = 1500):
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+        self.created = 0
+        self.recycled = 0
+        self._idle: List = []
+        self._uses: Dict[int, int] = {}
+        self._warming = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def warm(self) -> None:
+        """Start browsers in the background until `size` sessions are idle or on their way"""
+        with self._lock:
+            missing = self.size - len(self._idle) - self._warming
+            if self._closed or missing <= 0:
+                return
+            self._warming += missing
+        for _ in range(missing):
+            threading.Thread(target=self._warm_one, daemon=True).start()
+
+    def _warm_one(self) -> None:
+        try:
+            driver = self._create()
+        except Exception as e:
+            print(f"[POOL] Warming a browser failed: {e}")
+            driver = None
+        with self._lock:
+            self._warming -= 1
+            if driver is not None and not self._closed:
+                self._idle.append(driver)
+                return
+        if driver is not None:
+            self._retire(driver)
+
+    def _create(self):
+        driver = self.factory()
+        with self._lock:
+            self._uses[id(driver)] = 0
+            self.created += 1
+        return driver
+
+    def acquire(self):
+        """A healthy session: a warm one if any is idle, otherwise a new browser"""
+        while True:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                driver = self._create()
+                break
+            if is_healthy(driver):
+                break
+            self._retire(driver)
+        self.warm()
+        return driver
+
+    def release(self, driver) -> None:
+        """Give a session back; worn-out or broken sessions are quit instead"""
+        with self._lock:
+            uses = self._uses.get(id(driver), 0) + 1
+            self._uses[id(driver)] = uses
+            keep = not self._closed and len(self._idle) < self.size
+
+        memory = browser_memory_mb(driver)
+        if keep and uses < self.max_uses and (memory is None or memory < self.max_memory_mb):
+            try:
+                reset_session(driver)
+            except Exception:
+                keep = False
+            if keep:
+                with self._lock:
+                    self._idle.append(driver)
+                return
+
+        self._retire(driver)
+        self.warm()
+
+    def _retire(self, driver) -> None:
+        with self._lock:
+            self._uses.pop(id(driver), None)
+            self.recycled += 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"idle": len(self._idle), "warming": self._warming,
+                    "created": self.created, "recycled": self.recycled}
+
+    def close(self) -> None:
+        """Quit every idle session; sessions still borrowed are quit when released"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._retire(driver)
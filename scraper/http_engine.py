@@ -0,0 +1,243 @@
+import asyncio
+import threading
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urljoin
+
+import httpx
+from bs4 import BeautifulSoup
+from output.models import Database, JobManager, DealManager, DealWriter
+from output.artifacts import export_job
+from output.diff import DiffManager
+from scraper.bs4_parser import parse_kroger_modal
+from scraper.driver import DriverPool, init_driver
+from scraper.kroger_scrapper import tag_store
+from scraper.metrics import JobTimings
+
+KROGER_URL = "https://www.kroger.com"
+WEEKLY_AD_PATH = "/weeklyad/weeklyad"
+# Query parameter picking the store whose weekly ad the listing shows
+STORE_CODE_PARAM = "StoreCode"
+
+DEFAULT_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+# ================= SESSION BOOTSTRAP =================
+class SessionBootstrap:
+    """Cookies and headers of a real browser session, handed to the HTTP client"""
+
+    def __init__(self, cookies: Optional[Dict[str, str]] = None, headers: Optional[Dict[str, str]] = None):
+        self.cookies = cookies or {}
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+
+    @classmethod
+    def from_driver(cls, driver, url: str = KROGER_URL) -> "SessionBootstrap":
+        """Load `url` once in the browser and keep the cookies and user agent it ends up with"""
+        driver.get(url)
+        user_agent = driver.execute_script("return navigator.userAgent")
+        cookies = {cookie["name"]: cookie["value"] for cookie in driver.get_cookies()}
+        return cls(cookies, {"User-Agent": user_agent, "Referer": url})
+
+
+# ================= LISTING =================
+def extract_detail_links(html: str, base_url: str) -> List[Tuple[str, str]]:
+    """(url, displayed name) for every deal card on a weekly ad page"""
+    soup = BeautifulSoup(html, "lxml")
+    links = []
+    seen = set()
+    for card in soup.select("div.kds-Card.SWA-Omni"):
+        anchor = card.select_one("a[href]")
+        if not anchor:
+            continue
+        url = urljoin(base_url, anchor["href"])
+        if url in seen:
+            continue
+        seen.add(url)
+        img = card.find("img")
+        name = (img.get("alt") if img else "") or card.get_text("\n", strip=True).split("\n")[0]
+        links.append((url, name.strip()))
+    return links
+
+
+# ================= ENGINE =================
+class HttpKrogerScraper:
+    """Scrapes deal detail pages over plain HTTP, with the same scrape() contract as KrogerScraper"""
+
+    def __init__(self, job_id: str, limit: int = 100, concurrency: int = 8,
+                 base_url: str = KROGER_URL, listing_path: str = WEEKLY_AD_PATH,
+                 bootstrap: bool = True, driver_factory=None, store_ids: Optional[List[str]] = None,
+                 driver_pool: Optional[DriverPool] = None, flush_size: int = 50):
+        self.job_id = job_id
+        self.limit = limit
+        # Empty means the default store; `limit` applies per store
+        self.store_ids = list(store_ids or [])
+        self.concurrency = max(1, concurrency)
+        self.base_url = base_url
+        self.listing_path = listing_path
+        self.bootstrap = bootstrap
+        self.driver_factory = driver_factory
+        # The bootstrap browser is borrowed from the shared pool when there is one
+        self.driver_pool = driver_pool
+        self.db = Database()
+        self.job_manager = JobManager(self.db)
+        self.deal_manager = DealManager(self.db)
+        self.total_cards = 0
+        self.successful_scrapes = 0
+        self.failed_scrapes = 0
+        self.cancelled = threading.Event()
+        # Stores whose listing could not be fetched; the job ends "partial" (or "failed" if all did)
+        self.failed_stores: List[Optional[str]] = []
+        self.timings = JobTimings("http")
+        # Deals reach the DB in batches of `flush_size` while the pages are still being fetched
+        self.writer = DealWriter(self.deal_manager, job_id, flush_size, on_flush=lambda saved: self.save_stats(),
+                                 timings=self.timings)
+
+    def finish(self, status: str) -> None:
+        """Count the job's outcome in the process metrics"""
+        self.timings.finish(status, successful=self.successful_scrapes, failed=self.failed_scrapes)
+
+    def save_stats(self) -> None:
+        """Write the counters and phase timings to the job record"""
+        self.job_manager.update_job_stats(
+            self.job_id,
+            self.total_cards,
+            self.successful_scrapes,
+            self.failed_scrapes,
+            timings=self.timings.as_dict()
+        )
+
+    def cancel(self) -> None:
+        """Skip the detail pages not fetched yet; pages already fetched are kept"""
+        self.cancelled.set()
+
+    def bootstrap_session(self) -> SessionBootstrap:
+        """Borrow cookies and headers from a browser, or go without for local servers"""
+        if not self.bootstrap:
+            return SessionBootstrap()
+
+        with self.timings.span("driver_start"):
+            if self.driver_pool is not None:
+                driver = self.driver_pool.acquire()
+            else:
+                driver = (self.driver_factory or init_driver)()
+        try:
+            with self.timings.span("page_load"):
+                return SessionBootstrap.from_driver(driver, self.base_url)
+        finally:
+            if self.driver_pool is not None:
+                self.driver_pool.release(driver)
+            else:
+                driver.quit()
+
+    async def fetch_deal(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                         url: str, name: str, store_id: Optional[str] = None) -> None:
+        """Fetch and parse one detail page and hand its deals to the writer"""
+        async with semaphore:
+            # Pages skipped after cancel() are neither successes nor failures
+            if self.cancelled.is_set():
+                return
+            try:
+                # The HTTP counterpart of the browser's per-card click and modal wait
+                with self.timings.span("card"):
+                    response = await client.get(url)
+                    response.raise_for_status()
+            except httpx.HTTPError as e:
+                print(f"[JOB {self.job_id}] Fetch error {url}: {e}")
+                self.failed_scrapes += 1
+                return
+        # Parsed on a worker thread so the event loop keeps the other fetches moving
+        with self.timings.span("parse"):
+            products = await asyncio.to_thread(parse_kroger_modal, response.text, name)
+        if not products:
+            self.failed_scrapes += 1
+            return
+        self.successful_scrapes += 1
+        # A full batch is written to the DB, so that happens off the event loop too
+        await asyncio.to_thread(self.writer.add, tag_store(products, store_id))
+
+    async def scrape_store(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                           store_id: Optional[str]) -> None:
+        """Fetch one store's listing and its detail pages; all stores share the semaphore"""
+        with self.timings.span("page_load"):
+            # Relative to base_url like the default store's listing, so local servers work per store too
+            params = {STORE_CODE_PARAM: store_id} if store_id else None
+            listing = await client.get(self.listing_path, params=params)
+            listing.raise_for_status()
+        links = await asyncio.to_thread(extract_detail_links, listing.text, str(listing.url))
+        self.total_cards += len(links)
+        print(f"[JOB {self.job_id}] {store_id or 'default store'}: found {len(links)} deal links")
+
+        await asyncio.gather(*[
+            self.fetch_deal(client, semaphore, url, name, store_id) for url, name in links[:self.limit]
+        ])
+
+    async def scrape_async(self, session: SessionBootstrap) -> None:
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, cookies=session.cookies, headers=session.headers,
+                                     limits=limits, timeout=30, follow_redirects=True) as client:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            store_ids = self.store_ids or [None]
+            per_store = await asyncio.gather(*[
+                self.scrape_store(client, semaphore, store_id) for store_id in store_ids
+            ], return_exceptions=True)
+
+        # A store whose listing failed is skipped; the other stores' deals are kept
+        for store_id, error in zip(store_ids, per_store):
+            if isinstance(error, Exception):
+                self.failed_stores.append(store_id)
+                print(f"[JOB {self.job_id}] {store_id or 'default store'} FAILED to load, skipped: {error}")
+
+    def scrape(self):
+        """Main scraping method"""
+        try:
+            self.job_manager.create_job(self.job_id, stores=self.store_ids)
+            session = self.bootstrap_session()
+            asyncio.run(self.scrape_async(session))
+
+            # Flushing also writes the final stats
+            self.writer.close()
+            if self.cancelled.is_set():
+                self.job_manager.update_job_status(self.job_id, "cancelled")
+                self.finish("cancelled")
+                print(f"[JOB {self.job_id}] CANCELLED after {self.writer.saved} items")
+                return
+
+            store_error = None
+            if self.failed_stores:
+                store_error = "Stores failed to load: " + ", ".join(
+                    store_id or "default store" for store_id in self.failed_stores)
+                if len(self.failed_stores) == len(self.store_ids or [None]):
+                    raise RuntimeError(store_error)
+
+            try:
+                with self.timings.span("export"):
+                    export_job(self.deal_manager, self.job_id)
+            except Exception as e:
+                print(f"[JOB {self.job_id}] Artifact export failed: {e}")
+            if store_error:
+                self.save_stats()
+                self.job_manager.update_job_status(self.job_id, "partial", store_error)
+                self.finish("partial")
+                print(f"[JOB {self.job_id}] PARTIAL: {self.writer.saved} items, {store_error}")
+                return
+            # Diffed before the job shows as completed, so /diff never finds it missing
+            try:
+                with self.timings.span("diff"):
+                    DiffManager(self.db).precompute(self.job_id)
+            except Exception as e:
+                print(f"[JOB {self.job_id}] Diff precompute failed: {e}")
+            # Status last: a completed job's record (and the cached /status) is final
+            self.save_stats()
+            self.job_manager.update_job_status(self.job_id, "completed")
+            self.finish("completed")
+
+            print(f"[JOB {self.job_id}] COMPLETED! {self.writer.saved} items")
+
+        except Exception as e:
+            # Keep whatever was fetched before the failure
+            self.writer.close()
+            self.job_manager.update_job_status(self.job_id, "failed", str(e))
+            self.finish("failed")
+            print(f"[JOB {self.job_id}] FAILED: {e}")
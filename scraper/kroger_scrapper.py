@@ -1,86 +1,278 @@
 from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import time
-from typing import List, Dict, Optional
+from selenium.common.exceptions import StaleElementReferenceException
+import queue
+import threading
+from functools import partial
+from typing import List, Dict, Optional, Tuple
 from bs4 import BeautifulSoup
-from database.models import Database, JobManager, DealManager
+from output.models import Database, JobManager, DealManager, DealWriter
+from output.artifacts import export_job
+from output.diff import DiffManager
+from output.html_cache import ModalCache, read_page
+from scraper.bs4_parser import parse_kroger_modal
+from scraper.waits import AdaptiveDelay, PageWaiter, WaitStats
+from scraper.metrics import JobTimings
+from scraper.network_capture import (
+    enable_performance_logging, collect_json_responses, save_fixture, load_fixture,
+    harvest_deals, normalize_name
+)
+from scraper.pipeline import ParsePipeline
+from scraper.scroll_loader import CardLoader
+from scraper.card_handles import CardHandles
+from scraper.blocking import BlockingProfile, traffic_from_entries
+from scraper.driver import DEFAULT_BLOCKING, DriverPool, chromedriver_path
+from scraper.stores import KROGER_URL, ShardBoard, StoreShard, weekly_ad_url
+
+def parse_deal_details(html: str, name: str) -> List[Dict]:
+    """Parse deal details from modal HTML"""
+    soup = BeautifulSoup(html, 'lxml')
+    products = []
+    
+    try:
+        # Extract basic product info
+        product = {
+            "name": name,
+            "price": "",
+            "original_price": "",
+            "discount": "",
+            "description": "",
+            "details": {}
+        }
+        
+        # Try to find price information
+        price_elem = soup.select_one(".kds-Price")
+        if price_elem:
+            product["price"] = price_elem.text.strip()
+        
+        # Try to find original price
+        orig_price_elem = soup.select_one(".kds-Price--was")
+        if orig_price_elem:
+            product["original_price"] = orig_price_elem.text.strip()
+        
+        # Try to find discount
+        discount_elem = soup.select_one(".kds-Price--savings")
+        if discount_elem:
+            product["discount"] = discount_elem.text.strip()
+        
+        # Try to find description
+        desc_elem = soup.select_one(".kds-Text--l")
+        if desc_elem:
+            product["description"] = desc_elem.text.strip()
+        
+        # Add any additional details found
+        details = {}
+        detail_elems = soup.select(".kds-Text--s")
+        for elem in detail_elems:
+            text = elem.text.strip()
+            if ":" in text:
+                key, value = text.split(":", 1)
+                details[key.strip()] = value.strip()
+        
+        product["details"] = details
+        products.append(product)
+        
+    except Exception as e:
+        print(f"Error parsing deal: {str(e)}")
+        
+    return products
+
+
+# Parsers a job can run over modal HTML, by name (names keep them picklable for the pool)
+PARSERS = {
+    "deal_details": parse_deal_details,
+    "kroger_modal": parse_kroger_modal,
+}
+
+
+def parse_cached_modal(parser: str, path: str, name: str) -> List[Dict]:
+    """Parse a page from the modal cache; runs in the pool so reading and inflating are parallel too"""
+    return PARSERS[parser](read_page(path), name)
+
+
+def tag_store(deals: List[Dict], store_id: Optional[str], fingerprint: Optional[str] = None) -> List[Dict]:
+    """Mark deals with the store whose weekly ad they came from and the card they were opened from"""
+    tags = {key: value for key, value in (("store_id", store_id), ("fingerprint", fingerprint)) if value is not None}
+    if not tags:
+        return deals
+    return [{**deal, **tags} for deal in deals]
+
+
+def close_popups(driver, waiter: Optional[PageWaiter] = None) -> None:
+    """Close the cookie notice and any open modal on `driver`"""
+    waiter = waiter or PageWaiter(driver, WaitStats(), AdaptiveDelay())
+    try:
+        # Close cookie notice if present
+        cookie_buttons = driver.find_elements(By.CSS_SELECTOR, "button[data-testid='CloseButton']")
+        for button in cookie_buttons:
+            if button.is_displayed():
+                button.click()
+                waiter.modal_detached(baseline=1.0, phase="popups")
+
+        # Close modal if present
+        modal_buttons = driver.find_elements(By.CSS_SELECTOR, "button[aria-label='Close']")
+        for button in modal_buttons:
+            if button.is_displayed():
+                button.click()
+                waiter.modal_detached(baseline=1.0)
+    except:
+        pass
+
+
+def get_modal_html(driver, waiter: Optional[PageWaiter] = None) -> str:
+    """outerHTML of the open product modal, "" if none shows up"""
+    waiter = waiter or PageWaiter(driver, WaitStats(), AdaptiveDelay())
+    modal = waiter.modal_attached(timeout=10, baseline=1.0)
+    return modal.get_attribute('outerHTML') if modal else ""
+
+
+def build_driver(blocking: Optional[BlockingProfile] = DEFAULT_BLOCKING):
+    """Create a Chrome WebDriver with basic settings"""
+    options = webdriver.ChromeOptions()
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-infobars')
+    options.add_argument('--disable-notifications')
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument('--accept-lang=en-US,en')
+    options.add_argument('--accept=text/html,application/xhtml+xml,application/xml')
+    # Network capture reads its JSON responses from the log, and every job counts its traffic there
+    enable_performance_logging(options)
+    if blocking:
+        blocking.apply_options(options)
+
+    # No implicit wait: every wait is an explicit DOM condition (see scraper/waits.py)
+    driver = webdriver.Chrome(service=ChromeService(chromedriver_path()), options=options)
+    if blocking:
+        blocking.apply(driver)
+    return driver
+
 
 class KrogerScraper:
-    def __init__(self, job_id: str, limit: int = 100):
+    # "modal" clicks every card, "network" harvests the weekly ad JSON and only clicks
+    # cards missing from it, "fixture" maps a recorded capture without a browser,
+    # "replay" re-parses the modal HTML cached by an earlier job without a browser
+    CAPTURE_MODES = ("modal", "network", "fixture", "replay")
+
+    def __init__(self, job_id: str, limit: int = 100, workers: int = 1,
+                 capture_mode: str = "modal", fixture_path: Optional[str] = None,
+                 parse_workers: Optional[int] = None, flush_size: int = 50,
+                 store_ids: Optional[List[str]] = None, driver_pool: Optional[DriverPool] = None,
+                 incremental: bool = True, replay_job_id: Optional[str] = None, parser: str = "deal_details"):
+        if capture_mode not in self.CAPTURE_MODES:
+            raise ValueError(f"Unknown capture mode: {capture_mode}")
+        if capture_mode == "fixture" and not fixture_path:
+            raise ValueError("fixture capture mode needs a fixture_path")
+        if capture_mode == "replay" and not replay_job_id:
+            raise ValueError("replay capture mode needs a replay_job_id")
+        if parser not in PARSERS:
+            raise ValueError(f"Unknown parser: {parser}")
         self.job_id = job_id
         self.limit = limit
+        self.workers = max(1, workers)
+        # Empty means the default store; `limit` applies per store
+        self.store_ids = list(store_ids or [])
+        self.capture_mode = capture_mode
+        self.fixture_path = fixture_path
+        self.parse_workers = parse_workers
+        self.replay_job_id = replay_job_id
+        self.parser = parser
         self.driver = None
+        # Shared across jobs; browsers come back to it instead of being quit
+        self.driver_pool = driver_pool
+        # Copy unchanged cards forward from earlier jobs instead of opening their modals
+        self.incremental = incremental
         self.db = Database()
         self.job_manager = JobManager(self.db)
         self.deal_manager = DealManager(self.db)
+        if capture_mode == "replay":
+            # Same stores as the replayed job, so /diff compares the replay against that job's lineage
+            replayed = self.job_manager.get_job_status(replay_job_id)
+            self.store_ids = replayed["stores"] if replayed else []
+        # Every opened modal's HTML is kept so later parser fixes can be replayed offline
+        self.html_cache = ModalCache(self.db)
+        # Where the job's time goes, phase by phase; saved with the stats and served by /metrics
+        self.timings = JobTimings("browser")
+        # Deals reach the DB in batches of `flush_size` while the job runs
+        self.writer = DealWriter(self.deal_manager, job_id, flush_size, on_flush=lambda saved: self.save_stats(),
+                                 timings=self.timings)
         self.total_cards = 0
         self.successful_scrapes = 0
         self.failed_scrapes = 0
+        # Stores whose weekly ad could not be loaded; the job ends "partial" (or "failed" if all did)
+        self.failed_stores: List[Optional[str]] = []
+        self.copied_cards = 0
+        self._stats_lock = threading.Lock()
+        self.wait_stats = WaitStats()
+        self.delay = AdaptiveDelay()
+        # Set by cancel(): workers stop claiming cards and the job ends as "cancelled"
+        self.cancelled = threading.Event()
+        self.board = ShardBoard(self.store_ids or [None], limit, stop=self.cancelled)
+        # Store -> (ms since navigation, card count) for each change while its ad loaded
+        self.scroll_history: Dict[Optional[str], List[Tuple[int, int]]] = {}
 
     def init_driver(self):
-        """Initialize Chrome WebDriver with basic settings"""
-        options = webdriver.ChromeOptions()
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--disable-infobars')
-        options.add_argument('--disable-notifications')
-        options.add_argument('--window-size=1920,1080')
-        options.add_argument('--accept-lang=en-US,en')
-        options.add_argument('--accept=text/html,application/xhtml+xml,application/xml')
-        
-        self.driver = webdriver.Chrome(options=options)
-        self.driver.implicitly_wait(10)
+        """Initialize the main Chrome WebDriver"""
+        self.driver = self.new_driver()
 
-    def close_popups(self):
-        """Close any popups that appear"""
+    def new_driver(self):
+        """Borrow a warm session from the pool, or start a browser"""
+        with self.timings.span("driver_start"):
+            if self.driver_pool is not None:
+                return self.driver_pool.acquire()
+            return build_driver()
+
+    def release_driver(self, driver) -> None:
+        """Return a borrowed session to the pool, or quit a browser this job started"""
+        # Drained first, so the next job borrowing it doesn't count this job's traffic
+        self.read_performance_log(driver)
+        if self.driver_pool is not None:
+            self.driver_pool.release(driver)
+        else:
+            driver.quit()
+
+    def read_performance_log(self, driver) -> List[Dict]:
+        """Drain the driver's performance log, counting its traffic towards the job"""
         try:
-            # Close cookie notice if present
-            cookie_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[data-testid='CloseButton']")
-            for button in cookie_buttons:
-                if button.is_displayed():
-                    button.click()
-                    time.sleep(1)
-                    
-            # Close modal if present
-            modal_buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[aria-label='Close']")
-            for button in modal_buttons:
-                if button.is_displayed():
-                    button.click()
-                    time.sleep(1)
-        except:
-            pass
+            entries = driver.get_log("performance")
+        except Exception:
+            return []
+        self.timings.add_traffic(traffic_from_entries(entries))
+        return entries
 
-    def scroll_to_bottom(self):
-        """Scroll to the bottom of the page gradually"""
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
-        
-        while True:
-            # Scroll down gradually
-            self.driver.execute_script("window.scrollBy(0, 500);")
-            time.sleep(1)
-            
-            # Calculate new scroll height
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            
-            # Break if we've reached the bottom
-            if new_height == last_height:
-                break
-                
-            last_height = new_height
+    def waiter(self, driver=None) -> PageWaiter:
+        """Condition waits for `driver`, sharing the job's adaptive delay and stats"""
+        return PageWaiter(driver or self.driver, self.wait_stats, self.delay)
 
-    def get_modal_html(self) -> str:
+    def close_popups(self, driver=None):
+        """Close any popups that appear"""
+        driver = driver or self.driver
+        close_popups(driver, self.waiter(driver))
+
+    def scroll_to_bottom(self, driver=None) -> CardLoader:
+        """Jump from last card to last card until no new cards render (see scraper/scroll_loader.py)"""
+        loader = CardLoader(driver or self.driver, stats=self.wait_stats)
+        loader.load()
+        return loader
+
+    def get_modal_html(self, driver=None) -> str:
         """Get the HTML content of the product modal"""
-        try:
-            modal = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='dialog']"))
-            )
-            return modal.get_attribute('outerHTML')
-        except TimeoutException:
-            return ""
+        driver = driver or self.driver
+        return get_modal_html(driver, self.waiter(driver))
+
+    def get_card_names(self, driver=None) -> List[str]:
+        """Displayed names of every card, read in a single script call"""
+        driver = driver or self.driver
+        return driver.execute_script("""
+            return Array.from(document.querySelectorAll('div.kds-Card.SWA-Omni')).map(card => {
+                const img = card.querySelector('img');
+                return ((img && img.alt) || card.innerText.split('\\n')[0] || '').trim();
+            });
+        """)
 
     def get_displayed_name(self, card) -> str:
         """Get the displayed name of a product from its card"""
@@ -91,155 +283,403 @@ class KrogerScraper:
 
     def parse_deal_details(self, html: str, name: str) -> List[Dict]:
         """Parse deal details from modal HTML"""
-        soup = BeautifulSoup(html, 'lxml')
-        products = []
-        
-        try:
-            # Extract basic product info
-            product = {
-                "name": name,
-                "price": "",
-                "original_price": "",
-                "discount": "",
-                "description": "",
-                "details": {}
-            }
-            
-            # Try to find price information
-            price_elem = soup.select_one(".kds-Price")
-            if price_elem:
-                product["price"] = price_elem.text.strip()
-            
-            # Try to find original price
-            orig_price_elem = soup.select_one(".kds-Price--was")
-            if orig_price_elem:
-                product["original_price"] = orig_price_elem.text.strip()
-            
-            # Try to find discount
-            discount_elem = soup.select_one(".kds-Price--savings")
-            if discount_elem:
-                product["discount"] = discount_elem.text.strip()
-            
-            # Try to find description
-            desc_elem = soup.select_one(".kds-Text--l")
-            if desc_elem:
-                product["description"] = desc_elem.text.strip()
-            
-            # Add any additional details found
-            details = {}
-            detail_elems = soup.select(".kds-Text--s")
-            for elem in detail_elems:
-                text = elem.text.strip()
-                if ":" in text:
-                    key, value = text.split(":", 1)
-                    details[key.strip()] = value.strip()
-            
-            product["details"] = details
-            products.append(product)
-            
-        except Exception as e:
-            print(f"Error parsing deal: {str(e)}")
-            
-        return products
+        return parse_deal_details(html, name)
 
-    def scrape(self):
-        """Main scraping method"""
-        try:
-            self.init_driver()
-            self.job_manager.create_job(self.job_id)
-            all_deals = []
+    def open_weekly_ad(self, driver=None, store_id: Optional[str] = None) -> int:
+        """Load a store's weekly ad, dismiss popups and scroll so every card is rendered"""
+        driver = driver or self.driver
+        waiter = self.waiter(driver)
 
+        with self.timings.span("page_load"):
             # Load homepage first
-            print(f"[JOB {self.job_id}] Loading Kroger homepage...")
-            self.driver.get("https://www.kroger.com")
-            WebDriverWait(self.driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(3)
+            driver.get(KROGER_URL)
+            waiter.document_ready(timeout=30, baseline=3.0)
 
             # Navigate to weekly ad
-            print(f"[JOB {self.job_id}] Navigating to weekly ad...")
-            self.driver.get("https://www.kroger.com/weeklyad/weeklyad")
-            WebDriverWait(self.driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(3)
+            driver.get(weekly_ad_url(store_id))
+            waiter.document_ready(timeout=30, baseline=3.0)
 
             # Handle popups
             for _ in range(3):
-                self.close_popups()
-                time.sleep(1)
+                self.close_popups(driver)
+                waiter.pace(baseline=1.0, phase="popups")
 
-            # Scroll and get cards
-            self.scroll_to_bottom()
-            time.sleep(2)
+        # Scroll until the card count settles, then number the cards for CardHandles
+        with self.timings.span("scroll"):
+            loader = self.scroll_to_bottom(driver)
+        with self._stats_lock:
+            self.scroll_history[store_id] = loader.history
+        return CardHandles(driver).snapshot()
 
-            cards = self.driver.find_elements(By.CSS_SELECTOR, "div.kds-Card.SWA-Omni")
-            self.total_cards = len(cards)
-            print(f"[JOB {self.job_id}] Found {self.total_cards} cards")
+    def process_card(self, driver, idx: int, handles: Optional[CardHandles] = None) -> Optional[Tuple[str, str]]:
+        """Open card `idx` on `driver` and return (modal html, name), or None if it was skipped"""
+        handles = handles or CardHandles(driver)
 
-            processed = 0
-            for idx in range(len(cards)):
-                if processed >= self.limit:
-                    break
-                try:
-                    time.sleep(1)
-                    card = self.driver.find_elements(By.CSS_SELECTOR, "div.kds-Card.SWA-Omni")[idx]
-                    
-                    # Scroll card into view
-                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", card)
-                    time.sleep(1)
-                    
-                    name = self.get_displayed_name(card)
-                    if not name or "Unknown" in name:
-                        self.failed_scrapes += 1
-                        continue
+        # One round trip: look the card up, scroll it into view and read its name
+        opened = handles.open(idx)
+        if opened is None:
+            return None
+        card, name = opened
+        if not name or "Unknown" in name:
+            return None
 
-                    clicked = False
-                    for sel in ["button[data-testid='SWA-Omni-ImageContainer']", "button[role='button'] img"]:
-                        try:
-                            btn = WebDriverWait(card, 5).until(EC.element_to_be_clickable((By.CSS_SELECTOR, sel)))
-                            self.driver.execute_script("arguments[0].click();", btn)
-                            clicked = True
-                            break
-                        except:
-                            continue
-                    if not clicked:
-                        self.failed_scrapes += 1
-                        continue
+        with self.timings.span("click"):
+            try:
+                clicked = self.click_card(driver, card)
+            except StaleElementReferenceException:
+                # The page re-rendered the card: resolve its new node and try once more
+                opened = handles.open(idx)
+                clicked = opened is not None and self.click_card(driver, opened[0])
+        if not clicked:
+            return None
 
-                    time.sleep(1)
-                    modal_html = self.get_modal_html()
-                    products = self.parse_deal_details(modal_html, name)
-                    
-                    if products:
-                        all_deals.extend(products)
-                        self.successful_scrapes += 1
-                    else:
-                        self.failed_scrapes += 1
-                    
-                    processed += 1
-                    
-                    self.close_popups()
-                    time.sleep(1)
+        with self.timings.span("modal_wait"):
+            modal_html = self.get_modal_html(driver)
 
-                except Exception as e:
-                    print(f"[JOB {self.job_id}] Card error: {e}")
-                    self.failed_scrapes += 1
-                    continue
+        # Waits for the modal to detach as it closes it
+        self.close_popups(driver)
+        return modal_html, name
+
+    def click_card(self, driver, card) -> bool:
+        """Click the card's image button; raises StaleElementReferenceException if the card went away"""
+        for sel in ["button[data-testid='SWA-Omni-ImageContainer']", "button[role='button'] img"]:
+            try:
+                btn = WebDriverWait(card, 5).until(EC.element_to_be_clickable((By.CSS_SELECTOR, sel)))
+                driver.execute_script("arguments[0].click();", btn)
+                return True
+            except StaleElementReferenceException:
+                raise
+            except:
+                continue
+        return False
 
-            # Save results and update statistics
-            self.deal_manager.save_deals(self.job_id, all_deals)
+    def save_stats(self) -> None:
+        """Write the current counters to the job record"""
+        with self._stats_lock:
             self.job_manager.update_job_stats(
-                self.job_id, 
+                self.job_id,
                 self.total_cards,
                 self.successful_scrapes,
-                self.failed_scrapes
+                self.failed_scrapes,
+                self.wait_stats.as_dict(),
+                self.timings.as_dict()
             )
+
+    def store_parsed(self, products: Optional[List[Dict]], name: str,
+                     tag: Tuple[Optional[str], Optional[str]] = (None, None)) -> None:
+        """Pipeline sink: count one card's parsed deals and hand them to the writer
+
+        `tag` is (store_id, card fingerprint) of the card the modal came from.
+        """
+        with self._stats_lock:
+            if products:
+                self.successful_scrapes += 1
+            else:
+                self.failed_scrapes += 1
+        if products:
+            self.writer.add(tag_store(products, *tag))
+
+    def card_tag(self, shard: StoreShard, idx: int) -> Tuple[Optional[str], Optional[str]]:
+        fingerprint = shard.fingerprints[idx] if idx < len(shard.fingerprints) else None
+        return shard.store_id, fingerprint
+
+    def copy_unchanged(self, shard: StoreShard, card_indices: List[int]) -> List[int]:
+        """Copy forward the deals of cards an earlier job already scraped, return the indices left to open"""
+        fingerprints = shard.fingerprints
+        known = self.deal_manager.known_fingerprints(shard.store_id, list(set(fingerprints)))
+        if not known:
+            return card_indices
+
+        # Each unchanged card takes a limit slot, like a card that was opened
+        sources = {}
+        first_idx = {}
+        for idx in card_indices:
+            fingerprint = fingerprints[idx]
+            if fingerprint in known and fingerprint not in sources:
+                if not self.board.claim_slot(shard):
+                    break
+                sources[fingerprint] = known[fingerprint]
+                first_idx[fingerprint] = idx
+        with self.timings.span("copy_forward"):
+            copied = set(self.deal_manager.copy_forward(self.job_id, shard.store_id, sources))
+        for _ in range(len(sources) - len(copied)):
+            self.board.release_slot(shard)
+        # Keep the job replayable in full: its unchanged cards reuse the pages cached earlier
+        self.html_cache.copy_forward(self.job_id, shard.store_id, [
+            (first_idx[fingerprint], fingerprint, sources[fingerprint]) for fingerprint in copied
+        ])
+
+        with self._stats_lock:
+            self.successful_scrapes += len(copied)
+            self.copied_cards += len(copied)
+        # Repeats of a copied card carry the same deals, so they are done too
+        remaining = [idx for idx in card_indices if fingerprints[idx] not in copied]
+        print(f"[JOB {self.job_id}] {shard.store_id or 'default store'}: {len(copied)} unchanged cards "
+              f"copied forward, {len(remaining)} new or changed")
+        return remaining
+
+    def open_shard(self, driver, shard: StoreShard) -> None:
+        """Load a store's weekly ad on `driver` and queue its cards for every worker"""
+        store_label = shard.store_id or "default store"
+        count = self.open_weekly_ad(driver, shard.store_id)
+        with self._stats_lock:
+            self.total_cards += count
+        print(f"[JOB {self.job_id}] {store_label}: found {count} cards")
+
+        card_indices = list(range(count))
+        if self.incremental:
+            shard.fingerprints = CardHandles(driver).fingerprints()
+            card_indices = self.copy_unchanged(shard, card_indices)
+        if self.capture_mode == "network":
+            card_indices = self.harvest_network_deals(driver, shard, card_indices)
+        for idx in card_indices:
+            shard.cards.put(idx)
+
+    def run_worker(self, worker_id: int, pipeline: ParsePipeline) -> None:
+        """Take stores from the board and open their cards until no work is left or the limits are hit"""
+        driver = self.driver if worker_id == 0 else None
+        shard = None
+        captured = 0
+        skipped = 0
+        try:
+            while True:
+                claimed = self.board.claim()
+                if claimed is None:
+                    break
+                shard, opener = claimed
+                try:
+                    # Browsers start only once there is a store for them
+                    if driver is None:
+                        driver = self.new_driver()
+                    if opener:
+                        self.open_shard(driver, shard)
+                    else:
+                        self.open_weekly_ad(driver, shard.store_id)
+                except Exception as e:
+                    failed, shard = shard, None
+                    self.board.leave(failed)
+                    if opener:
+                        # Its cards were never queued: the store is lost, the other stores go on
+                        self.record_failed_store(failed.store_id, e)
+                        continue
+                    # The store loaded fine for its opener, so this browser is the problem;
+                    # the cards stay queued for the workers already there
+                    print(f"[JOB {self.job_id}] Worker {worker_id} could not join "
+                          f"{failed.store_id or 'default store'}, stopping: {e}")
+                    break
+                finally:
+                    if opener:
+                        self.board.mark_ready(claimed[0])
+                handles = CardHandles(driver)
+
+                while True:
+                    try:
+                        idx = shard.cards.get_nowait()
+                    except queue.Empty:
+                        break
+                    if not self.board.claim_slot(shard):
+                        break
+
+                    try:
+                        # Whole card: pacing, lookup, click, modal wait and close
+                        with self.timings.span("card"):
+                            modal = self.process_card(driver, idx, handles)
+                    except Exception as e:
+                        print(f"[JOB {self.job_id}] Worker {worker_id} card error: {e}")
+                        modal = None
+
+                    if modal is None:
+                        # Skipped cards don't count towards the limit
+                        self.board.release_slot(shard)
+                        skipped += 1
+                    else:
+                        tag = self.card_tag(shard, idx)
+                        try:
+                            self.html_cache.put(self.job_id, shard.store_id, idx, modal[1], modal[0], tag[1])
+                        except Exception as e:
+                            print(f"[JOB {self.job_id}] Worker {worker_id} could not cache modal: {e}")
+                        # Parsing happens in the process pool while this driver moves on
+                        pipeline.submit(*modal, tag=tag)
+                        captured += 1
+
+                self.board.leave(shard)
+                shard = None
+
+        except Exception as e:
+            print(f"[JOB {self.job_id}] Worker {worker_id} FAILED: {e}")
+
+        finally:
+            if shard is not None:
+                # Its remaining cards stay queued for the other workers
+                self.board.leave(shard)
+            if driver is not None:
+                # Counted here so the stats saved below include this browser's traffic
+                self.read_performance_log(driver)
+                if driver is not self.driver:
+                    self.release_driver(driver)
+
+            # Roll this worker's results up into the job
+            with self._stats_lock:
+                self.failed_scrapes += skipped
+            self.save_stats()
+            print(f"[JOB {self.job_id}] Worker {worker_id} done: {captured} captured, {skipped} skipped")
+
+    def record_failed_store(self, store_id: Optional[str], error: Exception) -> None:
+        with self._stats_lock:
+            self.failed_stores.append(store_id)
+        print(f"[JOB {self.job_id}] {store_id or 'default store'} FAILED to load, skipped: {error}")
+
+    def save_harvested(self, harvested: Dict[str, List[Dict]], names: List[str], shard: StoreShard,
+                       fingerprints: Optional[List[Optional[str]]] = None) -> None:
+        """Save payload deals for the given card names, counting each card towards the store's limit"""
+        for i, name in enumerate(names):
+            if not self.board.claim_slot(shard):
+                break
+            with self._stats_lock:
+                self.successful_scrapes += 1
+            fingerprint = fingerprints[i] if fingerprints else None
+            self.writer.add(tag_store(harvested[normalize_name(name)], shard.store_id, fingerprint))
+
+    def harvest_network_deals(self, driver, shard: StoreShard, card_indices: List[int]) -> List[int]:
+        """Save deals found in the weekly ad's JSON traffic for `card_indices`, return the cards still to click"""
+        captures = collect_json_responses(driver, entries=self.read_performance_log(driver))
+        if self.fixture_path:
+            save_fixture(captures, self.fixture_path)
+        harvested = harvest_deals(captures)
+
+        names = self.get_card_names(driver)
+        matched = [idx for idx in card_indices if idx < len(names) and normalize_name(names[idx]) in harvested]
+        self.save_harvested(harvested, [names[idx] for idx in matched], shard,
+                            [self.card_tag(shard, idx)[1] for idx in matched])
+
+        matched_set = set(matched)
+        remaining = [idx for idx in card_indices if idx not in matched_set]
+        print(f"[JOB {self.job_id}] Network capture: {len(matched)} cards from "
+              f"{len(captures)} payloads, {len(remaining)} left for modal fallback")
+        return remaining
+
+    def scrape_fixture(self) -> None:
+        """Map a recorded network capture to deals without starting a browser"""
+        harvested = harvest_deals(load_fixture(self.fixture_path))
+        self.total_cards = len(harvested)
+        self.save_harvested(harvested, list(harvested), self.board.shards[0])
+
+    def scrape_replay(self) -> None:
+        """Re-parse every modal cached by `replay_job_id` without a browser"""
+        pages = self.html_cache.pages(self.replay_job_id)
+        if not pages:
+            raise ValueError(f"No cached modal pages for job {self.replay_job_id}")
+        self.total_cards = len(pages)
+        print(f"[JOB {self.job_id}] Replaying {len(pages)} cached modals of job {self.replay_job_id} "
+              f"with the {self.parser} parser")
+
+        # Pages go to the pool as file paths: workers read, inflate and parse in parallel
+        with ParsePipeline(partial(parse_cached_modal, self.parser), self.store_parsed,
+                           self.parse_workers, timings=self.timings) as pipeline:
+            for page in pages:
+                if self.cancelled.is_set():
+                    break
+                pipeline.submit(page["path"], page["name"], tag=(page["store_id"], page["fingerprint"]))
+        # The replay job can itself be replayed
+        self.html_cache.copy_job(self.replay_job_id, self.job_id)
+
+    def run_workers(self) -> None:
+        """Start the worker browsers on the store board and wait for every store to drain"""
+        with ParsePipeline(PARSERS[self.parser], self.store_parsed, self.parse_workers,
+                           timings=self.timings) as pipeline:
+            threads = [
+                threading.Thread(target=self.run_worker, args=(worker_id, pipeline), daemon=True)
+                for worker_id in range(self.workers)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+    def export_artifacts(self) -> None:
+        """Write the compressed download artifacts; /get-data falls back to the DB without them"""
+        try:
+            export_job(self.deal_manager, self.job_id)
+        except Exception as e:
+            print(f"[JOB {self.job_id}] Artifact export failed: {e}")
+
+    def precompute_diff(self) -> None:
+        """Diff the finished job against the previous one for its stores, so /diff reads are instant"""
+        try:
+            summary = DiffManager(self.db).precompute(self.job_id)
+            if summary is not None:
+                print(f"[JOB {self.job_id}] Diff against previous job: {summary}")
+        except Exception as e:
+            print(f"[JOB {self.job_id}] Diff precompute failed: {e}")
+
+    def finish(self, status: str) -> None:
+        """Count the job's outcome in the process metrics"""
+        self.timings.finish(status, successful=self.successful_scrapes, failed=self.failed_scrapes,
+                            copied=self.copied_cards)
+
+    def cancel(self) -> None:
+        """Stop after the cards already opened; what was parsed so far is kept"""
+        self.cancelled.set()
+
+    def scrape(self):
+        """Main scraping method"""
+        try:
+            self.job_manager.create_job(self.job_id, stores=self.store_ids)
+
+            if self.capture_mode == "fixture":
+                self.scrape_fixture()
+            elif self.capture_mode == "replay":
+                self.scrape_replay()
+            else:
+                self.init_driver()
+
+                print(f"[JOB {self.job_id}] Loading weekly ad for {len(self.board.shards)} store(s) "
+                      f"with {self.workers} worker(s)...")
+                self.run_workers()
+
+            # Flushing also writes the final stats
+            self.writer.close()
+            if self.cancelled.is_set():
+                self.job_manager.update_job_status(self.job_id, "cancelled")
+                self.finish("cancelled")
+                print(f"[JOB {self.job_id}] CANCELLED after {self.successful_scrapes} cards")
+                return
+
+            store_error = None
+            if self.failed_stores:
+                store_error = "Stores failed to load: " + ", ".join(
+                    store_id or "default store" for store_id in self.failed_stores)
+                if len(self.failed_stores) == len(self.board.shards):
+                    raise RuntimeError(store_error)
+
+            with self.timings.span("export"):
+                self.export_artifacts()
+            if store_error:
+                # Deals of the stores that loaded are kept; the job is not a full week's ad
+                self.save_stats()
+                self.job_manager.update_job_status(self.job_id, "partial", store_error)
+                self.finish("partial")
+                print(f"[JOB {self.job_id}] PARTIAL: {self.successful_scrapes} cards scraped, {store_error}")
+                return
+
+            # Diffed before the job shows as completed, so /diff never finds it missing
+            with self.timings.span("diff"):
+                self.precompute_diff()
+            # Status last: a completed job's record (and the cached /status) is final
+            self.save_stats()
             self.job_manager.update_job_status(self.job_id, "completed")
+            self.finish("completed")
             
-            print(f"[JOB {self.job_id}] COMPLETED! {len(all_deals)} items")
+            print(f"[JOB {self.job_id}] COMPLETED! {self.successful_scrapes} cards scraped "
+                  f"({self.copied_cards} copied forward unchanged)")
 
         except Exception as e:
+            # Keep whatever was parsed before the failure
+            self.writer.close()
             self.job_manager.update_job_status(self.job_id, "failed", str(e))
+            self.finish("failed")
             print(f"[JOB {self.job_id}] FAILED: {e}")
             
         finally:
             if self.driver:
-                self.driver.quit()
+                self.release_driver(self.driver)
@@ -0,0 +1,204 @@
+import re
+from typing import List, Dict, Any, Iterator, Optional
+import lxml.html
+
+SOURCE_URL = "https://www.kroger.com/pr/weekly-digital-deals"
+OFFER_EVENT = "Weekly Digital Deals"
+OFFER_SALE = "Digital coupon offer"
+
+# Same matchers as scraper/bs4_parser.py, compiled once
+SIGN_IN_TO_CLIP = re.compile("Sign In To Clip", re.I)
+STRIKETHROUGH = re.compile("strikethrough", re.I)
+COUPON_PRICE = re.compile(r'\$\d+\.?\d*(?:/lb|/ea)?')
+LIST_CARD_CLASS = re.compile("flex flex-col border-solid")
+GRID_CLASS = re.compile("ProductGridContainer|AutoGrid|CouponQualifyingProductGridContainer")
+GRID_CARD_CLASS = re.compile("MiniProductCard-card-container|flex flex-col border-solid")
+NAME_CLASS = re.compile("kds-Text--m|kds-Text--bold")
+SIZE_IN_NAME = re.compile(r'(\d[\d\.]*\s*(oz|lb|g|ml|L|count|pack|each|ct)|Each|Half Gallon)', re.I)
+
+# BeautifulSoup leaves these out of get_text()
+SKIP_TEXT_TAGS = {"script", "style", "template"}
+
+
+# ================= BS4-COMPATIBLE HELPERS =================
+def _classes(el) -> str:
+    return " ".join(el.get("class", "").split())
+
+def _has_class(el, name: str) -> bool:
+    classes = _classes(el)
+    return name in classes.split() or classes == name
+
+def _class_matches(el, pattern: re.Pattern) -> bool:
+    return el.get("class") is not None and bool(pattern.search(_classes(el)))
+
+def _strings(el) -> Iterator[str]:
+    if el.tag not in SKIP_TEXT_TAGS and el.text:
+        yield el.text
+    for child in el:
+        if isinstance(child.tag, str):
+            yield from _strings(child)
+        if child.tail:
+            yield child.tail
+
+def _text(el) -> str:
+    """Equivalent of Tag.get_text(strip=True)"""
+    return "".join(s.strip() for s in _strings(el) if s.strip())
+
+def _string(el) -> Optional[str]:
+    """Equivalent of Tag.string: the only string below a chain of single children"""
+    children = [child for child in el if isinstance(child.tag, str)]
+    if not children:
+        return el.text if el.text else None
+    if len(children) == 1 and not el.text and not children[0].tail:
+        return _string(children[0])
+    return None
+
+def _elements(el) -> Iterator[Any]:
+    for node in el.iterdescendants():
+        if isinstance(node.tag, str):
+            yield node
+
+
+# ================= SINGLE-PASS PARSING =================
+def _parse_card(card) -> Dict[str, str]:
+    """Collect every field of one qualifying product card in a single walk"""
+    description = name_span = promo = data_price = orig = del_tag = size_tag = None
+    for el in _elements(card):
+        tag = el.tag
+        if tag == "span":
+            if description is None and el.get("data-testid") == "cart-page-item-description":
+                description = el
+            if name_span is None and _class_matches(el, NAME_CLASS):
+                name_span = el
+            if size_tag is None and el.get("data-testid") == "product-item-sizing":
+                size_tag = el
+        elif tag == "mark":
+            if promo is None and _has_class(el, "kds-Price-promotional"):
+                promo = el
+        elif tag == "data":
+            if data_price is None and _has_class(el, "kds-Price"):
+                data_price = el
+        elif tag == "s":
+            if orig is None and _has_class(el, "kds-Price-original"):
+                orig = el
+        elif tag == "del":
+            if del_tag is None:
+                del_tag = el
+
+    name_tag = description if description is not None else name_span
+    product_name = _text(name_tag) if name_tag is not None else "Unknown Product"
+
+    sale_price = _text(promo) if promo is not None else "N/A"
+    if sale_price == "N/A" and data_price is not None:
+        sale_price = _text(data_price)
+
+    orig_tag = orig if orig is not None else del_tag
+    orig_price = _text(orig_tag) if orig_tag is not None else ""
+
+    raw_size = _text(size_tag) if size_tag is not None else ""
+    if not raw_size or raw_size.startswith("$"):
+        match = SIZE_IN_NAME.search(product_name)
+        size = match.group(1) if match else "N/A"
+    else:
+        size = raw_size
+
+    return {"name": product_name, "price": sale_price, "original_price": orig_price, "size": size}
+
+
+def parse_kroger_modal_lxml(html: str, displayed_name: str) -> List[Dict[str, Any]]:
+    """lxml backend of parse_kroger_modal, producing identical output"""
+    root = lxml.html.document_fromstring(html) if html.strip() else lxml.html.document_fromstring("<html></html>")
+
+    clip_button = short_desc = coupon_orig = price_span = del_tag = strike_span = None
+    qualifying_section = product_list = grid = None
+
+    # One walk over the document finds every top-level anchor, in document order
+    for el in root.iter():
+        if not isinstance(el.tag, str):
+            continue
+        tag = el.tag
+        if tag == "button":
+            if clip_button is None and SIGN_IN_TO_CLIP.search(_string(el) or ""):
+                clip_button = el
+        elif tag == "h2":
+            if short_desc is None and el.get("data-testid") == "CouponDetails-shortDescription":
+                short_desc = el
+            if qualifying_section is None and _string(el) == "Qualifying Products":
+                qualifying_section = el
+        elif tag == "s":
+            if coupon_orig is None and _has_class(el, "kds-Price-original"):
+                coupon_orig = el
+        elif tag == "span":
+            if price_span is None and _has_class(el, "SWA-ModalPriceText"):
+                price_span = el
+            if strike_span is None and STRIKETHROUGH.search(_string(el) or ""):
+                strike_span = el
+        elif tag == "del":
+            if del_tag is None:
+                del_tag = el
+
+        # Equivalent of find_next() from the "Qualifying Products" heading
+        if qualifying_section is not None:
+            if product_list is None and tag == "ul" and _has_class(el, "ProductListView"):
+                product_list = el
+            if grid is None and tag == "div" and _class_matches(el, GRID_CLASS):
+                grid = el
+
+    is_coupon_modal = clip_button is not None or "CouponModal-contentWrapper" in html
+
+    competitor_price = "N/A"
+    original_price_main = "N/A"
+
+    if is_coupon_modal:
+        if short_desc is not None:
+            text = _text(short_desc)
+            price_match = COUPON_PRICE.search(text)
+            competitor_price = price_match.group() if price_match else text.split("$")[-1] if "$" in text else "N/A"
+        if coupon_orig is not None:
+            original_price_main = _text(coupon_orig)
+    else:
+        if price_span is not None:
+            competitor_price = _text(price_span)
+        strikethrough = del_tag if del_tag is not None else strike_span
+        if strikethrough is not None:
+            original_price_main = _text(strikethrough)
+
+    qualifying_cards = []
+    if qualifying_section is not None:
+        if product_list is not None:
+            for item in product_list.iterdescendants("li"):
+                card_div = next((el for el in item.iterdescendants("div") if _class_matches(el, LIST_CARD_CLASS)), None)
+                if card_div is not None:
+                    qualifying_cards.append(card_div)
+        if not qualifying_cards and grid is not None:
+            qualifying_cards = [el for el in grid.iterdescendants("div") if _class_matches(el, GRID_CARD_CLASS)]
+
+    all_products = [{
+        "competitor_product": displayed_name.strip(),
+        "competitor_price": competitor_price,
+        "original_price": original_price_main,
+        "offer_description": "Weekly Digital Deal",
+        "offer_sale": OFFER_SALE,
+        "source_URL": SOURCE_URL,
+        "competitor_product_size": "N/A",
+        "offer_event": OFFER_EVENT,
+        "Compatitor_name": "Kroger",
+        "Qualifying Products": False
+    }]
+
+    for card in qualifying_cards:
+        fields = _parse_card(card)
+        all_products.append({
+            "competitor_product": fields["name"],
+            "competitor_price": fields["price"],
+            "original_price": fields["original_price"],
+            "offer_description": "Weekly Digital Deal",
+            "offer_sale": OFFER_SALE,
+            "source_URL": SOURCE_URL,
+            "competitor_product_size": fields["size"],
+            "offer_event": OFFER_EVENT,
+            "Compatitor_name": "Kroger",
+            "Qualifying Products": True
+        })
+
+    return all_products
@@ -0,0 +1,173 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds of the latency histogram buckets; +Inf is implicit
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+METRIC_PREFIX = "kroger"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (Prometheus style: cumulative when rendered)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le label, observations at or below it) for every bucket, +Inf last"""
+        total = 0
+        rows = []
+        for bound, count in zip(list(self.buckets) + [float("inf")], self.counts):
+            total += count
+            rows.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return rows
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        for le, total in self.cumulative():
+            if total >= rank:
+                return None if le == "+Inf" else float(le)
+        return None
+
+    def as_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total_seconds": round(self.sum, 3),
+            "mean_seconds": round(self.sum / self.count, 3) if self.count else None,
+            "max_seconds": round(self.max, 3),
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "buckets": dict(self.cumulative()),
+        }
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    return ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+
+
+class MetricsRegistry:
+    """Process-wide phase histograms and counters, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self.phases: Dict[Tuple[str, str], Histogram] = {}
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, engine: str, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases.setdefault((engine, phase), Histogram()).observe(seconds)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def render(self, gauges: Optional[Dict[str, float]] = None,
+               counters: Optional[Dict[str, float]] = None) -> str:
+        """Exposition text: phase histograms, counters, then the caller's own counters and gauges
+
+        `counters` are running totals kept outside the registry (e.g. browsers
+        started by the pool); `gauges` are point-in-time values.
+        """
+        name = f"{METRIC_PREFIX}_phase_duration_seconds"
+        lines = [f"# HELP {name} Time spent per scrape phase (per card for card, click and modal_wait)",
+                 f"# TYPE {name} histogram"]
+        with self._lock:
+            for (engine, phase), histogram in sorted(self.phases.items()):
+                labels = {"engine": engine, "phase": phase}
+                for le, total in histogram.cumulative():
+                    lines.append(f"{name}_bucket{{{_labels({**labels, 'le': le})}}} {total}")
+                lines.append(f"{name}_sum{{{_labels(labels)}}} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{{{_labels(labels)}}} {histogram.count}")
+
+            for counter in sorted({counter for counter, _ in self.counters}):
+                metric = f"{METRIC_PREFIX}_{counter}_total"
+                lines += [f"# TYPE {metric} counter"]
+                lines += [f"{metric}{{{_labels(dict(labels))}}} {value:g}"
+                          for (other, labels), value in sorted(self.counters.items()) if other == counter]
+
+        for counter, value in sorted((counters or {}).items()):
+            metric = f"{METRIC_PREFIX}_{counter}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value:g}"]
+        for gauge, value in sorted((gauges or {}).items()):
+            metric = f"{METRIC_PREFIX}_{gauge}"
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value:g}"]
+        return "\n".join(lines) + "\n"
+
+
+# Everything this process scraped, served by /metrics
+METRICS = MetricsRegistry()
+
+
+class JobTimings:
+    """Span timings and browser traffic of one job, kept per phase and mirrored into METRICS
+
+    Spans may be opened from several worker threads at once; each phase keeps
+    a latency histogram, so per-card phases show their distribution and not
+    just a total.
+    """
+
+    def __init__(self, engine: str = "browser", registry: MetricsRegistry = METRICS):
+        self.engine = engine
+        self.registry = registry
+        self.phases: Dict[str, Histogram] = {}
+        # Requests, blocked requests and bytes received by the job's browsers
+        self.traffic: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases.setdefault(phase, Histogram()).observe(seconds)
+        self.registry.observe(self.engine, phase, seconds)
+
+    @contextmanager
+    def span(self, phase: str) -> Iterator[None]:
+        """Time the enclosed block as one observation of `phase`, even if it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - start)
+
+    def add_traffic(self, traffic: Dict[str, int]) -> None:
+        """Count browser traffic read from a performance log (see scraper.blocking)"""
+        with self._lock:
+            for key, value in traffic.items():
+                self.traffic[key] = self.traffic.get(key, 0) + value
+        self.registry.inc("browser_requests", traffic.get("requests", 0), engine=self.engine)
+        self.registry.inc("blocked_requests", traffic.get("blocked", 0), engine=self.engine)
+        self.registry.inc("received_bytes", traffic.get("bytes", 0), engine=self.engine)
+
+    def finish(self, status: str, **cards: int) -> None:
+        """Count the finished job and its cards by outcome (e.g. successful=10, failed=2)"""
+        self.registry.inc("jobs", engine=self.engine, status=status)
+        for result, count in cards.items():
+            self.registry.inc("cards", count, engine=self.engine, result=result)
+
+    def as_dict(self) -> Dict[str, Dict]:
+        """Phase histograms, plus "traffic" once any browser traffic was counted"""
+        with self._lock:
+            timings = {phase: histogram.as_dict() for phase, histogram in self.phases.items()}
+            if self.traffic:
+                timings["traffic"] = dict(self.traffic)
+            return timings
@@ -0,0 +1,160 @@
+import base64
+import json
+import re
+from typing import List, Dict, Any, Iterable, Optional
+
+SOURCE_URL = "https://www.kroger.com/pr/weekly-digital-deals"
+OFFER_EVENT = "Weekly Digital Deals"
+OFFER_SALE = "Digital coupon offer"
+
+# Responses worth keeping: the JSON calls the weekly ad page makes for its deals
+WEEKLY_AD_API_PATTERNS = [
+    re.compile(r"/atlas/v1/", re.I),
+    re.compile(r"weeklyad", re.I),
+    re.compile(r"weekly-?deals", re.I),
+    re.compile(r"/cl/api/", re.I),
+]
+
+# Field names seen on deal objects in those payloads, in order of preference
+NAME_KEYS = ("mainlineCopy", "headline", "title", "name", "description")
+PRICE_KEYS = ("salePrice", "promoPrice", "price", "priceText", "underlineCopy", "offerPrice")
+ORIGINAL_PRICE_KEYS = ("regularPrice", "originalPrice", "wasPrice")
+SIZE_KEYS = ("size", "productSize", "packageSize", "customerFacingSize")
+QUALIFYING_KEYS = ("qualifyingProducts", "products")
+
+
+# ================= CHROME SETUP =================
+def enable_performance_logging(options) -> None:
+    """Ask chromedriver to record DevTools Network events in the performance log"""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+# ================= CAPTURE =================
+def collect_json_responses(driver, url_patterns: Iterable[re.Pattern] = WEEKLY_AD_API_PATTERNS,
+                           entries: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Pull JSON response bodies for matching requests out of the performance log
+
+    Each call drains the log, so call it once the weekly ad has finished loading.
+    Pass `entries` when the log was already read for something else.
+    """
+    captures = []
+    for entry in driver.get_log("performance") if entries is None else entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        if message.get("method") != "Network.responseReceived":
+            continue
+
+        params = message.get("params", {})
+        response = params.get("response", {})
+        url = response.get("url", "")
+        if "json" not in response.get("mimeType", "") or not any(p.search(url) for p in url_patterns):
+            continue
+
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": params["requestId"]})
+            text = body["body"]
+            if body.get("base64Encoded"):
+                text = base64.b64decode(text).decode("utf-8")
+            captures.append({"url": url, "payload": json.loads(text)})
+        except Exception:
+            # Body already evicted from the browser cache, or not actually JSON
+            continue
+    return captures
+
+
+# ================= FIXTURES =================
+def save_fixture(captures: List[Dict[str, Any]], path: str) -> None:
+    """Record captured payloads so the mapping can be replayed offline"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(captures, f, ensure_ascii=False)
+
+
+def load_fixture(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ================= MAPPING =================
+def normalize_name(name: str) -> str:
+    """Key used to match payload deals against card names on the page"""
+    return re.sub(r"[^a-z0-9]+", " ", name.lower()).strip()
+
+
+def _first(obj: Dict[str, Any], keys: Iterable[str]) -> Optional[Any]:
+    for key in keys:
+        value = obj.get(key)
+        if value not in (None, "", [], {}):
+            return value
+    return None
+
+
+def _price_text(value: Any) -> str:
+    if value is None:
+        return "N/A"
+    if isinstance(value, (int, float)):
+        return f"${value:.2f}"
+    if isinstance(value, dict):
+        return _price_text(_first(value, ("promo", "sale", "display", "regular", "amount")))
+    return str(value).strip() or "N/A"
+
+
+def _deal(name: str, obj: Dict[str, Any], qualifying: bool) -> Dict[str, Any]:
+    size = _first(obj, SIZE_KEYS)
+    original = _first(obj, ORIGINAL_PRICE_KEYS)
+    return {
+        "competitor_product": name.strip(),
+        "competitor_price": _price_text(_first(obj, PRICE_KEYS)),
+        "original_price": _price_text(original) if original is not None else ("" if qualifying else "N/A"),
+        "offer_description": "Weekly Digital Deal",
+        "offer_sale": OFFER_SALE,
+        "source_URL": SOURCE_URL,
+        "competitor_product_size": str(size).strip() if size else "N/A",
+        "offer_event": OFFER_EVENT,
+        "Compatitor_name": "Kroger",
+        "Qualifying Products": qualifying
+    }
+
+
+def map_payload_to_deals(payload: Any) -> List[Dict[str, Any]]:
+    """Walk a payload and map every deal-shaped object to the parse_kroger_modal schema
+
+    An object counts as a deal when it has both a name and a price field. Its
+    nested product list, if any, becomes the deal's qualifying products.
+    """
+    deals = []
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        name = _first(node, NAME_KEYS)
+        if isinstance(name, str) and _first(node, PRICE_KEYS) is not None:
+            deals.append(_deal(name, node, qualifying=False))
+            for product in _first(node, QUALIFYING_KEYS) or []:
+                product_name = _first(product, NAME_KEYS) if isinstance(product, dict) else None
+                if isinstance(product_name, str):
+                    deals.append(_deal(product_name, product, qualifying=True))
+            continue
+
+        stack.extend(reversed(list(node.values())))
+    return deals
+
+
+def harvest_deals(captures: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group mapped deals by normalized main-product name, first occurrence wins"""
+    harvested: Dict[str, List[Dict[str, Any]]] = {}
+    for capture in captures:
+        current = None
+        for deal in map_payload_to_deals(capture.get("payload")):
+            if not deal["Qualifying Products"]:
+                key = normalize_name(deal["competitor_product"])
+                current = None if key in harvested else harvested.setdefault(key, [])
+            if current is not None:
+                current.append(deal)
+    return harvested
@@ -0,0 +1,84 @@
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from scraper.metrics import JobTimings
+
+# parse_fn(html, name) -> deals; must be a module-level function so it can be pickled
+ParseFn = Callable[[str, str], List[Dict]]
+# sink(deals or None if parsing raised, name, tag given to submit())
+Sink = Callable[[Optional[List[Dict]], str, Any], None]
+
+_STOP = object()
+
+
+def _timed(parse_fn: ParseFn, html: str, name: str) -> Tuple[List[Dict], float]:
+    """Runs in the pool: the parse result and the CPU-side time it took"""
+    start = time.perf_counter()
+    return parse_fn(html, name), time.perf_counter() - start
+
+
+class ParsePipeline:
+    """Producer/consumer pipeline that moves modal parsing off the browser threads
+
+    Browser threads only call submit() with raw modal HTML. Parsing runs in a
+    process pool, and a single consumer thread hands the results to `sink` in
+    submission order, so the sink never needs to be thread-safe against itself.
+    """
+
+    def __init__(self, parse_fn: ParseFn, sink: Sink, workers: Optional[int] = None, max_pending: int = 64,
+                 timings: Optional[JobTimings] = None):
+        self.parse_fn = parse_fn
+        self.sink = sink
+        # Parse time is measured inside the pool, so queueing for a free process isn't counted
+        self.timings = timings
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        # Bounded so a slow pool pushes back on the browsers instead of buffering HTML
+        self.pending: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending)
+        self.consumer = threading.Thread(target=self._consume, daemon=True)
+        self.consumer.start()
+        self.closed = False
+
+    def submit(self, html: str, name: str, tag: Any = None) -> None:
+        """Queue one modal for parsing; blocks while `max_pending` modals are in flight
+
+        `tag` is not sent to the pool, only handed back to the sink with the result.
+        """
+        self.pending.put((self.executor.submit(partial(_timed, self.parse_fn), html, name), name, tag))
+
+    def _consume(self) -> None:
+        while True:
+            item = self.pending.get()
+            if item is _STOP:
+                break
+            future, name, tag = item
+            try:
+                products, seconds = future.result()
+                if self.timings is not None:
+                    self.timings.observe("parse", seconds)
+            except Exception as e:
+                print(f"Error parsing {name}: {e}")
+                products = None
+            try:
+                self.sink(products, name, tag)
+            except Exception as e:
+                # Keep draining: a dead consumer would block every browser thread on submit()
+                print(f"Error storing {name}: {e}")
+
+    def close(self) -> None:
+        """Wait for every queued modal to be parsed and delivered, then stop the pool"""
+        if self.closed:
+            return
+        self.closed = True
+        self.pending.put(_STOP)
+        self.consumer.join()
+        self.executor.shutdown()
+
+    def __enter__(self) -> "ParsePipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
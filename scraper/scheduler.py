@@ -0,0 +1,132 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# on_state(job_id, state) with state "queued" or "cancelled", for jobs that never reach run()
+StateHook = Callable[[str, str], None]
+
+
+class ScheduledJob:
+    def __init__(self, job_id: str, run: Callable[[], None], priority: int,
+                 cancel: Optional[Callable[[], None]] = None):
+        self.job_id = job_id
+        self.run = run
+        self.priority = priority
+        self.cancel = cancel
+
+
+class JobScheduler:
+    """Bounded pool of job threads fed from a priority queue
+
+    Lower `priority` values run first; jobs of equal priority run in
+    submission order. Running jobs are cancelled through the `cancel` callback
+    they were submitted with, so each engine decides how to stop cleanly.
+    """
+
+    def __init__(self, max_concurrent: int = 2, on_state: Optional[StateHook] = None):
+        self.max_concurrent = max(1, max_concurrent)
+        self.on_state = on_state
+        self._heap: List[Tuple[int, int, str]] = []
+        self._queued: Dict[str, ScheduledJob] = {}
+        self._running: Dict[str, ScheduledJob] = {}
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._accepting = True
+        self._threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(self.max_concurrent)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, job_id: str, run: Callable[[], None], priority: int = 0,
+               cancel: Optional[Callable[[], None]] = None) -> int:
+        """Queue a job and return its position (0 = next to start)"""
+        with self._cond:
+            if not self._accepting:
+                raise RuntimeError("Scheduler is shutting down")
+            self._queued[job_id] = ScheduledJob(job_id, run, priority, cancel)
+            heapq.heappush(self._heap, (priority, next(self._order), job_id))
+            if self.on_state:
+                self.on_state(job_id, "queued")
+            self._cond.notify()
+            return self._position(job_id)
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Place of a queued job in line, None if it is not queued"""
+        with self._cond:
+            return self._position(job_id)
+
+    def _position(self, job_id: str) -> Optional[int]:
+        if job_id not in self._queued:
+            return None
+        ordered = sorted(entry for entry in self._heap if entry[2] in self._queued)
+        return [entry[2] for entry in ordered].index(job_id)
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """Cancel a queued or running job; returns the state it was in, None if unknown"""
+        with self._cond:
+            job = self._queued.pop(job_id, None)
+            if job is not None:
+                # Its heap entry is skipped when popped
+                if self.on_state:
+                    self.on_state(job_id, "cancelled")
+                return "queued"
+            job = self._running.get(job_id)
+        if job is None:
+            return None
+        if job.cancel:
+            job.cancel()
+        return "running"
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "running": len(self._running),
+                "queued": len(self._queued),
+            }
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while self._accepting and not self._queued:
+                    self._cond.wait()
+                if not self._accepting:
+                    return
+                _, _, job_id = heapq.heappop(self._heap)
+                job = self._queued.pop(job_id, None)
+                if job is None:
+                    continue
+                self._running[job_id] = job
+
+            try:
+                job.run()
+            except Exception as e:
+                print(f"[JOB {job_id}] Scheduler caught: {e}")
+            finally:
+                with self._cond:
+                    self._running.pop(job_id, None)
+                    self._cond.notify_all()
+
+    def shutdown(self, timeout: Optional[float] = 30) -> None:
+        """Stop taking jobs, drop the queue, cancel running jobs and wait for them to wind down"""
+        with self._cond:
+            self._accepting = False
+            dropped = list(self._queued)
+            self._queued.clear()
+            self._heap.clear()
+            running = list(self._running.values())
+            self._cond.notify_all()
+
+        if self.on_state:
+            for job_id in dropped:
+                self.on_state(job_id, "cancelled")
+        for job in running:
+            if job.cancel:
+                job.cancel()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
@@ -0,0 +1,125 @@
+import os
+import time
+from typing import List, Optional, Tuple
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from scraper.waits import WaitStats
+
+CARD_SELECTOR = "div.kds-Card.SWA-Omni"
+
+# How long the card count must stay put after a jump before the ad counts as fully loaded
+QUIET_SECONDS = float(os.environ.get("KROGER_SCROLL_QUIET_SECONDS", "1.5"))
+
+# How long the page may take to render its first card before the ad counts as failed to load
+FIRST_CARD_TIMEOUT = float(os.environ.get("KROGER_FIRST_CARD_TIMEOUT", "30"))
+
+# Installs (once per page) a MutationObserver that keeps the card count and its
+# history, jumps to the last card, then resolves as soon as a new card shows up
+# or once the count has been quiet for `quietMs`.
+JUMP_AND_WAIT_JS = """
+const [selector, quietMs, done] = arguments;
+let state = window.__cardLoader;
+if (!state) {
+    state = window.__cardLoader = {count: 0, history: [], waiters: []};
+    let scheduled = false;
+    const recount = () => {
+        scheduled = false;
+        const count = document.querySelectorAll(selector).length;
+        if (count === state.count) return;
+        state.count = count;
+        state.history.push([Math.round(performance.now()), count]);
+        state.waiters.splice(0).forEach(wake => wake());
+    };
+    // Mutations come in bursts while cards render: recount once per burst
+    state.observer = new MutationObserver(() => {
+        if (!scheduled) { scheduled = true; setTimeout(recount, 50); }
+    });
+    state.observer.observe(document.body, {childList: true, subtree: true});
+    recount();
+}
+
+const before = state.count;
+let finished = false;
+const finish = () => {
+    if (finished) return;
+    finished = true;
+    clearTimeout(timer);
+    done({count: state.count, changed: state.count !== before});
+};
+const timer = setTimeout(finish, quietMs);
+state.waiters.push(finish);
+
+const cards = document.querySelectorAll(selector);
+if (cards.length) cards[cards.length - 1].scrollIntoView({block: 'end'});
+window.scrollTo(0, document.body.scrollHeight);
+"""
+
+
+class CardLoader:
+    """Loads every lazily rendered card of an infinite-scroll page
+
+    Each step jumps straight to the last card and returns the moment the
+    page adds a card, so scrolling runs at the page's own pace; loading ends
+    once the count stays unchanged for `quiet` seconds. `history` keeps
+    (milliseconds since navigation, card count) for every change seen.
+
+    The quiet window only starts once the first card has rendered: a page
+    still fetching its deals would otherwise look fully loaded with no cards.
+    """
+
+    def __init__(self, driver, selector: str = CARD_SELECTOR, quiet: float = QUIET_SECONDS,
+                 timeout: float = 300, stats: Optional[WaitStats] = None,
+                 first_card_timeout: float = FIRST_CARD_TIMEOUT):
+        self.driver = driver
+        self.selector = selector
+        self.quiet = quiet
+        self.timeout = timeout
+        self.first_card_timeout = first_card_timeout
+        self.stats = stats
+        self.jumps = 0
+        self.history: List[Tuple[int, int]] = []
+
+    def wait_for_first_card(self) -> bool:
+        """Wait until at least one card is in the DOM; False if none shows up in time"""
+        try:
+            WebDriverWait(self.driver, self.first_card_timeout, poll_frequency=0.1).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, self.selector))
+            )
+            return True
+        except TimeoutException:
+            return False
+
+    def load(self) -> int:
+        """Scroll until no new cards appear and return the card count
+
+        Raises RuntimeError if no card renders at all: an empty weekly ad is a
+        failed load, not a store without deals.
+        """
+        start = time.monotonic()
+        if not self.wait_for_first_card():
+            raise RuntimeError(f"No weekly ad cards rendered within {self.first_card_timeout:g}s")
+        self.driver.set_script_timeout(self.quiet + 10)
+        count = 0
+        while time.monotonic() - start < self.timeout:
+            result = self.driver.execute_async_script(JUMP_AND_WAIT_JS, self.selector, int(self.quiet * 1000))
+            self.jumps += 1
+            count = result["count"]
+            if not result["changed"]:
+                break
+
+        self.history = [tuple(point) for point in self.driver.execute_script(
+            "return window.__cardLoader ? window.__cardLoader.history : []"
+        )]
+        if self.stats is not None:
+            # Baseline: the fixed 500px / 1s steps this replaced, one per jump at the very least
+            self.stats.record("scroll", time.monotonic() - start, float(self.jumps))
+        return count
+
+
+def load_all_cards(driver, stats: Optional[WaitStats] = None, quiet: float = QUIET_SECONDS) -> int:
+    """Scroll a weekly ad until every card is rendered and return how many there are"""
+    return CardLoader(driver, quiet=quiet, stats=stats).load()
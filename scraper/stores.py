@@ -0,0 +1,98 @@
+import os
+import queue
+import threading
+from typing import List, Optional, Tuple
+
+KROGER_URL = "https://www.kroger.com"
+WEEKLY_AD_URL = "https://www.kroger.com/weeklyad/weeklyad"
+# The weekly ad picks its store from the query string; overridable in case the site renames it
+STORE_AD_URL = os.environ.get("KROGER_STORE_AD_URL", WEEKLY_AD_URL + "?StoreCode={store_id}")
+
+
+def weekly_ad_url(store_id: Optional[str] = None) -> str:
+    """Weekly ad for `store_id`, or the default (session) store's ad"""
+    return STORE_AD_URL.format(store_id=store_id) if store_id else WEEKLY_AD_URL
+
+
+def parse_store_ids(value: Optional[str]) -> List[str]:
+    """Comma separated store IDs from a query parameter, blanks and repeats dropped"""
+    store_ids = []
+    for store_id in (value or "").split(","):
+        store_id = store_id.strip()
+        if store_id and store_id not in store_ids:
+            store_ids.append(store_id)
+    return store_ids
+
+
+# ================= SHARDING =================
+class StoreShard:
+    """One store's weekly ad: the card indices left to open and who is working on them"""
+
+    def __init__(self, store_id: Optional[str]):
+        self.store_id = store_id
+        self.cards: "queue.Queue[int]" = queue.Queue()
+        self.opened = False    # a worker claimed it to load the ad and queue its cards
+        self.ready = False     # cards are queued (or loading failed)
+        self.workers = 0
+        self.processed = 0     # limit slots taken in this store
+        self.fingerprints: List[str] = []    # listing fingerprint per card index, when incremental
+
+
+class ShardBoard:
+    """Hands stores to worker browsers, one store context per worker at a time
+
+    Every unopened store goes to its own worker first; once all stores are
+    open, idle workers join the store with the most cards left per worker.
+    `limit` applies to each store separately.
+    """
+
+    def __init__(self, store_ids: List[Optional[str]], limit: int, stop: Optional[threading.Event] = None):
+        self.shards = [StoreShard(store_id) for store_id in store_ids]
+        self.limit = limit
+        self.stop = stop or threading.Event()
+        self._cond = threading.Condition()
+
+    def claim(self) -> Optional[Tuple[StoreShard, bool]]:
+        """(shard, True if the caller must load it and queue its cards), or None when no work is left"""
+        with self._cond:
+            while not self.stop.is_set():
+                for shard in self.shards:
+                    if not shard.opened:
+                        shard.opened = True
+                        shard.workers += 1
+                        return shard, True
+
+                joinable = [shard for shard in self.shards
+                            if shard.ready and shard.processed < self.limit and shard.cards.qsize() > shard.workers]
+                if joinable:
+                    shard = max(joinable, key=lambda s: s.cards.qsize() / (s.workers + 1))
+                    shard.workers += 1
+                    return shard, False
+
+                if all(shard.ready for shard in self.shards):
+                    return None
+                # A store is still loading: its cards may need more hands
+                self._cond.wait(timeout=1.0)
+            return None
+
+    def mark_ready(self, shard: StoreShard) -> None:
+        with self._cond:
+            shard.ready = True
+            self._cond.notify_all()
+
+    def leave(self, shard: StoreShard) -> None:
+        with self._cond:
+            shard.workers -= 1
+
+    def claim_slot(self, shard: StoreShard) -> bool:
+        """Reserve one of the store's `limit` card slots"""
+        with self._cond:
+            if shard.processed >= self.limit or self.stop.is_set():
+                return False
+            shard.processed += 1
+            return True
+
+    def release_slot(self, shard: StoreShard) -> None:
+        """Give back a slot claimed for a card that was skipped"""
+        with self._cond:
+            shard.processed -= 1
@@ -0,0 +1,129 @@
+import time
+import threading
+from typing import Dict
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+MODAL_SELECTOR = "div[role='dialog']"
+
+
+# ================= ADAPTIVE DELAY =================
+class AdaptiveDelay:
+    """Pacing delay that shrinks while the page answers quickly and backs off when it doesn't"""
+
+    def __init__(self, initial: float = 0.5, minimum: float = 0.05, maximum: float = 3.0,
+                 shrink: float = 0.8, backoff: float = 2.0, fast_threshold: float = 0.5):
+        self.current = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.shrink = shrink
+        self.backoff = backoff
+        self.fast_threshold = fast_threshold
+        self._lock = threading.Lock()
+
+    def observe(self, elapsed: float, timed_out: bool = False) -> None:
+        """Feed back how long the last wait took"""
+        with self._lock:
+            if timed_out or elapsed > self.fast_threshold * 2:
+                self.current = min(self.maximum, self.current * self.backoff)
+            elif elapsed <= self.fast_threshold:
+                self.current = max(self.minimum, self.current * self.shrink)
+
+    def sleep(self) -> float:
+        """Sleep for the current delay and return it"""
+        delay = self.current
+        time.sleep(delay)
+        return delay
+
+
+# ================= WAIT STATS =================
+class WaitStats:
+    """Per-phase totals of time spent waiting versus the fixed sleeps that were replaced"""
+
+    def __init__(self):
+        self.phases: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, phase: str, waited: float, baseline: float) -> None:
+        with self._lock:
+            entry = self.phases.setdefault(phase, {"waits": 0, "waited_seconds": 0.0, "baseline_seconds": 0.0})
+            entry["waits"] += 1
+            entry["waited_seconds"] += waited
+            entry["baseline_seconds"] += baseline
+
+    def as_dict(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                phase: {
+                    "waits": entry["waits"],
+                    "waited_seconds": round(entry["waited_seconds"], 3),
+                    "baseline_seconds": round(entry["baseline_seconds"], 3),
+                    "saved_seconds": round(entry["baseline_seconds"] - entry["waited_seconds"], 3)
+                }
+                for phase, entry in self.phases.items()
+            }
+
+
+# ================= DOM CONDITION WAITS =================
+class PageWaiter:
+    """Waits on concrete DOM conditions of one driver, feeding the adaptive delay and stats"""
+
+    def __init__(self, driver, stats: WaitStats, delay: AdaptiveDelay, poll: float = 0.05):
+        self.driver = driver
+        self.stats = stats
+        self.delay = delay
+        self.poll = poll
+
+    def _until(self, condition, timeout: float, phase: str, baseline: float):
+        start = time.monotonic()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=self.poll).until(condition)
+            timed_out = False
+        except TimeoutException:
+            result = None
+            timed_out = True
+        elapsed = time.monotonic() - start
+        self.delay.observe(elapsed, timed_out)
+        self.stats.record(phase, elapsed, baseline)
+        return result
+
+    def document_ready(self, timeout: float = 30, baseline: float = 0.0, phase: str = "page_load") -> bool:
+        """Wait until the document has finished loading"""
+        return bool(self._until(
+            lambda d: d.execute_script("return document.readyState") == "complete",
+            timeout, phase, baseline
+        ))
+
+    def modal_attached(self, timeout: float = 10, baseline: float = 0.0, phase: str = "modal_open"):
+        """Wait for the product modal to be attached and return it, or None on timeout"""
+        return self._until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, MODAL_SELECTOR)),
+            timeout, phase, baseline
+        )
+
+    def modal_detached(self, timeout: float = 5, baseline: float = 0.0, phase: str = "modal_close") -> bool:
+        """Wait until no product modal is visible"""
+        return bool(self._until(
+            EC.invisibility_of_element_located((By.CSS_SELECTOR, MODAL_SELECTOR)),
+            timeout, phase, baseline
+        ))
+
+    def scroll_height_changed(self, last_height: int, timeout: float = 5,
+                              baseline: float = 0.0, phase: str = "scroll") -> int:
+        """Wait for the page to grow past `last_height` and return the new height
+
+        Returns `last_height` unchanged if nothing new was loaded within `timeout`,
+        which callers treat as the scroll height being stable.
+        """
+        height = self._until(
+            lambda d: (h := d.execute_script("return document.body.scrollHeight")) != last_height and h,
+            timeout, phase, baseline
+        )
+        return height or last_height
+
+    def pace(self, baseline: float, phase: str) -> None:
+        """Adaptive pause between actions where there is no DOM condition to wait on"""
+        waited = self.delay.sleep()
+        self.stats.record(phase, waited, baseline)
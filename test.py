@@ -1,51 +1,71 @@
 # main.py — FINAL 100% WORKING ASYNC KROGER SCRAPER
+import gzip
 import json
-import time
 import os
 import uuid
 import threading
+from contextlib import asynccontextmanager
 from datetime import datetime
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
+from fastapi import Request
 
 # Your scraper imports
-from scraper.driver import init_driver
+from scraper.driver import DriverPool, init_driver
 from scraper.bs4_parser import parse_kroger_modal
-from scraper.kroger_scrapper import close_popups, get_modal_html, enhanced_scroll_to_bottom, get_displayed_name
+from scraper.kroger_scrapper import close_popups, get_modal_html, tag_store
+from scraper.scroll_loader import load_all_cards
+from scraper.card_handles import CardHandles
+from scraper.waits import AdaptiveDelay, PageWaiter, WaitStats
+from scraper.pipeline import ParsePipeline
+from scraper.metrics import JobTimings
+from scraper.scheduler import JobScheduler
+from scraper.stores import parse_store_ids, weekly_ad_url
+from output.cache import ResponseCache, etag_matches
+from output.artifacts import write_atomic
+from output.registry import JobRegistry
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-
-app = FastAPI()
+from selenium.common.exceptions import StaleElementReferenceException
+
+MAX_CONCURRENT_JOBS = int(os.environ.get("KROGER_MAX_CONCURRENT_JOBS", "2"))
+scheduler = None
+# Warm browsers borrowed by each job instead of starting Chrome per job
+driver_pool = DriverPool(init_driver, size=MAX_CONCURRENT_JOBS)
+
+def record_job_state(job_id: str, state: str):
+    # Queued jobs are registered by start_scrape; this only sees jobs cancelled before starting
+    if state == "cancelled":
+        registry.update(job_id, status="cancelled")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global scheduler
+    scheduler = JobScheduler(MAX_CONCURRENT_JOBS, on_state=record_job_state)
+    driver_pool.warm()
+    yield
+    # Running jobs stop at their next card and still save what they have
+    scheduler.shutdown(timeout=60)
+    driver_pool.close()
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 
 JOBS_DIR = "/Users/abhishek/kroger/scrapper_v2/jobs"
 os.makedirs(JOBS_DIR, exist_ok=True)
-STATUS_FILE = os.path.join(JOBS_DIR, "status.json")
-
-# === Initialize status.json safely ===
-def init_status_file():
-    if not os.path.exists(STATUS_FILE) or os.path.getsize(STATUS_FILE) == 0:
-        initial = {
-            "current_job": None,
-            "jobs": {}
-        }
-        with open(STATUS_FILE, "w", encoding="utf-8") as f:
-            json.dump(initial, f, indent=2)
-
-init_status_file()  # ← This was missing!
-
-def load_status():
-    with open(STATUS_FILE, "r", encoding="utf-8") as f:
-        content = f.read().strip()
-        if not content:
-            return {"current_job": None, "jobs": {}}
-        return json.loads(content)
-
-def save_status(data):
-    with open(STATUS_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+STATUS_FILE = os.path.join(JOBS_DIR, "status.json")  # legacy, imported into the registry once
+REGISTRY_FILE = os.path.join(JOBS_DIR, "registry.db")
+FLUSH_BATCH = 50  # deals appended to the partial results file per write
+
+# Completed job files never change: keep their bytes so polls skip the disk and JSON parsing
+result_cache = ResponseCache()
+
+# === Job registry: one row per job, atomic updates, safe concurrent reads ===
+registry = JobRegistry(REGISTRY_FILE)
+registry.import_status_file(STATUS_FILE)
+registry.fail_interrupted()
 
 def save_job_result(job_id: str, deals):
     path = os.path.join(JOBS_DIR, f"{job_id}.json")
@@ -56,132 +76,248 @@ def save_job_result(job_id: str, deals):
         "total": len(deals),
         "deals": deals
     }
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+    # Compact bytes are what /status serves; the .gz twin goes to clients that accept gzip
+    body = json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    write_atomic(path, [body])
+    write_atomic(path + ".gz", [body], "gzip")
+
+# === Partial results (NDJSON, appended while the job runs) ===
+def partial_result_path(job_id: str):
+    return os.path.join(JOBS_DIR, f"{job_id}.partial.ndjson")
+
+def append_partial_results(job_id: str, deals):
+    with open(partial_result_path(job_id), "a", encoding="utf-8") as f:
+        for deal in deals:
+            f.write(json.dumps(deal, ensure_ascii=False) + "\n")
+
+def load_partial_results(job_id: str):
+    path = partial_result_path(job_id)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
 
 # === Background Scraper ===
-def run_scraper(job_id: str, limit: int):
+def click_card(driver, card):
+    for sel in ["button[data-testid='SWA-Omni-ImageContainer']", "button[role='button'] img"]:
+        try:
+            btn = WebDriverWait(card, 5).until(EC.element_to_be_clickable((By.CSS_SELECTOR, sel)))
+            driver.execute_script("arguments[0].click();", btn)
+            return True
+        except StaleElementReferenceException:
+            raise
+        except:
+            continue
+    return False
+
+def run_scraper(job_id: str, limit: int, cancelled: threading.Event, store_ids=None):
     print(f"[JOB {job_id}] Starting...")
-    status = load_status()
-    status["current_job"] = job_id
-    status["jobs"][job_id] = {"status": "running", "started_at": datetime.now().isoformat()}
-    save_status(status)
+    registry.update(job_id, status="running", started_at=datetime.now().isoformat())
 
     driver = None
-    try:
-        driver = init_driver()
-        all_deals = []
-
-        driver.get("https://www.kroger.com/weeklyad/weeklyad")
-        WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(5)
+    pipeline = None
+    wait_stats = WaitStats()
+    timings = JobTimings("browser")
+
+    # Filled by the pipeline's consumer thread, flushed from it and from this one
+    pending = []
+    pending_lock = threading.Lock()
+    saved = 0
+
+    def flush():
+        nonlocal saved
+        with pending_lock:
+            if not pending:
+                return
+            with timings.span("result_write"):
+                append_partial_results(job_id, pending)
+            saved += len(pending)
+            pending.clear()
+            registry.update(job_id, scraped=saved)
+
+    def collect(products, name, store_id):
+        with pending_lock:
+            pending.extend(tag_store(products or [], store_id))
+            full = len(pending) >= FLUSH_BATCH
+        if full:
+            flush()
 
-        for _ in range(5):
-            close_popups(driver)
-            time.sleep(0.5)
+    try:
+        with timings.span("driver_start"):
+            driver = driver_pool.acquire()
+        waiter = PageWaiter(driver, wait_stats, AdaptiveDelay())
 
-        enhanced_scroll_to_bottom(driver)
-        cards = driver.find_elements(By.CSS_SELECTOR, "div.kds-Card.SWA-Omni")
-        print(f"[JOB {job_id}] Found {len(cards)} cards")
+        # Browser thread only captures modal HTML; parsing runs in a process pool
+        pipeline = ParsePipeline(parse_kroger_modal, collect, timings=timings)
 
-        processed = 0
-        for idx in range(len(cards)):
-            if processed >= limit:
+        # One browser here, so stores run one after another; `limit` applies per store
+        for store_id in store_ids or [None]:
+            if cancelled.is_set():
                 break
-            try:
-                card = driver.find_elements(By.CSS_SELECTOR, "div.kds-Card.SWA-Omni")[idx]
-                name = get_displayed_name(card)
-                if not name or "Unknown" in name:
+            with timings.span("page_load"):
+                driver.get(weekly_ad_url(store_id))
+                WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+                waiter.document_ready(timeout=30, baseline=5.0)
+
+                for _ in range(5):
+                    close_popups(driver, waiter)
+                    waiter.pace(baseline=0.5, phase="popups")
+
+            with timings.span("scroll"):
+                load_all_cards(driver, wait_stats)
+            # Cards are numbered once; each lookup below is O(1) instead of re-querying the list
+            handles = CardHandles(driver)
+            card_count = handles.snapshot()
+            print(f"[JOB {job_id}] {store_id or 'default store'}: found {card_count} cards")
+
+            processed = 0
+            for idx in range(card_count):
+                if processed >= limit or cancelled.is_set():
+                    break
+                try:
+                    with timings.span("card"):
+                        opened = handles.open(idx)
+                        if opened is None:
+                            continue
+                        card, name = opened
+                        if not name or "Unknown" in name:
+                            continue
+
+                        with timings.span("click"):
+                            try:
+                                clicked = click_card(driver, card)
+                            except StaleElementReferenceException:
+                                # Re-rendered under us: the handle resolves the card's new node
+                                opened = handles.open(idx)
+                                clicked = opened is not None and click_card(driver, opened[0])
+                        if not clicked:
+                            continue
+
+                        with timings.span("modal_wait"):
+                            modal_html = get_modal_html(driver, waiter)
+                        pipeline.submit(modal_html, name, tag=store_id)
+                        processed += 1
+                        close_popups(driver, waiter)
+
+                except Exception as e:
+                    print(f"[JOB {job_id}] Card error: {e}")
                     continue
 
-                clicked = False
-                for sel in ["button[data-testid='SWA-Omni-ImageContainer']", "button[role='button'] img"]:
-                    try:
-                        btn = WebDriverWait(card, 5).until(EC.element_to_be_clickable((By.CSS_SELECTOR, sel)))
-                        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
-                        time.sleep(0.5)
-                        driver.execute_script("arguments[0].click();", btn)
-                        clicked = True
-                        break
-                    except:
-                        continue
-                if not clicked:
-                    continue
-
-                modal_html = get_modal_html(driver)
-                products = parse_kroger_modal(modal_html, name)
-                all_deals.extend(products)
-                processed += 1
-                close_popups(driver)
-                time.sleep(0.5)
-
-            except Exception as e:
-                print(f"[JOB {job_id}] Card error: {e}")
-                continue
-
-        save_job_result(job_id, all_deals)
-
-        status = load_status()
-        status["current_job"] = None
-        status["jobs"][job_id].update({
-            "status": "completed",
-            "completed_at": datetime.now().isoformat(),
-            "total": len(all_deals)
-        })
-        save_status(status)
+        pipeline.close()
+        flush()
+        if cancelled.is_set():
+            # Partial results stay where /status already serves them from
+            registry.update(job_id, status="cancelled", total=saved, wait_stats=wait_stats.as_dict(),
+                            timings=timings.as_dict())
+            timings.finish("cancelled")
+            print(f"[JOB {job_id}] CANCELLED after {saved} items")
+            return
+
+        with timings.span("result_write"):
+            all_deals = load_partial_results(job_id)
+            save_job_result(job_id, all_deals)
+            os.remove(partial_result_path(job_id))
+
+        registry.update(
+            job_id,
+            status="completed",
+            completed_at=datetime.now().isoformat(),
+            total=len(all_deals),
+            wait_stats=wait_stats.as_dict(),
+            timings=timings.as_dict()
+        )
+        timings.finish("completed")
         print(f"[JOB {job_id}] COMPLETED! {len(all_deals)} items")
 
     except Exception as e:
-        status = load_status()
-        status["current_job"] = None
-        status["jobs"][job_id]["status"] = "failed"
-        status["jobs"][job_id]["error"] = str(e)
-        save_status(status)
+        # Keep whatever was parsed before the failure
+        if pipeline:
+            pipeline.close()
+        flush()
+        registry.update(job_id, status="failed", error=str(e), total=saved, wait_stats=wait_stats.as_dict(),
+                        timings=timings.as_dict())
+        timings.finish("failed")
         print(f"[JOB {job_id}] FAILED: {e}")
     finally:
+        if pipeline:
+            pipeline.close()
+        # Normally a no-op: every path above has flushed already
+        flush()
         if driver:
-            driver.quit()
+            driver_pool.release(driver)
 
 # === ENDPOINTS ===
 
 @app.get("/scrape-kroger-deals")
-def start_scrape(limit: int = 1000):
-    status = load_status()
-
-    if status["current_job"]:
-        return {
-            "job_id": status["current_job"],
-            "status": "running",
-            "message": "A job is already running. Check status below.",
-            "check_url": f"/status/{status['current_job']}"
-        }
-
+def start_scrape(limit: int = 1000, priority: int = 0, stores: str = ""):
     job_id = str(uuid.uuid4())
-    threading.Thread(target=run_scraper, args=(job_id, limit), daemon=True).start()
+    store_ids = parse_store_ids(stores)
+    registry.add(job_id, stores=store_ids)
+    cancelled = threading.Event()
+    position = scheduler.submit(job_id, lambda: run_scraper(job_id, limit, cancelled, store_ids), priority,
+                                cancel=cancelled.set)
 
     return {
         "job_id": job_id,
-        "status": "started",
-        "message": "Scraping started in background!",
+        "status": "queued",
+        "queue_position": position,
+        "message": "Scraping queued in background!",
         "check_url": f"/status/{job_id}"
     }
 
-@app.get("/status/{job_id}")
-def get_status(job_id: str):
-    status = load_status()
-    job = status["jobs"].get(job_id)
+@app.post("/cancel/{job_id}")
+def cancel_scrape(job_id: str):
+    previous = scheduler.cancel(job_id)
+    if previous is None:
+        raise HTTPException(status_code=404, detail="Job is not queued or running")
+    return {"job_id": job_id, "status": "cancelled" if previous == "queued" else "cancelling"}
 
-    if status["current_job"] == job_id:
-        return {"job_id": job_id, "status": "running", "deals": []}
+@app.get("/status/{job_id}")
+def get_status(job_id: str, request: Request):
+    gzip_ok = "gzip" in request.headers.get("accept-encoding", "")
+    cached = result_cache.get(f"{job_id}.gz" if gzip_ok else job_id)
+    if cached:
+        headers = {"ETag": cached.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag_matches(request.headers.get("if-none-match"), cached.etag):
+            return Response(status_code=304, headers=headers)
+        if gzip_ok:
+            headers["Content-Encoding"] = "gzip"
+        return Response(content=cached.body, media_type=cached.media_type, headers=headers)
+
+    job = registry.get(job_id)
+
+    if job and job["status"] == "queued":
+        return {**job, "job_id": job_id, "queue_position": scheduler.position(job_id)}
+
+    if job and job["status"] == "running":
+        deals = load_partial_results(job_id)
+        return {"job_id": job_id, "status": "running", "partial": True, "total": len(deals), "deals": deals}
 
     if job and job["status"] == "completed":
         result_file = os.path.join(JOBS_DIR, f"{job_id}.json")
         if os.path.exists(result_file):
-            with open(result_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+            with open(result_file, "rb") as f:
+                body = f.read()
+            if os.path.exists(result_file + ".gz"):
+                with open(result_file + ".gz", "rb") as f:
+                    compressed = f.read()
+            else:
+                # Results written before the .gz twin existed
+                compressed = gzip.compress(body, mtime=0)
+            plain = result_cache.put(job_id, body)
+            zipped = result_cache.put(f"{job_id}.gz", compressed)
+            # Serve from what was just read: the cache may refuse or evict either entry
+            entry = zipped if gzip_ok else plain
+            headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+            if etag_matches(request.headers.get("if-none-match"), entry.etag):
+                return Response(status_code=304, headers=headers)
+            if gzip_ok:
+                headers["Content-Encoding"] = "gzip"
+            return Response(content=entry.body, media_type=entry.media_type, headers=headers)
 
     if job:
-        return {**job, "deals": []}
+        # Failed and cancelled jobs keep whatever was flushed before they stopped
+        return {**job, "deals": load_partial_results(job_id)}
 
     raise HTTPException(status_code=404, detail="Job not found")
 
@@ -0,0 +1,20 @@
+import pytest
+
+from output.models import Database, DealManager, JobManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / "kroger_scraper.db"))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def jobs(db):
+    return JobManager(db)
+
+
+@pytest.fixture
+def deals(db):
+    return DealManager(db)
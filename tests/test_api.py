@@ -0,0 +1,110 @@
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from output import artifacts
+from output.cache import ResponseCache
+from output.diff import DiffManager
+from output.models import Database, DealManager, JobManager
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """main.py's app on a fresh database, without the lifespan (no scheduler, no browsers)"""
+    monkeypatch.chdir(tmp_path)
+    main = importlib.import_module("main")
+    db = Database(str(tmp_path / "api.db"))
+    monkeypatch.setattr(main, "db", db)
+    monkeypatch.setattr(main, "job_manager", JobManager(db))
+    monkeypatch.setattr(main, "deal_manager", DealManager(db))
+    monkeypatch.setattr(main, "response_cache", ResponseCache())
+    monkeypatch.setattr(main, "diff_manager", DiffManager(db))
+    main.client = TestClient(main.app)
+    return main
+
+
+def completed_job(api, job_id="job-1", deals=3):
+    api.job_manager.create_job(job_id)
+    api.deal_manager.save_deals(job_id, [{"name": f"Deal {i}", "price": f"${i + 1}"} for i in range(deals)])
+    api.job_manager.update_job_stats(job_id, deals, deals, 0)
+    api.job_manager.update_job_status(job_id, "completed")
+
+
+def test_completed_status_is_cached_and_revalidated(api):
+    completed_job(api)
+
+    first = api.client.get("/status/job-1")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.json()["status"] == "completed"
+
+    again = api.client.get("/status/job-1", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert api.response_cache.hits == 1
+
+    assert api.client.get("/status/job-1", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_running_status_is_not_cached(api):
+    api.job_manager.create_job("job-1")
+
+    response = api.client.get("/status/job-1")
+
+    assert response.json()["status"] == "running"
+    assert "etag" not in response.headers
+    assert api.response_cache.get("status:job-1") is None
+
+
+def test_completed_data_gets_an_etag(api):
+    completed_job(api)
+
+    first = api.client.get("/get-data/job-1")
+    again = api.client.get("/get-data/job-1", headers={"If-None-Match": f'W/{first.headers["etag"]}'})
+
+    assert [deal["name"] for deal in first.json()["deals"]] == ["Deal 0", "Deal 1", "Deal 2"]
+    assert again.status_code == 304
+
+
+def test_pages_report_the_jobs_total(api):
+    completed_job(api, deals=5)
+
+    first = api.client.get("/get-data/job-1", params={"limit": 2}).json()
+    last = api.client.get("/get-data/job-1", params={"limit": 2, "after_id": 4}).json()
+    whole = api.client.get("/get-data/job-1").json()
+
+    assert (first["total_deals"], first["page_deals"], first["next_after_id"]) == (5, 2, 2)
+    assert (last["total_deals"], last["page_deals"], last["next_after_id"]) == (5, 1, None)
+    assert whole["total_deals"] == 5
+    assert "page_deals" not in whole
+
+
+def test_parquet_is_404_without_an_export(api):
+    completed_job(api)
+
+    response = api.client.get("/get-data/job-1", params={"format": "parquet"})
+
+    assert response.status_code == 404
+
+
+def test_ndjson_is_served_from_the_gzip_artifact(api, monkeypatch):
+    monkeypatch.setattr(artifacts, "zstandard", None)
+    completed_job(api)
+    artifacts.export_job(api.deal_manager, "job-1", parquet=False)
+
+    response = api.client.get("/get-data/job-1", params={"format": "ndjson"},
+                              headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.text.splitlines()) == 3
+
+
+def test_metrics_types_pool_totals_as_counters(api):
+    text = api.client.get("/metrics").text
+
+    assert "# TYPE kroger_driver_pool_created_total counter" in text
+    assert "# TYPE kroger_driver_pool_recycled_total counter" in text
+    assert "# TYPE kroger_driver_pool_idle gauge" in text
+    assert "kroger_driver_pool_created " not in text
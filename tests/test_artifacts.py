@@ -0,0 +1,75 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from output import artifacts
+from output.artifacts import export_job, find_ndjson_artifact, write_atomic, write_ndjson_artifacts
+
+CHUNKS = [b'{"id": 1}\n', b'{"id": 2}\n']
+
+
+def test_write_atomic_renames_into_place(tmp_path):
+    path = str(tmp_path / "plain.ndjson")
+
+    write_atomic(path, CHUNKS)
+
+    assert open(path, "rb").read() == b"".join(CHUNKS)
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_write_atomic_leaves_no_file_when_chunks_fail(tmp_path):
+    path = str(tmp_path / "broken.ndjson")
+
+    def chunks():
+        yield CHUNKS[0]
+        raise RuntimeError("stream failed")
+
+    with pytest.raises(RuntimeError):
+        write_atomic(path, chunks(), "gzip")
+
+    assert not os.path.exists(path)
+
+
+def test_gzip_artifact_round_trips(tmp_path):
+    path = str(tmp_path / "job.ndjson.gz")
+
+    write_atomic(path, CHUNKS, "gzip")
+
+    assert gzip.decompress(open(path, "rb").read()) == b"".join(CHUNKS)
+
+
+def test_zstd_artifact_round_trips(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = str(tmp_path / "job.ndjson.zst")
+
+    write_atomic(path, CHUNKS, "zstd")
+
+    reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+    assert reader.read() == b"".join(CHUNKS)
+
+
+def test_only_gzip_without_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "zstandard", None)
+
+    paths = write_ndjson_artifacts("job-1", CHUNKS, str(tmp_path))
+
+    assert list(paths) == ["gzip"]
+    assert find_ndjson_artifact("job-1", "zstd, gzip", str(tmp_path)) == (paths["gzip"], "gzip")
+    assert find_ndjson_artifact("job-1", "zstd", str(tmp_path)) is None
+    assert find_ndjson_artifact("job-1", None, str(tmp_path)) is None
+
+
+def test_export_job_skips_parquet_without_pyarrow(tmp_path, monkeypatch, jobs, deals):
+    monkeypatch.setattr(artifacts, "zstandard", None)
+    monkeypatch.setattr(artifacts, "pyarrow", None)
+    jobs.create_job("job-1")
+    deals.save_deals("job-1", [{"name": "Milk", "price": "$3.99"}])
+
+    paths = export_job(deals, "job-1", str(tmp_path))
+
+    assert set(paths) == {"gzip"}
+    lines = gzip.decompress(open(paths["gzip"], "rb").read()).splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["Milk"]
+    assert not os.path.exists(tmp_path / "job-1.parquet")
@@ -0,0 +1,89 @@
+import json
+
+from scraper.blocking import BlockingProfile, traffic_from_entries
+from scraper.kroger_scrapper import KrogerScraper
+from scraper.metrics import JobTimings, MetricsRegistry
+
+
+def entry(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+LOG = [
+    entry("Network.requestWillBeSent", requestId="1"),
+    entry("Network.requestWillBeSent", requestId="2"),
+    entry("Network.requestWillBeSent", requestId="3"),
+    entry("Network.loadingFinished", requestId="1", encodedDataLength=1200),
+    entry("Network.loadingFailed", requestId="2", blockedReason="inspector"),
+    entry("Network.loadingFailed", requestId="3", errorText="net::ERR_ABORTED"),
+    {"message": "not json"},
+]
+
+
+class LoggingDriver:
+    def __init__(self, log):
+        self.log = list(log)
+
+    def get_log(self, log_type):
+        assert log_type == "performance"
+        log, self.log = self.log, []
+        return log
+
+
+class RecordingPool:
+    def __init__(self):
+        self.released = []
+
+    def release(self, driver):
+        self.released.append(driver)
+
+
+def test_traffic_counts_requests_blocked_requests_and_bytes():
+    assert traffic_from_entries(LOG) == {"requests": 3, "blocked": 1, "bytes": 1200}
+    assert traffic_from_entries([]) == {"requests": 0, "blocked": 0, "bytes": 0}
+
+
+def test_allowed_domains_are_not_denied():
+    profile = BlockingProfile(block_types=["image", "video"], deny_domains=["ads.example", "cdn.example"],
+                              allow_domains=["example"])
+
+    assert profile.block_types == ["image"]
+    assert profile.deny_domains == []
+    assert "*.png*" in profile.url_patterns()
+
+
+def test_blocking_can_be_turned_off(monkeypatch):
+    monkeypatch.setenv("KROGER_BLOCKING", "off")
+    assert BlockingProfile.from_env() is None
+
+    monkeypatch.setenv("KROGER_BLOCKING", "on")
+    monkeypatch.setenv("KROGER_BLOCK_TYPES", "font")
+    assert BlockingProfile.from_env().block_types == ["font"]
+
+
+def test_job_traffic_is_mirrored_into_metrics():
+    registry = MetricsRegistry()
+    timings = JobTimings("browser", registry=registry)
+    timings.add_traffic({"requests": 3, "blocked": 1, "bytes": 1200})
+    timings.add_traffic({"requests": 2, "blocked": 2, "bytes": 800})
+
+    assert timings.as_dict()["traffic"] == {"requests": 5, "blocked": 3, "bytes": 2000}
+    text = registry.render()
+    assert 'kroger_blocked_requests_total{engine="browser"} 3' in text
+    assert 'kroger_received_bytes_total{engine="browser"} 2000' in text
+
+
+def test_released_browser_traffic_is_saved_with_the_job(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pool = RecordingPool()
+    scraper = KrogerScraper("job-1", driver_pool=pool)
+    scraper.job_manager.create_job("job-1")
+    driver = LoggingDriver(LOG)
+
+    scraper.release_driver(driver)
+    scraper.save_stats()
+
+    assert pool.released == [driver]
+    assert driver.log == []
+    job = scraper.job_manager.get_job_status("job-1")
+    assert job["timings"]["traffic"] == {"requests": 3, "blocked": 1, "bytes": 1200}
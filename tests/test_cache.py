@@ -0,0 +1,63 @@
+from output.cache import ResponseCache, etag_matches, make_etag
+
+
+def test_lru_evicts_least_recently_used_by_size():
+    cache = ResponseCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") is not None
+    cache.put("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a").body == b"aaaa"
+    assert cache.get("c").body == b"cccc"
+    assert cache.size == 8
+
+
+def test_replacing_a_key_keeps_the_size_right():
+    cache = ResponseCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("a", b"aaaaaa")
+
+    assert cache.size == 6
+    assert cache.get("a").body == b"aaaaaa"
+
+
+def test_body_larger_than_the_cache_is_served_but_not_stored():
+    cache = ResponseCache(max_bytes=10)
+    cache.put("small", b"ok")
+
+    entry = cache.put("big", b"x" * 11)
+
+    assert entry.body == b"x" * 11 and entry.etag == make_etag(b"x" * 11)
+    assert cache.get("big") is None
+    assert cache.get("small") is not None
+    assert cache.size == 2
+
+
+def test_hit_and_miss_counters():
+    cache = ResponseCache()
+    cache.get("a")
+    cache.put("a", b"1")
+    cache.get("a")
+
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_etag_is_strong_and_content_addressed():
+    assert make_etag(b"body") == make_etag(b"body")
+    assert make_etag(b"body") != make_etag(b"other")
+    assert make_etag(b"body").startswith('"') and make_etag(b"body").endswith('"')
+
+
+def test_if_none_match():
+    etag = make_etag(b"body")
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert etag_matches("*", etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches(f'"other",W/{etag}', etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches("", etag)
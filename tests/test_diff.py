@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from output.diff import DiffManager, diff_deals
+
+
+def deal(product_id, price, price_value, store_id="A", promo_type=None):
+    return {"store_id": store_id, "product_id": product_id, "name": f"Product {product_id}",
+            "price": price, "price_value": price_value, "promo_type": promo_type}
+
+
+def by_key(*deals):
+    return {(d["store_id"] or "", d["product_id"]): d for d in deals}
+
+
+def test_diff_deals():
+    old = by_key(deal(1, "$2.00", 2.0), deal(2, "$3.00", 3.0), deal(3, "$4.00", 4.0), deal(5, "2 for $5", None))
+    new = by_key(deal(1, "$2.00", 2.001), deal(2, "$1.50", 1.5, promo_type="sale"), deal(4, "$1.00", 1.0),
+                 deal(5, "3 for $5", None))
+
+    diff = diff_deals(old, new)
+
+    assert diff["summary"] == {"added": 1, "removed": 1, "price_changed": 2, "unchanged": 1}
+    assert [d["product_id"] for d in diff["added"]] == [4]
+    assert [d["product_id"] for d in diff["removed"]] == [3]
+    cheaper, multi_buy = diff["price_changed"]
+    assert (cheaper["old_price"], cheaper["change_pct"], cheaper["promo_type"]) == ("$3.00", -50.0, "sale")
+    # No unit prices on either side: compared by price text, no percentage
+    assert (multi_buy["old_price"], multi_buy["change_pct"]) == ("2 for $5", None)
+
+
+def test_same_product_in_another_store_is_a_different_deal():
+    diff = diff_deals(by_key(deal(1, "$2.00", 2.0, store_id="A")), by_key(deal(1, "$2.00", 2.0, store_id="B")))
+
+    assert diff["summary"] == {"added": 1, "removed": 1, "price_changed": 0, "unchanged": 0}
+
+
+def add_job(jobs, deals, job_id, started_at, status="completed", stores=None, prices=()):
+    jobs.create_job(job_id, stores=stores)
+    deals.save_deals(job_id, [{"name": name, "price": price, "store_id": (stores or [None])[0]}
+                              for name, price in prices])
+    jobs.update_job_status(job_id, status)
+    with jobs.db.get_connection() as conn:
+        conn.execute("UPDATE jobs SET started_at = ?, completed_at = ? WHERE job_id = ?",
+                     (f"2024-01-{started_at:02d} 00:00:00",
+                      f"2024-01-{started_at:02d} 01:00:00" if status != "running" else None, job_id))
+
+
+@pytest.fixture
+def history(jobs, deals):
+    add_job(jobs, deals, "week-1", 1, prices=[("Milk", "$3.49"), ("Eggs", "$2.99")])
+    add_job(jobs, deals, "week-2-failed", 8, status="failed", prices=[("Milk", "$1.00")])
+    add_job(jobs, deals, "other-store", 9, stores=["B"], prices=[("Milk", "$1.00")])
+    add_job(jobs, deals, "week-2", 10, status="running", prices=[("Milk", "$2.99"), ("Bread", "$1.99")])
+    return DiffManager(jobs.db)
+
+
+def test_previous_job_is_the_last_completed_one_for_the_same_stores(history):
+    assert history.previous_job("week-2") == "week-1"
+    assert history.previous_job("week-1") is None
+    assert history.previous_job("other-store") is None
+
+
+def test_precompute_stores_the_diff_before_the_job_completes(history, jobs):
+    # The engines precompute while the job is still running, then mark it completed
+    summary = history.precompute("week-2")
+    jobs.update_job_status("week-2", "completed")
+
+    assert summary == {"added": 1, "removed": 1, "price_changed": 1, "unchanged": 0}
+    assert history.previous_job("week-2") == "week-1"
+    stored = json.loads(history.get("week-1", "week-2"))
+    assert (stored["from"], stored["to"], stored["summary"]) == ("week-1", "week-2", summary)
+
+
+def test_get_or_compute_stores_a_missing_diff(history):
+    assert history.get("week-1", "week-2") is None
+
+    body = history.get_or_compute("week-1", "week-2")
+
+    assert history.get("week-1", "week-2") == body
+    assert history.get_or_compute("week-1", "week-2") == body
@@ -0,0 +1,116 @@
+import time
+
+import pytest
+
+from scraper.driver import DriverPool
+
+
+class FakeDriver:
+    """Just enough of a WebDriver for the pool's health check and session reset"""
+
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.window_handles = ["main", "popup"]
+        self.current = "main"
+        self.cookies_cleared = False
+        self.url = None
+        self.quit_called = False
+        self.switch_to = self
+
+    def window(self, handle):
+        self.current = handle
+
+    def close(self):
+        self.window_handles.remove(self.current)
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("chrome not reachable")
+        return 1
+
+    def delete_all_cookies(self):
+        self.cookies_cleared = True
+
+    def get(self, url):
+        self.url = url
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """A pool that only starts browsers on demand, so every test sees exactly the drivers it asked for"""
+    pool = DriverPool(FakeDriver, size=2, max_uses=3)
+    monkeypatch.setattr(pool, "warm", lambda: None)
+    return pool
+
+
+def test_warm_fills_the_pool_in_the_background():
+    pool = DriverPool(FakeDriver, size=2)
+    pool.warm()
+    deadline = time.monotonic() + 5
+    while pool.stats()["warming"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert pool.stats() == {"idle": 2, "warming": 0, "created": 2, "recycled": 0}
+    pool.warm()
+    assert pool.stats()["created"] == 2
+    pool.close()
+
+
+def test_released_session_is_reset_and_reused(pool):
+    driver = pool.acquire()
+    pool.release(driver)
+
+    assert driver.window_handles == ["main"]
+    assert driver.cookies_cleared and driver.url == "about:blank"
+    assert not driver.quit_called
+    assert pool.acquire() is driver
+    assert pool.stats()["created"] == 1
+
+
+def test_dead_idle_session_is_replaced(pool):
+    driver = pool.acquire()
+    pool.release(driver)
+    driver.healthy = False
+
+    replacement = pool.acquire()
+
+    assert replacement is not driver
+    assert driver.quit_called
+    assert pool.stats() == {"idle": 0, "warming": 0, "created": 2, "recycled": 1}
+
+
+def test_session_is_retired_after_max_uses(pool):
+    driver = pool.acquire()
+    for _ in range(2):
+        pool.release(driver)
+        assert pool.acquire() is driver
+
+    pool.release(driver)
+
+    assert driver.quit_called
+    assert pool.stats()["idle"] == 0
+
+
+def test_session_that_fails_to_reset_is_quit(pool):
+    driver = pool.acquire()
+    driver.window_handles = []
+
+    pool.release(driver)
+
+    assert driver.quit_called
+    assert pool.stats()["recycled"] == 1
+
+
+def test_close_quits_idle_sessions_and_later_releases(pool):
+    idle = pool.acquire()
+    borrowed = pool.acquire()
+    pool.release(idle)
+
+    pool.close()
+    pool.release(borrowed)
+
+    assert idle.quit_called and borrowed.quit_called
+    assert pool.stats()["idle"] == 0
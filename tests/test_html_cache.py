@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+from output.diff import DiffManager
+from output.html_cache import ModalCache, read_page
+from output.models import Database, DealManager, JobManager
+from scraper.kroger_scrapper import KrogerScraper
+
+
+def modal(name, price):
+    return (f'<div role="dialog" class="ReactModal__Content"><h2 class="kds-Heading">{name}</h2>'
+            f'<span class="SWA-ModalPriceText">{price}</span></div>')
+
+
+def cached_files(directory):
+    return sorted(name for _, _, names in os.walk(directory) for name in names)
+
+
+@pytest.fixture
+def cache(db, tmp_path):
+    return ModalCache(db, str(tmp_path / "html_cache"))
+
+
+def test_pages_are_stored_under_their_digest(cache):
+    digest = cache.store(modal("Milk", "$2.99"))
+
+    assert cache.path(digest).endswith(os.path.join(digest[:2], f"{digest}.html.gz"))
+    assert read_page(cache.path(digest)) == modal("Milk", "$2.99")
+    assert cache.store(modal("Milk", "$2.99")) == digest
+    assert cache.store(modal("Milk", "$3.49")) != digest
+
+
+def test_same_modal_in_two_jobs_is_stored_once(cache, jobs):
+    jobs.create_job("job-1")
+    jobs.create_job("job-2")
+    cache.put("job-1", "A", 0, "Milk", modal("Milk", "$2.99"), fingerprint="fp-milk")
+    cache.put("job-2", "A", 0, "Milk", modal("Milk", "$2.99"), fingerprint="fp-milk")
+
+    assert len(cached_files(cache.directory)) == 1
+    assert cache.count("job-1") == cache.count("job-2") == 1
+    assert cache.pages("job-1")[0]["path"] == cache.pages("job-2")[0]["path"]
+
+
+def test_recapturing_a_card_replaces_its_page(cache, jobs):
+    jobs.create_job("job-1")
+    cache.put("job-1", None, 0, "Milk", modal("Milk", "$2.99"))
+    cache.put("job-1", None, 0, "Milk", modal("Milk", "$2.49"))
+
+    pages = cache.pages("job-1")
+    assert len(pages) == 1
+    assert pages[0]["store_id"] is None
+    assert read_page(pages[0]["path"]) == modal("Milk", "$2.49")
+
+
+def test_copied_cards_point_at_the_source_page(cache, jobs):
+    jobs.create_job("job-1")
+    jobs.create_job("job-2")
+    cache.put("job-1", "A", 3, "Milk", modal("Milk", "$2.99"), fingerprint="fp-milk")
+
+    cache.copy_forward("job-2", "A", [(0, "fp-milk", "job-1"), (1, "fp-gone", "job-1")])
+
+    pages = cache.pages("job-2")
+    assert [(page["card_idx"], page["fingerprint"]) for page in pages] == [(0, "fp-milk")]
+    assert pages[0]["path"] == cache.pages("job-1")[0]["path"]
+
+
+def test_replay_reparses_cached_pages_with_the_replayed_jobs_stores(tmp_path, monkeypatch):
+    # The scraper keeps its database, HTML cache and artifacts in the working directory
+    monkeypatch.chdir(tmp_path)
+    db = Database()
+    jobs = JobManager(db)
+    jobs.create_job("source", stores=["A", "B"])
+    cache = ModalCache(db)
+    cache.put("source", "A", 0, "Milk", modal("Milk", "$2.99"), fingerprint="fp-milk")
+    cache.put("source", "B", 0, "Eggs", modal("Eggs", "$3.49"), fingerprint="fp-eggs")
+    jobs.update_job_status("source", "completed")
+
+    scraper = KrogerScraper("replay", capture_mode="replay", replay_job_id="source",
+                            parser="kroger_modal", parse_workers=1)
+    scraper.scrape()
+
+    job = jobs.get_job_status("replay")
+    assert job["status"] == "completed"
+    assert job["stores"] == ["A", "B"]
+    deals = DealManager(db).get_deals("replay")
+    assert {(deal["store_id"], deal["name"], deal["price"]) for deal in deals} == {
+        ("A", "Milk", "$2.99"), ("B", "Eggs", "$3.49"),
+    }
+    assert DiffManager(db).previous_job("replay") == "source"
+    assert cache.count("replay") == 2
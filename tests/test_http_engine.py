@@ -0,0 +1,148 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from output.models import DealManager, JobManager
+from scraper.http_engine import HttpKrogerScraper, WEEKLY_AD_PATH
+
+DEALS = {
+    "A": [("/deal/milk", "Milk", "$2.99")],
+    "B": [("/deal/eggs", "Eggs", "$3.49"), ("/deal/bread", "Bread", "2 for $5")],
+}
+PAGES = {path: (name, price) for cards in DEALS.values() for path, name, price in cards}
+
+
+def listing(cards):
+    return "".join(f'<div class="kds-Card SWA-Omni"><a href="{path}"><img alt="{name}"></a></div>'
+                   for path, name, _ in cards)
+
+
+def modal(name, price):
+    return (f'<div role="dialog" class="ReactModal__Content"><h2 class="kds-Heading">{name}</h2>'
+            f'<span class="SWA-ModalPriceText">{price}</span></div>')
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves a weekly ad per StoreCode and the deal pages it links to"""
+    requested = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.requested.append(self.path)
+        store = parse_qs(url.query).get("StoreCode", [None])[0]
+        if url.path == WEEKLY_AD_PATH and store in DEALS:
+            self.reply(listing(DEALS[store]))
+        elif url.path in PAGES:
+            self.reply(modal(*PAGES[url.path]))
+        else:
+            self.send_error(500)
+
+    def reply(self, body):
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in(tmp_path, monkeypatch):
+    # The engine keeps its database and artifacts in the working directory
+    monkeypatch.chdir(tmp_path)
+    StandInHandler.requested = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def run(base_url, store_ids, flush_size=50):
+    scraper = HttpKrogerScraper("job-1", base_url=base_url, bootstrap=False, store_ids=store_ids,
+                                flush_size=flush_size)
+    scraper.scrape()
+    return scraper
+
+
+def test_scrapes_every_store_from_the_base_url(stand_in):
+    scraper = run(stand_in, ["A", "B"])
+
+    job = JobManager(scraper.db).get_job_status("job-1")
+    assert job["status"] == "completed"
+    assert scraper.successful_scrapes == 3
+    assert f"{WEEKLY_AD_PATH}?StoreCode=A" in StandInHandler.requested
+    deals = DealManager(scraper.db).get_deals("job-1")
+    assert {(deal["store_id"], deal["name"], deal["price"]) for deal in deals} == {
+        ("A", "Milk", "$2.99"), ("B", "Eggs", "$3.49"), ("B", "Bread", "2 for $5"),
+    }
+    assert job["timings"]["parse"]["count"] == 3
+
+
+def test_deals_are_written_in_batches_as_pages_arrive(stand_in):
+    scraper = run(stand_in, ["A", "B"], flush_size=2)
+
+    assert scraper.writer.saved == 3
+    # One full batch of two while fetching, the last deal when the job closes the writer
+    assert scraper.timings.as_dict()["db_write"]["count"] == 2
+    assert JobManager(scraper.db).get_job_status("job-1")["successful_scrapes"] == 3
+
+
+def test_store_that_fails_to_load_makes_the_job_partial(stand_in):
+    scraper = run(stand_in, ["A", "BAD"])
+
+    job = JobManager(scraper.db).get_job_status("job-1")
+    assert job["status"] == "partial"
+    assert "BAD" in job["error"]
+    assert scraper.failed_stores == ["BAD"]
+    assert [deal["name"] for deal in DealManager(scraper.db).get_deals("job-1")] == ["Milk"]
+
+
+def test_every_store_failing_fails_the_job(stand_in):
+    scraper = run(stand_in, ["BAD"])
+
+    assert JobManager(scraper.db).get_job_status("job-1")["status"] == "failed"
+
+
+class BootstrapDriver:
+    def get(self, url):
+        self.url = url
+
+    def execute_script(self, script):
+        return "StandIn/1.0"
+
+    def get_cookies(self):
+        return [{"name": "session", "value": "abc"}]
+
+    def quit(self):
+        raise AssertionError("pooled drivers are released, not quit")
+
+
+class RecordingPool:
+    def __init__(self):
+        self.driver = BootstrapDriver()
+        self.released = []
+
+    def acquire(self):
+        return self.driver
+
+    def release(self, driver):
+        self.released.append(driver)
+
+
+def test_session_bootstrap_borrows_from_the_driver_pool(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pool = RecordingPool()
+    scraper = HttpKrogerScraper("job-1", base_url="http://stand-in", driver_pool=pool)
+
+    session = scraper.bootstrap_session()
+
+    assert session.cookies == {"session": "abc"}
+    assert session.headers["User-Agent"] == "StandIn/1.0"
+    assert pool.released == [pool.driver]
@@ -0,0 +1,54 @@
+import pytest
+
+from scraper.metrics import Histogram, JobTimings, MetricsRegistry
+
+
+def type_lines(text):
+    return [line for line in text.splitlines() if line.startswith("# TYPE")]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(seconds)
+
+    assert histogram.cumulative() == [("0.1", 1), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(1.0) is None
+    assert Histogram().quantile(0.5) is None
+
+
+def test_render_declares_each_metric_type_once():
+    registry = MetricsRegistry()
+    timings = JobTimings("browser", registry=registry)
+    timings.observe("card", 0.2)
+    timings.observe("parse", 0.01)
+    timings.finish("completed", successful=2, failed=1)
+
+    text = registry.render(gauges={"driver_pool_idle": 2, "scheduler_queued": 0},
+                           counters={"driver_pool_created": 5})
+
+    assert type_lines(text) == [
+        "# TYPE kroger_phase_duration_seconds histogram",
+        "# TYPE kroger_cards_total counter",
+        "# TYPE kroger_jobs_total counter",
+        "# TYPE kroger_driver_pool_created_total counter",
+        "# TYPE kroger_driver_pool_idle gauge",
+        "# TYPE kroger_scheduler_queued gauge",
+    ]
+    assert 'kroger_cards_total{engine="browser",result="failed"} 1' in text
+    assert 'kroger_jobs_total{engine="browser",status="completed"} 1' in text
+    assert 'kroger_phase_duration_seconds_count{engine="browser",phase="card"} 1' in text
+    assert "kroger_driver_pool_created_total 5" in text
+
+
+def test_span_is_recorded_even_when_it_raises():
+    registry = MetricsRegistry()
+    timings = JobTimings("http", registry=registry)
+
+    with pytest.raises(ValueError):
+        with timings.span("page_load"):
+            raise ValueError("listing failed")
+
+    assert timings.as_dict()["page_load"]["count"] == 1
+    assert registry.phases[("http", "page_load")].count == 1
@@ -0,0 +1,163 @@
+import sqlite3
+
+import pytest
+
+from output.models import MIGRATIONS, Database, DealWriter, normalize_product_name
+
+LEGACY_SCHEMA = """
+CREATE TABLE jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    started_at TIMESTAMP NOT NULL,
+    completed_at TIMESTAMP,
+    total_cards INTEGER,
+    successful_scrapes INTEGER DEFAULT 0,
+    failed_scrapes INTEGER DEFAULT 0,
+    error TEXT
+);
+CREATE TABLE deals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    product_name TEXT NOT NULL,
+    price TEXT,
+    original_price TEXT,
+    discount TEXT,
+    description TEXT,
+    details JSON,
+    created_at TIMESTAMP NOT NULL
+);
+INSERT INTO jobs (job_id, status, started_at) VALUES ('old', 'completed', '2024-01-01 00:00:00');
+INSERT INTO deals (job_id, product_name, price, original_price, details, created_at) VALUES
+    ('old', 'Kroger® 2% Milk', '$2.99', '$3.49', '{"competitor_product_size": "1 gal"}', '2024-01-01 00:00:00'),
+    ('old', 'Kroger 2% milk', '2 for $5', '', '{}', '2024-01-01 00:00:00');
+"""
+
+
+def columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def test_new_database_is_at_the_latest_schema_version(db):
+    conn = db.get_connection()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+    assert {"wait_stats", "stores", "timings"} <= columns(conn, "jobs")
+    assert {"product_id", "price_value", "store_id", "fingerprint", "per_unit_price", "promo_type"} <= columns(conn, "deals")
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {"products", "card_fingerprints", "modal_pages", "job_diffs"} <= tables
+
+
+def test_legacy_database_is_migrated_and_backfilled(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    with sqlite3.connect(path) as conn:
+        conn.executescript(LEGACY_SCHEMA)
+
+    db = Database(path)
+    rows = db.get_connection().execute(
+        "SELECT product_id, price_value, original_price_value, promo_type FROM deals ORDER BY id"
+    ).fetchall()
+
+    # Both spellings of the product map to one products row
+    assert rows[0][0] == rows[1][0] is not None
+    assert rows[0][1:3] == (2.99, 3.49)
+    assert rows[1][1] == pytest.approx(2.5)
+    assert [row[3] for row in rows] == ["sale", "multi_buy"]
+    db.close()
+
+
+def test_migrations_run_once_per_file(tmp_path):
+    path = str(tmp_path / "kroger_scraper.db")
+    Database(path).close()
+    applied = []
+    MIGRATIONS.append(lambda db, cursor: applied.append(True))
+    try:
+        Database(path).close()
+        Database(path).close()
+    finally:
+        MIGRATIONS.pop()
+    assert applied == [True]
+
+
+def test_saved_deals_round_trip_in_either_schema(jobs, deals):
+    jobs.create_job("job-1", stores=["A"])
+    deals.save_deals("job-1", [
+        {"name": "Eggs", "price": "$3.49", "original_price": "", "store_id": "A"},
+        {"competitor_product": "Milk", "competitor_price": "$2.99", "original_price": "$3.49",
+         "offer_description": "Weekly Digital Deal", "competitor_product_size": "1 gal"},
+    ])
+
+    eggs, milk = deals.get_deals("job-1")
+    assert (eggs["name"], eggs["store_id"], eggs["price_value"]) == ("Eggs", "A", 3.49)
+    assert (milk["name"], milk["description"], milk["details"]) == \
+        ("Milk", "Weekly Digital Deal", {"competitor_product_size": "1 gal"})
+    assert milk["per_unit"] == "fl oz"
+
+
+def test_deals_page_cursor(jobs, deals):
+    jobs.create_job("job-1")
+    deals.save_deals("job-1", [{"name": f"Deal {i}", "price": "$1"} for i in range(5)])
+
+    first, after_id = deals.get_deals_page("job-1", limit=3)
+    rest, last = deals.get_deals_page("job-1", limit=3, after_id=after_id)
+    assert [deal["name"] for deal in first + rest] == [f"Deal {i}" for i in range(5)]
+    assert last is None
+
+
+def test_writer_flushes_full_batches_and_the_rest_on_close(jobs, deals):
+    jobs.create_job("job-1")
+    flushed = []
+    writer = DealWriter(deals, "job-1", batch_size=3, on_flush=flushed.append)
+
+    writer.add([{"name": "Milk"}, {"name": "Eggs"}])
+    assert deals.count_deals("job-1") == 0
+    writer.add([{"name": "Bread"}])
+    assert deals.count_deals("job-1") == 3
+    writer.add([{"name": "Butter"}])
+    writer.close()
+
+    assert [deal["name"] for deal in deals.get_deals("job-1")] == ["Milk", "Eggs", "Bread", "Butter"]
+    assert flushed == [3, 4]
+    assert writer.saved == 4
+
+
+def test_normalize_product_name():
+    assert normalize_product_name("Kroger®  2% Milk, 1 Gal") == "kroger 2 milk 1 gal"
+
+
+def card(name, price, fingerprint, store_id="A"):
+    return {"name": name, "price": price, "fingerprint": fingerprint, "store_id": store_id}
+
+
+def test_only_parsed_cards_are_fingerprinted(jobs, deals):
+    jobs.create_job("job-1")
+    # A timed-out modal parses into the card's name with no price
+    deals.save_deals("job-1", [card("Milk", "$2.99", "f-milk"), card("Eggs", "N/A", "f-eggs")])
+    jobs.update_job_status("job-1", "completed")
+
+    assert deals.known_fingerprints("A", ["f-milk", "f-eggs"]) == {"f-milk": "job-1"}
+    assert deals.known_fingerprints("B", ["f-milk"]) == {}
+
+
+def test_copy_forward_only_from_completed_jobs(jobs, deals):
+    for job_id, status in (("done", "completed"), ("broken", "failed")):
+        jobs.create_job(job_id)
+        deals.save_deals(job_id, [card(f"Deal of {job_id}", "$1", f"f-{job_id}")])
+        jobs.update_job_status(job_id, status)
+    jobs.create_job("next")
+
+    assert deals.known_fingerprints("A", ["f-done", "f-broken"]) == {"f-done": "done"}
+    assert deals.copy_forward("next", "A", {"f-done": "done", "f-broken": "broken"}) == ["f-done"]
+    assert [deal["name"] for deal in deals.get_deals("next")] == ["Deal of done"]
+
+
+def test_copy_forward_stays_within_the_store(jobs, deals):
+    # The same card (same fingerprint) showed up in both stores of the source job
+    jobs.create_job("J1", stores=["A", "B"])
+    deals.save_deals("J1", [card("Milk", "$2.99", "f-milk", "A"), card("Milk", "$3.19", "f-milk", "B")])
+    jobs.update_job_status("J1", "completed")
+    jobs.create_job("J2", stores=["A"])
+
+    assert deals.known_fingerprints("A", ["f-milk"]) == {"f-milk": "J1"}
+    assert deals.copy_forward("J2", "A", {"f-milk": "J1"}) == ["f-milk"]
+    assert [(deal["store_id"], deal["name"], deal["price"]) for deal in deals.get_deals("J2")] == \
+        [("A", "Milk", "$2.99")]
+    assert deals.known_fingerprints("C", ["f-milk"]) == {}
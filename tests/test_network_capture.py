@@ -0,0 +1,80 @@
+import json
+import os
+
+import pytest
+
+from scraper.network_capture import collect_json_responses, harvest_deals, load_fixture, save_fixture
+
+PERFORMANCE_LOG = os.path.join(os.path.dirname(__file__), "fixtures", "performance_log.json")
+
+
+class RecordedDriver:
+    """Replays a recorded performance log and the response bodies Chrome still held"""
+
+    def __init__(self, path: str = PERFORMANCE_LOG):
+        with open(path, "r", encoding="utf-8") as f:
+            recorded = json.load(f)
+        self.log = recorded["log"]
+        self.bodies = recorded["bodies"]
+
+    def get_log(self, log_type):
+        assert log_type == "performance"
+        log, self.log = self.log, []
+        return log
+
+    def execute_cdp_cmd(self, cmd, params):
+        assert cmd == "Network.getResponseBody"
+        if params["requestId"] not in self.bodies:
+            raise Exception("No resource with given identifier found")
+        return self.bodies[params["requestId"]]
+
+
+@pytest.fixture
+def captures():
+    return collect_json_responses(RecordedDriver())
+
+
+def test_collects_only_matching_json_responses(captures):
+    # Images, other hosts' JSON and bodies the browser already evicted are skipped
+    assert [capture["url"] for capture in captures] == [
+        "https://www.kroger.com/atlas/v1/weeklyad/deals?page=1",
+        "https://www.kroger.com/cl/api/weeklyDeals?page=2",
+    ]
+    # The second body was recorded base64 encoded
+    assert captures[1]["payload"]["offers"][1]["title"] == "Navel Oranges"
+
+
+def test_collecting_drains_the_log():
+    driver = RecordedDriver()
+    collect_json_responses(driver)
+    assert collect_json_responses(driver) == []
+
+
+def test_harvest_groups_deals_by_main_product(captures):
+    harvested = harvest_deals(captures)
+
+    assert list(harvested) == ["kroger 2 milk 1 gal", "buy 5 or more cereal", "navel oranges"]
+    milk, = harvested["kroger 2 milk 1 gal"]
+    # First occurrence wins over the page 2 repeat
+    assert (milk["competitor_price"], milk["original_price"], milk["competitor_product_size"]) == \
+        ("$2.99", "$3.49", "1 gal")
+
+    cereal = harvested["buy 5 or more cereal"]
+    assert [deal["competitor_product"] for deal in cereal] == ["Buy 5 or More Cereal", "Cheerios", "Frosted Flakes"]
+    assert [deal["Qualifying Products"] for deal in cereal] == [False, True, True]
+    assert cereal[1]["competitor_product_size"] == "12 oz"
+    assert cereal[2]["original_price"] == ""
+    assert harvested["navel oranges"][0]["competitor_price"] == "$1.29/lb"
+
+
+def test_fixture_round_trip(captures, tmp_path):
+    path = str(tmp_path / "captures.json")
+    save_fixture(captures, path)
+    assert harvest_deals(load_fixture(path)) == harvest_deals(captures)
+
+
+def test_collecting_from_entries_already_read():
+    driver = RecordedDriver()
+    entries = driver.get_log("performance")
+
+    assert len(collect_json_responses(driver, entries=entries)) == 2
@@ -0,0 +1,76 @@
+import pytest
+
+from output import normalize
+from output.normalize import NORMALIZED_COLUMNS, normalize_deals
+
+
+def deal(price, original_price="", name="Deal", size=None):
+    record = {"name": name, "price": price, "original_price": original_price}
+    if size is not None:
+        record["details"] = {"competitor_product_size": size}
+    return record
+
+
+@pytest.mark.parametrize("record,price_value,discount_pct,promo_type", [
+    (deal("$2.99", "$3.49"), 2.99, 14.3, "sale"),
+    (deal("2 for $5"), 2.5, None, "multi_buy"),
+    (deal("Buy 2 Get 2 FREE", "$4.00"), 2.0, 50.0, "bogo"),
+    (deal("Buy 1, Get 1 50% Off", "$10.00"), 7.5, 25.0, "bogo"),
+    (deal("25% off", "$8.00"), 6.0, 25.0, "percent_off"),
+    (deal("99¢"), 0.99, None, None),
+    (deal("$1,299.00"), 1299.0, None, None),
+    (deal("Save $1.00", "$4.00"), 3.0, 25.0, "sale"),
+    (deal("Save $1.00"), None, None, None),
+    (deal("$2/$3"), 2.0, None, None),
+    (deal("2/$3"), 1.5, None, "multi_buy"),
+    (deal("4.99", "5.99"), 4.99, 16.7, "sale"),
+    (deal("N/A", "N/A"), None, None, None),
+])
+def test_price_value_discount_and_promo_type(record, price_value, discount_pct, promo_type):
+    (row,) = normalize_deals([record])
+    columns = dict(zip(NORMALIZED_COLUMNS, row))
+
+    if price_value is None:
+        assert columns["price_value"] is None
+    else:
+        assert columns["price_value"] == pytest.approx(price_value)
+    assert columns["discount_pct"] == discount_pct
+    assert columns["promo_type"] == promo_type
+
+
+@pytest.mark.parametrize("record,per_unit_price,per_unit", [
+    (deal("$7.99/LB", name="Steak"), 7.99, "lb"),
+    (deal("$2.50", name="Cereal 12 oz"), 0.2083, "oz"),
+    (deal("$2.56", name="Milk", size="1 gal"), 0.02, "fl oz"),
+    (deal("$1", name="Water 500 ml"), 0.0591, "fl oz"),
+    (deal("$3", name="Eggs", size="N/A"), None, None),
+])
+def test_per_unit_price_from_price_or_size(record, per_unit_price, per_unit):
+    (row,) = normalize_deals([record])
+    columns = dict(zip(NORMALIZED_COLUMNS, row))
+
+    assert columns["per_unit"] == per_unit
+    if per_unit_price is None:
+        assert columns["per_unit_price"] is None
+    else:
+        assert columns["per_unit_price"] == pytest.approx(per_unit_price, abs=1e-4)
+
+
+def test_original_price_value_is_the_struck_through_amount():
+    rows = normalize_deals([deal("$2.99", "$3.49"), deal("2 for $5", "Reg. $1,049.99"), deal("$1")])
+
+    assert [row[NORMALIZED_COLUMNS.index("original_price_value")] for row in rows] == [3.49, 1049.99, None]
+
+
+def test_rows_come_back_in_order_as_plain_python_values():
+    rows = normalize_deals([deal("$1"), deal("N/A"), deal("2 for $3")])
+
+    assert [row[0] for row in rows] == [1.0, None, 1.5]
+    assert all(type(value) in (float, str, type(None)) for row in rows for value in row)
+
+
+def test_without_pandas_every_column_is_none(monkeypatch):
+    monkeypatch.setattr(normalize, "pandas", None)
+
+    assert normalize_deals([deal("$1"), deal("2 for $3")]) == [(None,) * len(NORMALIZED_COLUMNS)] * 2
+    assert normalize_deals([]) == []
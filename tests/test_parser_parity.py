@@ -0,0 +1,21 @@
+import pytest
+
+from benchmarks.fixtures import build_corpus
+from scraper.bs4_parser import parse_kroger_modal
+
+CORPUS = build_corpus()
+
+
+@pytest.mark.parametrize("html,name,expected", CORPUS, ids=[f"{i}-{name}" for i, (_, name, _) in enumerate(CORPUS)])
+def test_lxml_backend_matches_bs4(html, name, expected):
+    bs4_result = parse_kroger_modal(html, name, backend="bs4")
+
+    assert parse_kroger_modal(html, name, backend="lxml") == bs4_result
+    if expected is not None:
+        assert bs4_result == expected
+
+
+def test_empty_modal_parses_to_a_placeholder_on_both_backends():
+    for backend in ("bs4", "lxml"):
+        deal, = parse_kroger_modal("", "Milk", backend=backend)
+        assert (deal["competitor_product"], deal["competitor_price"]) == ("Milk", "N/A")
@@ -0,0 +1,95 @@
+import threading
+import time
+
+from scraper.metrics import JobTimings, MetricsRegistry
+from scraper.pipeline import ParsePipeline
+
+
+def slow_parse(html: str, name: str):
+    """Earlier submissions take longer, so pool completion order is the reverse of submission order"""
+    time.sleep(float(html))
+    return [{"name": name}]
+
+
+def failing_parse(html: str, name: str):
+    if html == "bad":
+        raise ValueError("unparseable modal")
+    return [{"name": name}]
+
+
+class Recorder:
+    def __init__(self):
+        self.results = []
+        self.threads = set()
+
+    def __call__(self, products, name, tag):
+        self.threads.add(threading.current_thread())
+        self.results.append((products, name, tag))
+
+
+def test_results_are_delivered_in_submission_order():
+    sink = Recorder()
+    with ParsePipeline(slow_parse, sink, workers=3) as pipeline:
+        for i, delay in enumerate(("0.3", "0.2", "0.1", "0")):
+            pipeline.submit(delay, f"card-{i}", tag=i)
+
+    assert [tag for _, _, tag in sink.results] == [0, 1, 2, 3]
+    assert [products for products, _, _ in sink.results] == [[{"name": f"card-{i}"}] for i in range(4)]
+
+
+def test_sink_runs_on_the_consumer_thread():
+    sink = Recorder()
+    pipeline = ParsePipeline(failing_parse, sink, workers=1)
+    pipeline.submit("ok", "card-0")
+    pipeline.close()
+
+    assert sink.threads == {pipeline.consumer}
+    assert threading.current_thread() not in sink.threads
+
+
+def test_close_drains_every_pending_result():
+    sink = Recorder()
+    pipeline = ParsePipeline(slow_parse, sink, workers=2, max_pending=2)
+    for i in range(6):
+        pipeline.submit("0.05", f"card-{i}", tag=i)
+
+    pipeline.close()
+    pipeline.close()
+
+    assert [tag for _, _, tag in sink.results] == list(range(6))
+    assert not pipeline.consumer.is_alive()
+
+
+def test_parse_error_is_delivered_as_none():
+    sink = Recorder()
+    with ParsePipeline(failing_parse, sink, workers=2) as pipeline:
+        pipeline.submit("ok", "card-0", tag=0)
+        pipeline.submit("bad", "card-1", tag=1)
+        pipeline.submit("ok", "card-2", tag=2)
+
+    assert [(products, tag) for products, _, tag in sink.results] == [
+        ([{"name": "card-0"}], 0), (None, 1), ([{"name": "card-2"}], 2)]
+
+
+def test_sink_error_does_not_stop_the_consumer():
+    delivered = []
+
+    def sink(products, name, tag):
+        if tag == 0:
+            raise RuntimeError("database locked")
+        delivered.append(tag)
+
+    with ParsePipeline(failing_parse, sink, workers=1) as pipeline:
+        pipeline.submit("ok", "card-0", tag=0)
+        pipeline.submit("ok", "card-1", tag=1)
+
+    assert delivered == [1]
+
+
+def test_parse_time_is_recorded_per_modal():
+    timings = JobTimings(registry=MetricsRegistry())
+    with ParsePipeline(failing_parse, Recorder(), workers=1, timings=timings) as pipeline:
+        pipeline.submit("ok", "card-0")
+        pipeline.submit("bad", "card-1")
+
+    assert timings.as_dict()["parse"]["count"] == 1
@@ -0,0 +1,76 @@
+import json
+import threading
+
+import pytest
+
+from output.registry import JobRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return JobRegistry(str(tmp_path / "jobs.db"))
+
+
+def test_add_and_get(registry):
+    registry.add("job-1", limit=10)
+
+    job = registry.get("job-1")
+    assert (job["status"], job["limit"]) == ("queued", 10)
+    assert "queued_at" in job
+    assert registry.get("missing") is None
+
+
+def test_update_merges_fields_and_moves_status(registry):
+    registry.add("job-1")
+    registry.update("job-1", status="running", scraped=5)
+    registry.update("job-1", scraped=7, timings={"card": {"count": 7}})
+
+    job = registry.get("job-1")
+    assert (job["status"], job["scraped"], job["timings"]) == ("running", 7, {"card": {"count": 7}})
+    row = registry.get_connection().execute("SELECT status FROM job_registry WHERE job_id = 'job-1'").fetchone()
+    assert row == ("running",)
+
+
+def test_fail_interrupted_only_touches_unfinished_jobs(registry):
+    registry.add("queued")
+    registry.add("running", status="running")
+    registry.add("done", status="completed")
+
+    registry.fail_interrupted()
+
+    assert registry.get("queued")["status"] == registry.get("running")["status"] == "failed"
+    assert registry.get("running")["error"] == "Interrupted by restart"
+    assert registry.get("done")["status"] == "completed"
+
+
+def test_import_status_file(registry, tmp_path):
+    status_file = tmp_path / "status.json"
+    status_file.write_text(json.dumps({"jobs": {
+        "old": {"status": "completed", "total": 3},
+        "stuck": {"status": "running"},
+    }}))
+
+    registry.import_status_file(str(status_file))
+
+    assert registry.get("old") == {"status": "completed", "total": 3}
+    assert registry.get("stuck")["status"] == "failed"
+    assert not status_file.exists()
+    assert (tmp_path / "status.json.imported").exists()
+    # Already imported: nothing left to read
+    registry.import_status_file(str(status_file))
+
+
+def test_updates_from_many_threads(registry):
+    registry.add("job-1")
+
+    def update(i):
+        registry.update("job-1", **{f"worker_{i}": i})
+
+    threads = [threading.Thread(target=update, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    job = registry.get("job-1")
+    assert all(job[f"worker_{i}"] == i for i in range(8))
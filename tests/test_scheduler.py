@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+
+from scraper.scheduler import JobScheduler
+
+TIMEOUT = 5
+
+
+class Gate:
+    """A job that blocks until released, recording when it started"""
+
+    def __init__(self, name, started):
+        self.name = name
+        self.started = started
+        self.release = threading.Event()
+        self.running = threading.Event()
+
+    def __call__(self):
+        self.started.append(self.name)
+        self.running.set()
+        assert self.release.wait(TIMEOUT)
+
+
+@pytest.fixture
+def states():
+    return []
+
+
+@pytest.fixture
+def scheduler(states):
+    scheduler = JobScheduler(max_concurrent=1, on_state=lambda job_id, state: states.append((job_id, state)))
+    yield scheduler
+    scheduler.shutdown(timeout=TIMEOUT)
+
+
+def test_runs_by_priority_then_submission_order(scheduler, states):
+    started = []
+    blocker = Gate("blocker", started)
+    scheduler.submit("blocker", blocker)
+    assert blocker.running.wait(TIMEOUT)
+
+    jobs = {name: Gate(name, started) for name in ("low", "first", "second", "urgent")}
+    scheduler.submit("low", jobs["low"], priority=5)
+    scheduler.submit("first", jobs["first"])
+    scheduler.submit("second", jobs["second"])
+    assert scheduler.submit("urgent", jobs["urgent"], priority=-1) == 0
+    assert [scheduler.position(name) for name in ("urgent", "first", "second", "low")] == [0, 1, 2, 3]
+    assert scheduler.stats() == {"max_concurrent": 1, "running": 1, "queued": 4}
+
+    blocker.release.set()
+    for name in ("urgent", "first", "second", "low"):
+        assert jobs[name].running.wait(TIMEOUT)
+        jobs[name].release.set()
+    assert started == ["blocker", "urgent", "first", "second", "low"]
+    assert ("urgent", "queued") in states
+
+
+def test_cancel_queued_and_running(scheduler, states):
+    started = []
+    cancelled = threading.Event()
+    running = Gate("running", started)
+    scheduler.submit("running", running, cancel=lambda: (cancelled.set(), running.release.set()))
+    assert running.running.wait(TIMEOUT)
+    scheduler.submit("queued", Gate("queued", started))
+
+    assert scheduler.cancel("queued") == "queued"
+    assert scheduler.position("queued") is None
+    assert ("queued", "cancelled") in states
+    assert scheduler.cancel("running") == "running"
+    assert cancelled.is_set()
+    assert scheduler.cancel("unknown") is None
+
+
+def test_failing_job_does_not_stop_the_worker(scheduler):
+    done = threading.Event()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    scheduler.submit("fails", fail)
+    scheduler.submit("next", done.set)
+    assert done.wait(TIMEOUT)
+
+
+def test_jobs_run_concurrently_up_to_the_limit():
+    started = []
+    scheduler = JobScheduler(max_concurrent=2)
+    gates = [Gate(f"job-{i}", started) for i in range(3)]
+    try:
+        for gate in gates:
+            scheduler.submit(gate.name, gate)
+        assert gates[0].running.wait(TIMEOUT) and gates[1].running.wait(TIMEOUT)
+        assert not gates[2].running.is_set()
+        assert scheduler.stats()["running"] == 2
+    finally:
+        for gate in gates:
+            gate.release.set()
+        scheduler.shutdown(timeout=TIMEOUT)
+
+
+def test_shutdown_drops_the_queue_and_cancels_running_jobs(states):
+    started = []
+    scheduler = JobScheduler(max_concurrent=1, on_state=lambda job_id, state: states.append((job_id, state)))
+    running = Gate("running", started)
+    scheduler.submit("running", running, cancel=running.release.set)
+    assert running.running.wait(TIMEOUT)
+    scheduler.submit("queued", Gate("queued", started))
+
+    scheduler.shutdown(timeout=TIMEOUT)
+
+    assert started == ["running"]
+    assert ("queued", "cancelled") in states
+    with pytest.raises(RuntimeError):
+        scheduler.submit("late", lambda: None)
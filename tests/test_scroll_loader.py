@@ -0,0 +1,53 @@
+import time
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+from scraper.scroll_loader import CardLoader
+
+
+class LazyPage:
+    """Fake driver for a page that renders its first cards after `delay` seconds, then `batches` more"""
+
+    def __init__(self, delay, batches=(10, 20, 25)):
+        self.ready_at = time.monotonic() + delay
+        self.batches = list(batches)
+        self.count = 0
+        self.history = []
+
+    def find_element(self, by, selector):
+        if time.monotonic() < self.ready_at:
+            raise NoSuchElementException(selector)
+        return object()
+
+    def set_script_timeout(self, seconds):
+        pass
+
+    def execute_async_script(self, script, selector, quiet_ms):
+        if time.monotonic() < self.ready_at:
+            # Nothing rendered yet: the observer stays quiet for the whole window
+            return {"count": 0, "changed": False}
+        before = self.count
+        if self.batches:
+            self.count = self.batches.pop(0)
+            self.history.append([len(self.history), self.count])
+        return {"count": self.count, "changed": self.count != before}
+
+    def execute_script(self, script):
+        return self.history
+
+
+def test_waits_for_a_slow_first_render():
+    loader = CardLoader(LazyPage(delay=0.3), quiet=0.01, first_card_timeout=5)
+
+    assert loader.load() == 25
+    assert loader.jumps == 4
+    assert loader.history == [(0, 10), (1, 20), (2, 25)]
+
+
+def test_page_without_cards_is_a_failed_load():
+    loader = CardLoader(LazyPage(delay=60), quiet=0.01, first_card_timeout=0.2)
+
+    with pytest.raises(RuntimeError, match="No weekly ad cards"):
+        loader.load()
+    assert loader.jumps == 0
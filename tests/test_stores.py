@@ -0,0 +1,102 @@
+import threading
+
+from scraper.stores import ShardBoard, parse_store_ids, weekly_ad_url
+
+
+def queue_cards(board, shard, count):
+    for index in range(count):
+        shard.cards.put(index)
+    board.mark_ready(shard)
+
+
+def test_parse_store_ids_drops_blanks_and_repeats():
+    assert parse_store_ids(" 01400376, ,01400441,01400376 ") == ["01400376", "01400441"]
+    assert parse_store_ids(None) == []
+
+
+def test_weekly_ad_url_uses_the_store_code():
+    assert "StoreCode=01400376" in weekly_ad_url("01400376")
+    assert weekly_ad_url(None).endswith("/weeklyad/weeklyad")
+
+
+def test_every_store_is_opened_before_any_is_joined():
+    board = ShardBoard(["a", "b", "c"], limit=10)
+
+    claims = [board.claim() for _ in range(3)]
+
+    assert [(shard.store_id, opens) for shard, opens in claims] == [("a", True), ("b", True), ("c", True)]
+    assert all(shard.workers == 1 for shard, _ in claims)
+
+
+def test_idle_worker_joins_the_store_with_the_largest_backlog():
+    board = ShardBoard(["a", "b"], limit=10)
+    a, _ = board.claim()
+    b, _ = board.claim()
+    queue_cards(board, a, 3)
+    queue_cards(board, b, 8)
+
+    shard, opens = board.claim()
+    assert (shard.store_id, opens, shard.workers) == ("b", False, 2)
+
+    # 8 cards over 3 workers is still more per worker than 3 cards over 2
+    shard, _ = board.claim()
+    assert shard.store_id == "b"
+
+
+def test_store_at_its_limit_is_not_joined():
+    board = ShardBoard(["a"], limit=1)
+    a, _ = board.claim()
+    queue_cards(board, a, 5)
+
+    assert board.claim_slot(a)
+    assert not board.claim_slot(a)
+    assert board.claim() is None
+
+    board.release_slot(a)
+    assert board.claim_slot(a)
+
+
+def test_claim_is_none_once_every_store_is_drained():
+    board = ShardBoard(["a", "b"], limit=10)
+    a, _ = board.claim()
+    b, _ = board.claim()
+    queue_cards(board, a, 1)
+    board.mark_ready(b)
+
+    # a's one card already has a worker, b has none left
+    assert board.claim() is None
+
+    a.cards.get()
+    board.leave(a)
+    board.leave(b)
+    assert board.claim() is None
+
+
+def test_claim_waits_for_a_loading_store():
+    board = ShardBoard(["a"], limit=10)
+    a, _ = board.claim()
+    claimed = []
+    waiter = threading.Thread(target=lambda: claimed.append(board.claim()))
+    waiter.start()
+
+    queue_cards(board, a, 4)
+    waiter.join(timeout=5)
+
+    assert not waiter.is_alive()
+    assert claimed[0] == (a, False)
+
+
+def test_stop_releases_waiting_workers():
+    stop = threading.Event()
+    board = ShardBoard(["a"], limit=10, stop=stop)
+    a, _ = board.claim()
+    claimed = []
+    waiter = threading.Thread(target=lambda: claimed.append(board.claim()))
+    waiter.start()
+
+    stop.set()
+    waiter.join(timeout=5)
+
+    assert not waiter.is_alive()
+    assert claimed == [None]
+    assert not board.claim_slot(a)
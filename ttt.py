@@ -21,6 +21,8 @@ from webdriver_manager.chrome import ChromeDriverManager
 from fake_useragent import UserAgent
 from bs4 import BeautifulSoup
 
+WEEKLY_AD_URL = "https://www.kroger.com/weeklyad/weeklyad"
+
 # ===================== FASTAPI SETUP =====================
 app = FastAPI(title="Kroger Weekly Deals Fast Scraper")
 app.add_middleware(
@@ -228,65 +230,75 @@ def parse_kroger_modal(html: str, displayed_name: str) -> List[Dict[str, Any]]:
 
     return results if len(results) > 1 else results
 
-# ===================== MAIN ENDPOINT =====================
-@app.get("/scrape-kroger-deals", response_model=ScrapeResponse)
-async def scrape_kroger_deals(limit: int = 500):
-    driver = None
-    try:
-        start_time = time.time()
-        driver = init_driver()
-        all_deals = []
+# ===================== STORE SCRAPE =====================
+def scrape_store(driver, store_id: str, limit: int) -> List[Dict]:
+    """Deals from one store's weekly ad ("" = the session's default store)"""
+    all_deals = []
 
-        print("Loading Kroger Weekly Ad...")
-        driver.get("https://www.kroger.com/weeklyad/weeklyad")
-        WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+    print(f"Loading Kroger Weekly Ad ({store_id or 'default store'})...")
+    driver.get(f"{WEEKLY_AD_URL}?StoreCode={store_id}" if store_id else WEEKLY_AD_URL)
+    WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
 
-        for _ in range(3):
-            close_popups(driver)
-            time.sleep(0.4)
+    for _ in range(3):
+        close_popups(driver)
+        time.sleep(0.4)
 
-        fast_scroll_to_load_all(driver)
+    fast_scroll_to_load_all(driver)
 
-        cards = driver.find_elements(By.CSS_SELECTOR, "div.kds-Card.SWA-Omni")
-        print(f"Found {len(cards)} deal cards")
+    cards = driver.find_elements(By.CSS_SELECTOR, "div.kds-Card.SWA-Omni")
+    print(f"Found {len(cards)} deal cards")
 
-        processed = 0
-        for idx, card in enumerate(cards):
-            if processed >= limit:
-                break
+    processed = 0
+    for idx, card in enumerate(cards):
+        if processed >= limit:
+            break
 
-            name = get_displayed_name(card)
-            if not name or "Unknown" in name or len(name) < 3:
-                continue
+        name = get_displayed_name(card)
+        if not name or "Unknown" in name or len(name) < 3:
+            continue
 
-            print(f"[{processed+1}/{min(limit, len(cards))}] {name}")
-
-            clicked = False
-            for selector in [
-                "button[data-testid='SWA-Omni-ImageContainer']",
-                "img",
-                "button[role='button']"
-            ]:
-                try:
-                    btn = card.find_element(By.CSS_SELECTOR, selector)
-                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
-                    time.sleep(0.3)
-                    driver.execute_script("arguments[0].click();", btn)
-                    clicked = True
-                    break
-                except:
-                    continue
-
-            if not clicked:
+        print(f"[{processed+1}/{min(limit, len(cards))}] {name}")
+
+        clicked = False
+        for selector in [
+            "button[data-testid='SWA-Omni-ImageContainer']",
+            "img",
+            "button[role='button']"
+        ]:
+            try:
+                btn = card.find_element(By.CSS_SELECTOR, selector)
+                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
+                time.sleep(0.3)
+                driver.execute_script("arguments[0].click();", btn)
+                clicked = True
+                break
+            except:
                 continue
 
-            modal_html = get_modal_html(driver)
-            products = parse_kroger_modal(modal_html, name)
-            all_deals.extend(products)
-            processed += len(products) if isinstance(products, list) else 1
+        if not clicked:
+            continue
+
+        modal_html = get_modal_html(driver)
+        products = parse_kroger_modal(modal_html, name)
+        all_deals.extend({**deal, "store_id": store_id} if store_id else deal for deal in products)
+        processed += len(products) if isinstance(products, list) else 1
+
+        close_popups(driver)
+        time.sleep(0.5)  # Minimal delay
 
-            close_popups(driver)
-            time.sleep(0.5)  # Minimal delay
+    return all_deals
+
+# ===================== MAIN ENDPOINT =====================
+@app.get("/scrape-kroger-deals", response_model=ScrapeResponse)
+async def scrape_kroger_deals(limit: int = 500, stores: str = ""):
+    driver = None
+    try:
+        start_time = time.time()
+        driver = init_driver()
+        all_deals = []
+        # One browser: stores run one after another, `limit` applies per store
+        for store_id in [s.strip() for s in stores.split(",") if s.strip()] or [""]:
+            all_deals.extend(scrape_store(driver, store_id, limit))
 
         # Save result
         with open("kroger_deals_fast.json", "w", encoding="utf-8") as f: